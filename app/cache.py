@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+Referencias = Dict[str, str]
+CarregarReferencias = Callable[[str, str], Referencias]
+
+
+class ReferenciaCache:
+    def __init__(
+        self,
+        carregar: CarregarReferencias,
+        tamanho_maximo: int = 1024,
+        ttl_segundos: float = 60.0,
+        relogio: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if tamanho_maximo < 1:
+            raise ValueError("tamanho_maximo deve ser maior ou igual a 1")
+        self._carregar = carregar
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl_segundos = ttl_segundos
+        self._relogio = relogio
+        self._entradas: "OrderedDict[Tuple[str, str], Tuple[float, Referencias]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._geracao = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def obter(self, tabela: str, usuario_id: str) -> Referencias:
+        chave = (tabela, usuario_id)
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None and entrada[0] > self._relogio():
+                self._entradas.move_to_end(chave)
+                self.hits += 1
+                return entrada[1]
+            self.misses += 1
+            geracao = self._geracao
+
+        referencias = self._carregar(tabela, usuario_id)
+
+        with self._lock:
+            if geracao == self._geracao and self.ttl_segundos > 0:
+                self._entradas[chave] = (self._relogio() + self.ttl_segundos, referencias)
+                self._entradas.move_to_end(chave)
+                while len(self._entradas) > self.tamanho_maximo:
+                    self._entradas.popitem(last=False)
+                    self.evictions += 1
+        return referencias
+
+    def definir(self, tabela: str, usuario_id: str, referencia_id: str, nome: str) -> None:
+        with self._lock:
+            self._geracao += 1
+            chave = (tabela, usuario_id)
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                self._entradas[chave] = (entrada[0], {**entrada[1], referencia_id: nome})
+
+    def remover(self, tabela: str, referencia_id: str, usuario_id: Optional[str] = None) -> None:
+        with self._lock:
+            self._geracao += 1
+            for chave, (expira_em, referencias) in list(self._entradas.items()):
+                if chave[0] != tabela or referencia_id not in referencias:
+                    continue
+                if usuario_id is not None and chave[1] != usuario_id:
+                    continue
+                restantes = dict(referencias)
+                del restantes[referencia_id]
+                self._entradas[chave] = (expira_em, restantes)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._geracao += 1
+            self._entradas.clear()
+
+    def estatisticas(self) -> Dict[str, Hashable]:
+        with self._lock:
+            return {
+                "entradas": len(self._entradas),
+                "tamanho_maximo": self.tamanho_maximo,
+                "ttl_segundos": self.ttl_segundos,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class VersaoDados:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._epoca = 0
+        self._total = 0
+        self._por_usuario: Dict[str, int] = {}
+
+    def incrementar(self, usuario_id: Optional[str] = None) -> None:
+        with self._lock:
+            self._total += 1
+            if usuario_id is None:
+                self._epoca += 1
+            else:
+                self._por_usuario[usuario_id] = self._por_usuario.get(usuario_id, 0) + 1
+
+    def atual(self, usuario_id: Optional[str] = None) -> str:
+        with self._lock:
+            if usuario_id is None:
+                return f"t{self._total}"
+            return f"e{self._epoca}.u{self._por_usuario.get(usuario_id, 0)}"
+
+
+class RespostaCacheada(NamedTuple):
+    versao: str
+    etag: str
+    corpo: bytes
+    headers: Tuple[Tuple[str, str], ...]
+
+
+class RespostaCache:
+    def __init__(
+        self,
+        tamanho_maximo: int = 512,
+        bytes_maximo: int = 32 * 1024 * 1024,
+        corpo_maximo: int = 1024 * 1024,
+    ) -> None:
+        if tamanho_maximo < 1:
+            raise ValueError("tamanho_maximo deve ser maior ou igual a 1")
+        self.tamanho_maximo = tamanho_maximo
+        self.bytes_maximo = bytes_maximo
+        self.corpo_maximo = min(corpo_maximo, bytes_maximo)
+        self._entradas: "OrderedDict[Hashable, RespostaCacheada]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.recusadas = 0
+
+    def obter(self, chave: Hashable, versao: str) -> Optional[RespostaCacheada]:
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None or entrada.versao != versao:
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.hits += 1
+            return entrada
+
+    def guardar(self, chave: Hashable, entrada: RespostaCacheada) -> None:
+        with self._lock:
+            anterior = self._entradas.pop(chave, None)
+            if anterior is not None:
+                self.bytes -= len(anterior.corpo)
+            if len(entrada.corpo) > self.corpo_maximo:
+                self.recusadas += 1
+                return
+            self._entradas[chave] = entrada
+            self.bytes += len(entrada.corpo)
+            while len(self._entradas) > self.tamanho_maximo or self.bytes > self.bytes_maximo:
+                _, removida = self._entradas.popitem(last=False)
+                self.bytes -= len(removida.corpo)
+                self.evictions += 1
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self.bytes = 0
+
+    def estatisticas(self) -> Dict[str, Hashable]:
+        with self._lock:
+            return {
+                "entradas": len(self._entradas),
+                "tamanho_maximo": self.tamanho_maximo,
+                "bytes": self.bytes,
+                "bytes_maximo": self.bytes_maximo,
+                "corpo_maximo": self.corpo_maximo,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "recusadas": self.recusadas,
+            }
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple
+
+from app.parcelas import (
+    CENTAVOS_QUANT,
+    agenda_parcelas_centavos,
+    centavos_exatos,
+)
+
+
+@lru_cache(maxsize=4096)
+def competencia_to_index(competencia: str) -> int:
+    ano, mes = competencia.split("-")
+    return int(ano) * 12 + int(mes) - 1
+
+
+def index_to_competencia(indice: int) -> str:
+    return f"{indice // 12:04d}-{indice % 12 + 1:02d}"
+
+
+def para_centavos(value: Any) -> int:
+    centavos = centavos_exatos(value)
+    if centavos is not None:
+        return centavos
+    return int((Decimal(str(value)) * 100).quantize(CENTAVOS_QUANT, rounding=ROUND_HALF_UP))
+
+
+def de_centavos(centavos: int) -> float:
+    return centavos / 100
+
+
+def arredondar_centavos(value: Any) -> float:
+    return de_centavos(para_centavos(value))
+
+
+def parcelas_por_competencia(
+    parcelados: List[Dict[str, Any]],
+    competencia_inicio: str,
+    competencia_fim: str,
+) -> List[int]:
+    inicio_idx = competencia_to_index(competencia_inicio)
+    fim_idx = competencia_to_index(competencia_fim)
+    meses = fim_idx - inicio_idx + 1
+    diferencas = [0] * (meses + 1)
+    parcelas = [0] * meses
+
+    bases, ultimas = agenda_parcelas_centavos(
+        [item["valor_total_centavos"] for item in parcelados],
+        [int(item["numero_parcelas"]) for item in parcelados],
+    )
+    for item, base, ultima in zip(parcelados, bases, ultimas):
+        primeira_idx = competencia_to_index(item["competencia"])
+        quantidade = int(item.get("quantidade", 1))
+        ultima_idx = primeira_idx + int(item["numero_parcelas"]) - 1
+
+        de = max(primeira_idx, inicio_idx)
+        ate = min(ultima_idx - 1, fim_idx)
+        if de <= ate:
+            diferencas[de - inicio_idx] += base * quantidade
+            diferencas[ate - inicio_idx + 1] -= base * quantidade
+        if inicio_idx <= ultima_idx <= fim_idx:
+            parcelas[ultima_idx - inicio_idx] += ultima * quantidade
+
+    acumulado = 0
+    for indice in range(meses):
+        acumulado += diferencas[indice]
+        parcelas[indice] += acumulado
+    return parcelas
+
+
+def consolidar_periodo(
+    dados: Dict[str, Any],
+    competencia_inicio: str,
+    competencia_fim: str,
+) -> List[Dict[str, Any]]:
+    inicio_idx = competencia_to_index(competencia_inicio)
+    parcelas = parcelas_por_competencia(dados["parcelados"], competencia_inicio, competencia_fim)
+    meses: List[Dict[str, Any]] = []
+    for deslocamento, parcelas_centavos in enumerate(parcelas):
+        competencia = index_to_competencia(inicio_idx + deslocamento)
+        meses.append(
+            {
+                "competencia": competencia,
+                "entradas_centavos": dados["entradas"].get(competencia, 0),
+                "gastos_centavos": dados["gastos"].get(competencia, 0),
+                "parcelas_centavos": parcelas_centavos,
+            }
+        )
+    return meses
+
+
+def resumo_deltas(lancamento: Dict[str, Any]) -> List[Tuple[str, int, int, int]]:
+    tipo = lancamento["tipo_lancamento"]
+    competencia = lancamento["competencia"]
+    if tipo == "ENTRADA":
+        return [(competencia, para_centavos(lancamento["valor"]), 0, 0)]
+    if tipo in {"FIXO", "VARIAVEL"}:
+        return [(competencia, 0, para_centavos(lancamento["valor"]), 0)]
+
+    numero_parcelas = int(lancamento["numero_parcelas"])
+    bases, ultimas = agenda_parcelas_centavos(
+        [para_centavos(lancamento["valor_total"])],
+        [numero_parcelas],
+    )
+    base, ultima = bases[0], ultimas[0]
+    inicio_idx = competencia_to_index(competencia)
+    return [
+        (
+            index_to_competencia(inicio_idx + indice),
+            0,
+            0,
+            ultima if indice == numero_parcelas - 1 else base,
+        )
+        for indice in range(numero_parcelas)
+    ]
+
+
+def acumular_deltas(
+    deltas: Iterable[Tuple[str, int, int, int]],
+    destino: Dict[str, List[int]],
+) -> None:
+    for competencia, entradas, gastos, parcelas in deltas:
+        totais = destino.setdefault(competencia, [0, 0, 0])
+        totais[0] += entradas
+        totais[1] += gastos
+        totais[2] += parcelas
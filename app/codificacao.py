@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from json.encoder import encode_basestring
+from typing import Any, Iterable, Optional, Sequence
+
+from app.metricas import cronometrar
+
+
+def _texto(valor: Optional[str]) -> str:
+    return "null" if valor is None else encode_basestring(valor)
+
+
+def _inteiro(valor: Optional[int]) -> str:
+    return "null" if valor is None else int.__repr__(valor)
+
+
+def lancamento_json(linha: Sequence[Any]) -> str:
+    (
+        lancamento_id,
+        usuario_id,
+        nome,
+        data,
+        competencia,
+        tipo,
+        categoria_id,
+        forma_pagamento_id,
+        valor_centavos,
+        pago,
+        valor_total_centavos,
+        numero_parcelas,
+    ) = linha
+    base = (
+        f'{{"id":{encode_basestring(lancamento_id)}'
+        f',"usuario_id":{encode_basestring(usuario_id)}'
+        f',"nome":{encode_basestring(nome)}'
+        f',"data":{encode_basestring(data)}'
+        f',"competencia":{encode_basestring(competencia)}'
+        f',"tipo_lancamento":{encode_basestring(tipo)}'
+    )
+    if tipo == "ENTRADA":
+        return f'{base},"valor":{float.__repr__(valor_centavos / 100)}}}'
+    if tipo == "FIXO" or tipo == "VARIAVEL":
+        return (
+            f'{base},"categoria_id":{_texto(categoria_id)}'
+            f',"forma_pagamento_id":{_texto(forma_pagamento_id)}'
+            f',"valor":{float.__repr__(valor_centavos / 100)}'
+            f',"pago":{"true" if pago else "false"}}}'
+        )
+    if tipo == "PARCELADO":
+        return (
+            f'{base},"categoria_id":{_texto(categoria_id)}'
+            f',"forma_pagamento_id":{_texto(forma_pagamento_id)}'
+            f',"valor_total":{float.__repr__(valor_total_centavos / 100)}'
+            f',"numero_parcelas":{_inteiro(numero_parcelas)}}}'
+        )
+    return base + "}"
+
+
+@cronometrar("serializacao")
+def lancamentos_json(linhas: Iterable[Sequence[Any]]) -> bytes:
+    return ("[" + ",".join(map(lancamento_json, linhas)) + "]").encode("utf-8")
@@ -1,81 +1,776 @@
 from __future__ import annotations
 
+import functools
+import heapq
 import os
 import sqlite3
+import threading
 from contextlib import contextmanager
+from datetime import datetime, timezone
+from itertools import chain, islice
+from operator import attrgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import quote
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from app.cache import ReferenciaCache, VersaoDados
+from app.calculos import (
+    acumular_deltas,
+    competencia_to_index,
+    para_centavos,
+    resumo_deltas,
+)
+from app.metricas import METRICAS_ATIVAS, contar_query, instrumentar_db
+from app.migracoes import (
+    VERSAO_ATUAL,
+    ConnectionFactory,
+    aplicar_migracoes,
+    definir_versao_schema,
+)
+from app.modelos import Lancamento, Recorrencia
+from app.pool import DEFAULT_PRAGMAS, ConnectionPool, PoolClosedError
+from app.rastreio import ConexaoRastreada, RegistroConsultasLentas
+from app.recorrencias import ocorrencias
+from app.replica import ReplicaLeitura
+from app.shards import RoteadorShards
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 DB_PATH = os.getenv("FINANCAS_DB_PATH", str(BASE_DIR / "data" / "financas.db"))
+DB_POOL_SIZE = int(os.getenv("FINANCAS_DB_POOL_SIZE", "4"))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("FINANCAS_DB_BUSY_TIMEOUT_MS", "5000"))
+GRUPO_COMMIT = os.getenv("FINANCAS_GRUPO_COMMIT", "0") == "1"
+SYNCHRONOUS_DURAVEIS = ("FULL", "EXTRA", "2", "3")
+DB_SYNCHRONOUS = os.getenv("FINANCAS_DB_SYNCHRONOUS", "NORMAL")
+if GRUPO_COMMIT and DB_SYNCHRONOUS.upper() not in SYNCHRONOUS_DURAVEIS:
+    DB_SYNCHRONOUS = "FULL"
+EXPORTACAO_TAMANHO_LOTE = int(os.getenv("FINANCAS_EXPORTACAO_TAMANHO_LOTE", "500"))
+CACHE_REFERENCIAS_TAMANHO = int(os.getenv("FINANCAS_CACHE_REFERENCIAS_TAMANHO", "1024"))
+CACHE_REFERENCIAS_TTL = float(os.getenv("FINANCAS_CACHE_REFERENCIAS_TTL", "60"))
+CONSULTAS_LENTAS_MS = float(os.getenv("FINANCAS_DB_CONSULTAS_LENTAS_MS", "-1"))
+CONSULTAS_LENTAS_HISTORICO = int(os.getenv("FINANCAS_DB_CONSULTAS_LENTAS_HISTORICO", "100"))
+
+SHARDS_ATIVOS = os.getenv("FINANCAS_DB_SHARDS", "0") == "1"
+SHARDS_DIR = os.getenv("FINANCAS_DB_SHARDS_DIR", str(BASE_DIR / "data" / "usuarios"))
+SHARDS_ABERTOS = int(os.getenv("FINANCAS_DB_SHARDS_ABERTOS", "64"))
+SHARD_POOL_SIZE = int(os.getenv("FINANCAS_DB_SHARD_POOL_SIZE", "2"))
+MODOS_LEITURA = ("principal", "ro", "replica")
+DB_LEITURA = os.getenv("FINANCAS_DB_LEITURA", "principal")
+DB_LEITURA_POOL_SIZE = int(os.getenv("FINANCAS_DB_LEITURA_POOL_SIZE", str(DB_POOL_SIZE)))
+DB_REPLICA_PATH = os.getenv(
+    "FINANCAS_DB_REPLICA_PATH",
+    str(Path(DB_PATH).with_name(Path(DB_PATH).stem + "-replica.db")),
+)
+DB_REPLICA_INTERVALO_S = float(os.getenv("FINANCAS_DB_REPLICA_INTERVALO_S", "5"))
+if DB_LEITURA not in MODOS_LEITURA:
+    raise ValueError(f"FINANCAS_DB_LEITURA invalido: {DB_LEITURA} ({', '.join(MODOS_LEITURA)})")
+
+
+class PeriodoFechadoError(sqlite3.IntegrityError):
+    def __init__(self, competencias: Sequence[str]) -> None:
+        super().__init__(f"competencia fechada: {', '.join(competencias)}")
+        self.competencias = list(competencias)
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_vazio: Optional[ConnectionPool] = None
+_roteador: Optional[RoteadorShards] = None
+_pool_leitura: Optional[ConnectionPool] = None
+_replica: Optional[ReplicaLeitura] = None
+_pool_lock = threading.Lock()
+_versoes = VersaoDados()
+_consultas_lentas = RegistroConsultasLentas(CONSULTAS_LENTAS_MS, CONSULTAS_LENTAS_HISTORICO)
 
 
 def _ensure_db_path() -> None:
     Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
 
 
+def _pragmas() -> Tuple[Tuple[str, str], ...]:
+    overrides = {
+        "busy_timeout": str(DB_BUSY_TIMEOUT_MS),
+        "synchronous": DB_SYNCHRONOUS,
+    }
+    return tuple((name, overrides.get(name, value)) for name, value in DEFAULT_PRAGMAS)
+
+
+def _instrumentar_conexao(conn: sqlite3.Connection) -> None:
+    if METRICAS_ATIVAS:
+        conn.set_trace_callback(contar_query)
+    if isinstance(conn, ConexaoRastreada):
+        conn.consultas_lentas = _consultas_lentas
+
+
+def _pragmas_leitura() -> Tuple[Tuple[str, str], ...]:
+    pragmas = tuple(
+        (name, value) for name, value in _pragmas() if name not in ("journal_mode", "synchronous")
+    )
+    return pragmas + (("query_only", "1"),)
+
+
+def _novo_pool(
+    path: str,
+    size: int,
+    inicializar: Callable[[sqlite3.Connection], None] = _instrumentar_conexao,
+    somente_leitura: bool = False,
+) -> ConnectionPool:
+    return ConnectionPool(
+        path,
+        size,
+        pragmas=_pragmas_leitura() if somente_leitura else _pragmas(),
+        timeout=DB_BUSY_TIMEOUT_MS / 1000,
+        inicializar=inicializar,
+        fabrica=ConexaoRastreada if _consultas_lentas.ativo else sqlite3.Connection,
+        uri=somente_leitura,
+    )
+
+
+def _uri_leitura(path: str, imutavel: bool = False) -> str:
+    uri = f"file:{quote(Path(path).resolve().as_posix())}?mode=ro"
+    return uri + "&immutable=1" if imutavel else uri
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _ensure_db_path()
+                _pool = _novo_pool(DB_PATH, DB_POOL_SIZE)
+    return _pool
+
+
+def _get_pool_leitura() -> ConnectionPool:
+    global _pool_leitura
+    if _pool_leitura is None:
+        get_pool()
+        with _pool_lock:
+            if _pool_leitura is None:
+                _pool_leitura = _novo_pool(
+                    _uri_leitura(DB_PATH),
+                    DB_LEITURA_POOL_SIZE,
+                    somente_leitura=True,
+                )
+    return _pool_leitura
+
+
+def _get_replica() -> ReplicaLeitura:
+    global _replica
+    if _replica is None:
+        with _pool_lock:
+            if _replica is None:
+                _replica = ReplicaLeitura(
+                    DB_PATH,
+                    DB_REPLICA_PATH,
+                    lambda path: _novo_pool(
+                        _uri_leitura(path, imutavel=True),
+                        DB_LEITURA_POOL_SIZE,
+                        somente_leitura=True,
+                    ),
+                    intervalo_s=DB_REPLICA_INTERVALO_S,
+                    versao=_versoes.atual,
+                )
+    return _replica
+
+
+def _leitura_separada() -> bool:
+    return DB_LEITURA != "principal" and not SHARDS_ATIVOS
+
+
+def _pool_leitura_de(analitica: bool) -> ConnectionPool:
+    if analitica and DB_LEITURA == "replica":
+        return _get_replica().pool()
+    return _get_pool_leitura()
+
+
+def iniciar_replica() -> None:
+    if _leitura_separada() and DB_LEITURA == "replica":
+        _get_replica().iniciar()
+
+
+def atualizar_replica() -> bool:
+    if not _leitura_separada() or DB_LEITURA != "replica":
+        return False
+    return _get_replica().atualizar()
+
+
+def estatisticas_replica() -> Optional[Dict[str, Any]]:
+    return _replica.estatisticas() if _replica is not None else None
+
+
+def _preparar_shard(pool: ConnectionPool) -> None:
+    _init_schema(functools.partial(_conexao_do_pool, pool))
+
+
+def _shards() -> RoteadorShards:
+    global _roteador
+    if _roteador is None:
+        with _pool_lock:
+            if _roteador is None:
+                _roteador = RoteadorShards(
+                    SHARDS_DIR,
+                    lambda path: _novo_pool(path, SHARD_POOL_SIZE),
+                    _preparar_shard,
+                    max_abertos=SHARDS_ABERTOS,
+                )
+    return _roteador
+
+
+def _inicializar_vazio(conn: sqlite3.Connection) -> None:
+    _instrumentar_conexao(conn)
+    _criar_tabelas(conn)
+
+
+def _get_pool_vazio() -> ConnectionPool:
+    global _pool_vazio
+    if _pool_vazio is None:
+        with _pool_lock:
+            if _pool_vazio is None:
+                _pool_vazio = _novo_pool(":memory:", DB_POOL_SIZE, _inicializar_vazio)
+    return _pool_vazio
+
+
+def _pool_de(usuario_id: Optional[str], criar: bool) -> ConnectionPool:
+    if not SHARDS_ATIVOS:
+        return get_pool()
+    if usuario_id is None:
+        raise ValueError("usuario_id obrigatorio com FINANCAS_DB_SHARDS=1")
+    try:
+        pool = _shards().pool(usuario_id, criar)
+    except ValueError:
+        if criar:
+            raise
+        pool = None
+    return pool if pool is not None else _get_pool_vazio()
+
+
+def _usuarios_alvo(usuario_id: Optional[str]) -> List[Optional[str]]:
+    if not SHARDS_ATIVOS or usuario_id is not None:
+        return [usuario_id]
+    return list(_shards().shards())
+
+
+def listar_shards() -> List[str]:
+    return _shards().shards() if SHARDS_ATIVOS else []
+
+
+def caminho_shard(usuario_id: str) -> Path:
+    return _shards().caminho(usuario_id)
+
+
+def versao_dados(usuario_id: Optional[str] = None) -> str:
+    versao = _versoes.atual(usuario_id)
+    if _replica is not None:
+        return f"{versao}.r{_replica.geracao}"
+    return versao
+
+
+def consultas_lentas() -> Dict[str, Any]:
+    return _consultas_lentas.estatisticas()
+
+
+def estatisticas_pools() -> Dict[str, Any]:
+    if not SHARDS_ATIVOS:
+        pool = get_pool()
+        return {"abertas": pool.opened, "ociosas": pool.idle, "shards": None}
+    roteador = _shards()
+    pools = roteador.abertos()
+    return {
+        "abertas": sum(pool.opened for pool in pools),
+        "ociosas": sum(pool.idle for pool in pools),
+        "shards": roteador.estatisticas(),
+    }
+
+
+def check_pool() -> bool:
+    if not SHARDS_ATIVOS:
+        return get_pool().check()
+    diretorio = Path(SHARDS_DIR)
+    return (
+        diretorio.is_dir()
+        and os.access(diretorio, os.W_OK)
+        and all(pool.check() for pool in _shards().abertos())
+    )
+
+
+def close_pool() -> None:
+    global _pool, _pool_vazio, _roteador, _pool_leitura, _replica
+    with _pool_lock:
+        if _replica is not None:
+            _replica.encerrar()
+        for pool in (_pool_leitura, _pool, _pool_vazio):
+            if pool is not None:
+                pool.close()
+        if _roteador is not None:
+            _roteador.fechar()
+        _pool = None
+        _pool_vazio = None
+        _roteador = None
+        _pool_leitura = None
+        _replica = None
+
+
 @contextmanager
-def get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
+def _usar_conexao(pool: ConnectionPool, conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    broken = False
     try:
         yield conn
         conn.commit()
     except Exception:
-        conn.rollback()
+        try:
+            conn.rollback()
+        except sqlite3.Error:
+            broken = True
         raise
     finally:
-        conn.close()
+        pool.release(conn, broken=broken)
 
 
-def init_db() -> None:
-    _ensure_db_path()
-    with get_connection() as conn:
+@contextmanager
+def _conexao_do_pool(pool: ConnectionPool) -> Iterator[sqlite3.Connection]:
+    with _usar_conexao(pool, pool.acquire()) as conn:
+        yield conn
+
+
+@contextmanager
+def _emprestar(obter_pool: Callable[[], ConnectionPool]) -> Iterator[sqlite3.Connection]:
+    pool = obter_pool()
+    try:
+        conn = pool.acquire()
+    except PoolClosedError:
+        pool = obter_pool()
+        conn = pool.acquire()
+    with _usar_conexao(pool, conn) as conn:
+        yield conn
+
+
+@contextmanager
+def get_connection(
+    usuario_id: Optional[str] = None,
+    criar: bool = True,
+) -> Iterator[sqlite3.Connection]:
+    with _emprestar(lambda: _pool_de(usuario_id, criar)) as conn:
+        yield conn
+
+
+@contextmanager
+def get_leitura(
+    usuario_id: Optional[str] = None,
+    analitica: bool = False,
+) -> Iterator[sqlite3.Connection]:
+    if _leitura_separada():
+        obter_pool = functools.partial(_pool_leitura_de, analitica)
+    else:
+        obter_pool = functools.partial(_pool_de, usuario_id, False)
+    with _emprestar(obter_pool) as conn:
+        yield conn
+
+
+def _tabela_existe(conn: sqlite3.Connection, nome: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (nome,),
+    ).fetchone()
+    return row is not None
+
+
+def _centavos_ou_none(valor: Any) -> Optional[int]:
+    return para_centavos(valor) if valor is not None else None
+
+
+def _criar_tabelas(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS lancamentos (
+            id TEXT PRIMARY KEY,
+            usuario_id TEXT NOT NULL,
+            nome TEXT NOT NULL,
+            data TEXT NOT NULL,
+            competencia TEXT NOT NULL,
+            tipo_lancamento TEXT NOT NULL,
+            categoria_id TEXT,
+            forma_pagamento_id TEXT,
+            pago INTEGER,
+            numero_parcelas INTEGER,
+            valor_centavos INTEGER,
+            valor_total_centavos INTEGER
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_lancamentos_ordem
+        ON lancamentos (competencia, data, id)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_lancamentos_usuario_ordem
+        ON lancamentos (usuario_id, competencia, data, id)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_lancamentos_usuario_competencia_tipo
+        ON lancamentos (usuario_id, competencia, tipo_lancamento)
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS categorias (
+            id TEXT PRIMARY KEY,
+            usuario_id TEXT NOT NULL,
+            nome TEXT NOT NULL,
+            UNIQUE (usuario_id, nome)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS formas_pagamento (
+            id TEXT PRIMARY KEY,
+            usuario_id TEXT NOT NULL,
+            nome TEXT NOT NULL,
+            UNIQUE (usuario_id, nome)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS resumo_mensal (
+            usuario_id TEXT NOT NULL,
+            competencia TEXT NOT NULL,
+            entradas_centavos INTEGER NOT NULL DEFAULT 0,
+            gastos_centavos INTEGER NOT NULL DEFAULT 0,
+            parcelas_centavos INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (usuario_id, competencia)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS saldo_acumulado (
+            usuario_id TEXT NOT NULL,
+            competencia TEXT NOT NULL,
+            saldo_centavos INTEGER NOT NULL,
+            PRIMARY KEY (usuario_id, competencia)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS recorrencias (
+            id TEXT PRIMARY KEY,
+            usuario_id TEXT NOT NULL,
+            nome TEXT NOT NULL,
+            tipo_lancamento TEXT NOT NULL,
+            categoria_id TEXT,
+            forma_pagamento_id TEXT,
+            valor_centavos INTEGER NOT NULL,
+            dia INTEGER NOT NULL,
+            competencia_inicio TEXT NOT NULL,
+            competencia_fim TEXT
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_recorrencias_usuario
+        ON recorrencias (usuario_id, competencia_inicio)
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS fechamentos (
+            usuario_id TEXT NOT NULL,
+            competencia TEXT NOT NULL,
+            entradas_centavos INTEGER NOT NULL,
+            gastos_centavos INTEGER NOT NULL,
+            parcelas_centavos INTEGER NOT NULL,
+            saldo_centavos INTEGER NOT NULL,
+            fechado_em TEXT NOT NULL,
+            PRIMARY KEY (usuario_id, competencia)
+        ) WITHOUT ROWID
+        """
+    )
+    for evento in ("UPDATE", "DELETE"):
         conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS lancamentos (
-                id TEXT PRIMARY KEY,
-                usuario_id TEXT NOT NULL,
-                nome TEXT NOT NULL,
-                data TEXT NOT NULL,
-                competencia TEXT NOT NULL,
-                tipo_lancamento TEXT NOT NULL,
-                categoria_id TEXT,
-                forma_pagamento_id TEXT,
-                valor REAL,
-                pago INTEGER,
-                valor_total REAL,
-                numero_parcelas INTEGER
-            )
+            f"""
+            CREATE TRIGGER IF NOT EXISTS fechamentos_imutavel_{evento.lower()}
+            BEFORE {evento} ON fechamentos
+            BEGIN
+                SELECT RAISE(ABORT, 'fechamento imutavel');
+            END
             """
         )
+
+
+def _init_schema(conectar: ConnectionFactory) -> None:
+    with conectar() as conn:
+        if not _tabela_existe(conn, "lancamentos"):
+            definir_versao_schema(conn, VERSAO_ATUAL)
+        resumo_existente = _tabela_existe(conn, "resumo_mensal")
+        saldo_existente = _tabela_existe(conn, "saldo_acumulado")
+        _criar_tabelas(conn)
+
+    aplicar_migracoes(conectar)
+
+    if not resumo_existente or not saldo_existente:
+        with conectar() as conn:
+            _rebuild_resumo(conn, None)
+
+
+def init_db() -> None:
+    if SHARDS_ATIVOS:
+        Path(SHARDS_DIR).mkdir(parents=True, exist_ok=True)
+        return
+    _init_schema(get_connection)
+
+
+RESUMO_UPSERT = """
+    INSERT INTO resumo_mensal (
+        usuario_id,
+        competencia,
+        entradas_centavos,
+        gastos_centavos,
+        parcelas_centavos
+    ) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (usuario_id, competencia) DO UPDATE SET
+        entradas_centavos = entradas_centavos + excluded.entradas_centavos,
+        gastos_centavos = gastos_centavos + excluded.gastos_centavos,
+        parcelas_centavos = parcelas_centavos + excluded.parcelas_centavos
+"""
+
+
+SALDO_ACUMULADO_UPSERT = """
+    INSERT INTO saldo_acumulado (usuario_id, competencia, saldo_centavos)
+    VALUES (?, ?, ?)
+    ON CONFLICT (usuario_id, competencia) DO UPDATE SET
+        saldo_centavos = excluded.saldo_centavos
+"""
+
+
+def _saldo_anterior(conn: sqlite3.Connection, usuario_id: str, competencia: str) -> int:
+    row = conn.execute(
+        """
+        SELECT saldo_centavos
+        FROM saldo_acumulado
+        WHERE usuario_id = ? AND competencia < ?
+        ORDER BY competencia DESC
+        LIMIT 1
+        """,
+        (usuario_id, competencia),
+    ).fetchone()
+    return row[0] if row is not None else 0
+
+
+def _aplicar_saldo_acumulado(
+    conn: sqlite3.Connection,
+    usuario_id: str,
+    deltas: Sequence[Tuple[str, int, int, int]],
+) -> None:
+    variacoes: Dict[str, int] = {}
+    for competencia, entradas, gastos, parcelas in deltas:
+        variacoes[competencia] = variacoes.get(competencia, 0) + entradas - gastos - parcelas
+    if not variacoes:
+        return
+    inicio = min(variacoes)
+    existentes = dict(
         conn.execute(
             """
-            CREATE TABLE IF NOT EXISTS categorias (
-                id TEXT PRIMARY KEY,
-                usuario_id TEXT NOT NULL,
-                nome TEXT NOT NULL,
-                UNIQUE (usuario_id, nome)
-            )
+            SELECT competencia, saldo_centavos
+            FROM saldo_acumulado
+            WHERE usuario_id = ? AND competencia >= ?
+            """,
+            (usuario_id, inicio),
+        ).fetchall()
+    )
+
+    anterior = _saldo_anterior(conn, usuario_id, inicio)
+    variacao = 0
+    linhas: List[Tuple[str, str, int]] = []
+    for competencia in sorted(existentes.keys() | variacoes.keys()):
+        anterior = existentes.get(competencia, anterior)
+        variacao += variacoes.get(competencia, 0)
+        if variacao or competencia not in existentes:
+            linhas.append((usuario_id, competencia, anterior + variacao))
+    conn.executemany(SALDO_ACUMULADO_UPSERT, linhas)
+
+
+def _aplicar_resumo(
+    conn: sqlite3.Connection,
+    usuario_id: str,
+    deltas: Sequence[Tuple[str, int, int, int]],
+) -> None:
+    conn.executemany(
+        RESUMO_UPSERT,
+        [(usuario_id, competencia, *totais) for competencia, *totais in deltas],
+    )
+    _aplicar_saldo_acumulado(conn, usuario_id, deltas)
+
+
+def _rebuild_resumo(conn: sqlite3.Connection, usuario_id: Optional[str]) -> int:
+    clausulas, params = _filtros_lancamentos(usuario_id=usuario_id)
+    where = " WHERE " + " AND ".join(clausulas) if clausulas else ""
+    conn.execute(f"DELETE FROM resumo_mensal{where}", params)
+    conn.execute(f"DELETE FROM saldo_acumulado{where}", params)
+
+    por_usuario: Dict[str, Dict[str, List[int]]] = {}
+    cursor = conn.execute(f"SELECT {LANCAMENTO_COLUNAS} FROM lancamentos{where}", params)
+    while True:
+        rows = cursor.fetchmany(EXPORTACAO_TAMANHO_LOTE)
+        if not rows:
+            break
+        for lancamento in map(Lancamento._make, rows):
+            destino = por_usuario.setdefault(lancamento.usuario_id, {})
+            acumular_deltas(resumo_deltas(lancamento.como_dict()), destino)
+
+    linhas = [
+        (usuario, competencia, *totais)
+        for usuario, meses in por_usuario.items()
+        for competencia, totais in meses.items()
+    ]
+    conn.executemany(RESUMO_UPSERT, linhas)
+
+    saldos: List[Tuple[str, str, int]] = []
+    for usuario, meses in por_usuario.items():
+        saldo = 0
+        for competencia in sorted(meses):
+            entradas, gastos, parcelas = meses[competencia]
+            saldo += entradas - gastos - parcelas
+            saldos.append((usuario, competencia, saldo))
+    conn.executemany(SALDO_ACUMULADO_UPSERT, saldos)
+    return len(linhas)
+
+
+@instrumentar_db
+def rebuild_resumo_mensal(usuario_id: Optional[str] = None) -> int:
+    linhas = 0
+    for alvo in _usuarios_alvo(usuario_id):
+        with get_connection(alvo, criar=False) as conn:
+            linhas += _rebuild_resumo(conn, usuario_id)
+    _versoes.incrementar(usuario_id)
+    return linhas
+
+
+@instrumentar_db
+def get_resumo_mensal(competencia: str, usuario_id: str) -> Dict[str, int]:
+    with get_leitura(usuario_id, analitica=True) as conn:
+        row = conn.execute(
             """
-        )
-        conn.execute(
+            SELECT entradas_centavos, gastos_centavos, parcelas_centavos
+            FROM resumo_mensal
+            WHERE usuario_id = ? AND competencia = ?
+            """,
+            (usuario_id, competencia),
+        ).fetchone()
+    if row is None:
+        return {"entradas_centavos": 0, "gastos_centavos": 0, "parcelas_centavos": 0}
+    return dict(row)
+
+
+@instrumentar_db
+def list_resumo_periodo(
+    competencia_inicio: str,
+    competencia_fim: str,
+    usuario_id: str,
+) -> Dict[str, Dict[str, int]]:
+    with get_leitura(usuario_id, analitica=True) as conn:
+        rows = conn.execute(
             """
-            CREATE TABLE IF NOT EXISTS formas_pagamento (
-                id TEXT PRIMARY KEY,
-                usuario_id TEXT NOT NULL,
-                nome TEXT NOT NULL,
-                UNIQUE (usuario_id, nome)
-            )
+            SELECT competencia, entradas_centavos, gastos_centavos, parcelas_centavos
+            FROM resumo_mensal
+            WHERE usuario_id = ? AND competencia BETWEEN ? AND ?
+            """,
+            (usuario_id, competencia_inicio, competencia_fim),
+        ).fetchall()
+    return {
+        row["competencia"]: {
+            "entradas_centavos": row["entradas_centavos"],
+            "gastos_centavos": row["gastos_centavos"],
+            "parcelas_centavos": row["parcelas_centavos"],
+        }
+        for row in rows
+    }
+
+
+@instrumentar_db
+def list_saldo_acumulado(
+    competencia_inicio: str,
+    competencia_fim: str,
+    usuario_id: str,
+) -> Tuple[int, Dict[str, int]]:
+    with get_leitura(usuario_id, analitica=True) as conn:
+        inicial = _saldo_anterior(conn, usuario_id, competencia_inicio)
+        rows = conn.execute(
             """
-        )
+            SELECT competencia, saldo_centavos
+            FROM saldo_acumulado
+            WHERE usuario_id = ? AND competencia BETWEEN ? AND ?
+            """,
+            (usuario_id, competencia_inicio, competencia_fim),
+        ).fetchall()
+    return inicial, {row[0]: row[1] for row in rows}
 
 
-def insert_lancamento(lancamento: Dict[str, Any]) -> None:
+@instrumentar_db
+def list_resumo_mensal(usuario_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    clausulas, params = _filtros_lancamentos(usuario_id=usuario_id)
+    where = " WHERE " + " AND ".join(clausulas) if clausulas else ""
+    linhas: List[Dict[str, Any]] = []
+    for alvo in _usuarios_alvo(usuario_id):
+        with get_leitura(alvo) as conn:
+            rows = conn.execute(
+                f"""
+                SELECT
+                    usuario_id, competencia, entradas_centavos, gastos_centavos, parcelas_centavos
+                FROM resumo_mensal{where}
+                ORDER BY usuario_id, competencia
+                """,
+                params,
+            ).fetchall()
+        linhas.extend(dict(row) for row in rows)
+    if SHARDS_ATIVOS and usuario_id is None:
+        linhas.sort(key=lambda linha: (linha["usuario_id"], linha["competencia"]))
+    return linhas
+
+
+LANCAMENTO_INSERT = """
+    INSERT INTO lancamentos (
+        id,
+        usuario_id,
+        nome,
+        data,
+        competencia,
+        tipo_lancamento,
+        categoria_id,
+        forma_pagamento_id,
+        valor_centavos,
+        pago,
+        valor_total_centavos,
+        numero_parcelas
+    ) VALUES (
+        :id,
+        :usuario_id,
+        :nome,
+        :data,
+        :competencia,
+        :tipo_lancamento,
+        :categoria_id,
+        :forma_pagamento_id,
+        :valor_centavos,
+        :pago,
+        :valor_total_centavos,
+        :numero_parcelas
+    )
+"""
+
+
+def _lancamento_params(lancamento: Dict[str, Any]) -> Dict[str, Any]:
     pago = None
     if "pago" in lancamento:
         pago = 1 if lancamento["pago"] else 0
 
-    payload = {
+    return {
         "id": lancamento["id"],
         "usuario_id": lancamento["usuario_id"],
         "nome": lancamento["nome"],
@@ -84,106 +779,285 @@ def insert_lancamento(lancamento: Dict[str, Any]) -> None:
         "tipo_lancamento": lancamento["tipo_lancamento"],
         "categoria_id": lancamento.get("categoria_id"),
         "forma_pagamento_id": lancamento.get("forma_pagamento_id"),
-        "valor": lancamento.get("valor"),
+        "valor_centavos": _centavos_ou_none(lancamento.get("valor")),
         "pago": pago,
-        "valor_total": lancamento.get("valor_total"),
+        "valor_total_centavos": _centavos_ou_none(lancamento.get("valor_total")),
         "numero_parcelas": lancamento.get("numero_parcelas"),
     }
 
-    with get_connection() as conn:
-        conn.execute(
-            """
-            INSERT INTO lancamentos (
-                id,
-                usuario_id,
-                nome,
-                data,
-                competencia,
-                tipo_lancamento,
-                categoria_id,
-                forma_pagamento_id,
-                valor,
-                pago,
-                valor_total,
-                numero_parcelas
-            ) VALUES (
-                :id,
-                :usuario_id,
-                :nome,
-                :data,
-                :competencia,
-                :tipo_lancamento,
-                :categoria_id,
-                :forma_pagamento_id,
-                :valor,
-                :pago,
-                :valor_total,
-                :numero_parcelas
-            )
-            """,
-            payload,
+
+def _competencias_fechadas(
+    conn: sqlite3.Connection,
+    usuario_id: str,
+    competencia_inicio: str,
+    competencia_fim: str,
+) -> Set[str]:
+    rows = conn.execute(
+        """
+        SELECT competencia
+        FROM fechamentos
+        WHERE usuario_id = ? AND competencia BETWEEN ? AND ?
+        """,
+        (usuario_id, competencia_inicio, competencia_fim),
+    ).fetchall()
+    return {row[0] for row in rows}
+
+
+def _exigir_periodos_abertos(
+    conn: sqlite3.Connection,
+    usuario_id: str,
+    competencias: Sequence[str],
+) -> None:
+    if not competencias:
+        return
+    fechadas = _competencias_fechadas(conn, usuario_id, min(competencias), max(competencias))
+    fechadas.intersection_update(competencias)
+    if fechadas:
+        raise PeriodoFechadoError(sorted(fechadas))
+
+
+@instrumentar_db
+def insert_lancamento(lancamento: Dict[str, Any]) -> None:
+    deltas = resumo_deltas(lancamento)
+    with get_connection(lancamento["usuario_id"]) as conn:
+        conn.execute(LANCAMENTO_INSERT, _lancamento_params(lancamento))
+        _aplicar_resumo(conn, lancamento["usuario_id"], deltas)
+        _exigir_periodos_abertos(conn, lancamento["usuario_id"], [item[0] for item in deltas])
+    _versoes.incrementar(lancamento["usuario_id"])
+
+
+def _por_shard(
+    lancamentos: Sequence[Dict[str, Any]],
+) -> List[Tuple[Optional[str], Sequence[Dict[str, Any]]]]:
+    if not SHARDS_ATIVOS:
+        return [(None, lancamentos)]
+    grupos: Dict[str, List[Dict[str, Any]]] = {}
+    for lancamento in lancamentos:
+        grupos.setdefault(lancamento["usuario_id"], []).append(lancamento)
+    return list(grupos.items())
+
+
+def _gravar_lancamentos(
+    conn: sqlite3.Connection,
+    lancamentos: Sequence[Dict[str, Any]],
+) -> Set[str]:
+    deltas_por_usuario: Dict[str, Dict[str, List[int]]] = {}
+    for lancamento in lancamentos:
+        acumular_deltas(
+            resumo_deltas(lancamento),
+            deltas_por_usuario.setdefault(lancamento["usuario_id"], {}),
         )
 
+    conn.executemany(LANCAMENTO_INSERT, [_lancamento_params(item) for item in lancamentos])
+    for usuario_id, totais in deltas_por_usuario.items():
+        _aplicar_resumo(
+            conn,
+            usuario_id,
+            [(competencia, *valores) for competencia, valores in totais.items()],
+        )
+        _exigir_periodos_abertos(conn, usuario_id, list(totais))
+    return set(deltas_por_usuario)
 
-def list_lancamentos() -> List[Dict[str, Any]]:
-    with get_connection() as conn:
-        conn.row_factory = sqlite3.Row
-        rows = conn.execute(
-            """
-            SELECT
-                id,
-                usuario_id,
-                nome,
-                data,
-                competencia,
-                tipo_lancamento,
-                categoria_id,
-                forma_pagamento_id,
-                valor,
-                pago,
-                valor_total,
-                numero_parcelas
-            FROM lancamentos
-            """
-        ).fetchall()
 
-    itens: List[Dict[str, Any]] = []
-    for row in rows:
-        item: Dict[str, Any] = {
-            "id": row["id"],
-            "usuario_id": row["usuario_id"],
-            "nome": row["nome"],
-            "data": row["data"],
-            "competencia": row["competencia"],
-            "tipo_lancamento": row["tipo_lancamento"],
-        }
+@instrumentar_db
+def insert_lancamentos(lancamentos: Sequence[Dict[str, Any]]) -> int:
+    usuarios: Set[str] = set()
+    for usuario_id, grupo in _por_shard(lancamentos):
+        with get_connection(usuario_id) as conn:
+            usuarios.update(_gravar_lancamentos(conn, grupo))
+    for usuario_id in usuarios:
+        _versoes.incrementar(usuario_id)
+    return len(lancamentos)
 
-        tipo = row["tipo_lancamento"]
-        if tipo == "ENTRADA":
-            item["valor"] = row["valor"]
-        elif tipo in {"FIXO", "VARIAVEL"}:
-            item["categoria_id"] = row["categoria_id"]
-            item["forma_pagamento_id"] = row["forma_pagamento_id"]
-            item["valor"] = row["valor"]
-            item["pago"] = bool(row["pago"])
-        elif tipo == "PARCELADO":
-            item["categoria_id"] = row["categoria_id"]
-            item["forma_pagamento_id"] = row["forma_pagamento_id"]
-            item["valor_total"] = row["valor_total"]
-            item["numero_parcelas"] = row["numero_parcelas"]
 
-        itens.append(item)
+ORDEM_LANCAMENTO = attrgetter("competencia", "data", "id")
+
+LANCAMENTO_COLUNAS = """
+    id,
+    usuario_id,
+    nome,
+    data,
+    competencia,
+    tipo_lancamento,
+    categoria_id,
+    forma_pagamento_id,
+    valor_centavos,
+    pago,
+    valor_total_centavos,
+    numero_parcelas
+"""
+
+
+def _filtros_lancamentos(
+    usuario_id: Optional[str] = None,
+    competencia_inicio: Optional[str] = None,
+    competencia_fim: Optional[str] = None,
+    tipo_lancamento: Optional[str] = None,
+    categoria_id: Optional[str] = None,
+    pago: Optional[bool] = None,
+) -> Tuple[List[str], List[Any]]:
+    clausulas: List[str] = []
+    params: List[Any] = []
+    if usuario_id is not None:
+        clausulas.append("usuario_id = ?")
+        params.append(usuario_id)
+    if competencia_inicio is not None:
+        clausulas.append("competencia >= ?")
+        params.append(competencia_inicio)
+    if competencia_fim is not None:
+        clausulas.append("competencia <= ?")
+        params.append(competencia_fim)
+    if tipo_lancamento is not None:
+        clausulas.append("tipo_lancamento = ?")
+        params.append(tipo_lancamento)
+    if categoria_id is not None:
+        clausulas.append("categoria_id = ?")
+        params.append(categoria_id)
+    if pago is not None:
+        clausulas.append("pago = ?")
+        params.append(1 if pago else 0)
+    return clausulas, params
+
+
+def _select_lancamentos(clausulas: Sequence[str]) -> str:
+    query = f"SELECT {LANCAMENTO_COLUNAS} FROM lancamentos"
+    if clausulas:
+        query += " WHERE " + " AND ".join(clausulas)
+    return query + " ORDER BY competencia, data, id"
+
+
+def _consulta_lancamentos(
+    usuario_id: Optional[str],
+    competencia_inicio: Optional[str],
+    competencia_fim: Optional[str],
+    tipo_lancamento: Optional[str],
+    categoria_id: Optional[str],
+    pago: Optional[bool],
+    apos: Optional[Tuple[str, str, str]],
+    limite: Optional[int],
+) -> Tuple[str, List[Any]]:
+    clausulas, params = _filtros_lancamentos(
+        usuario_id=usuario_id,
+        competencia_inicio=competencia_inicio,
+        competencia_fim=competencia_fim,
+        tipo_lancamento=tipo_lancamento,
+        categoria_id=categoria_id,
+        pago=pago,
+    )
+    if apos is not None:
+        clausulas.append("(competencia, data, id) > (?, ?, ?)")
+        params.extend(apos)
+
+    query = _select_lancamentos(clausulas)
+    if limite is not None:
+        query += " LIMIT ?"
+        params.append(limite)
+    return query, params
+
+
+@instrumentar_db
+def list_lancamentos(
+    usuario_id: Optional[str] = None,
+    competencia_inicio: Optional[str] = None,
+    competencia_fim: Optional[str] = None,
+    tipo_lancamento: Optional[str] = None,
+    categoria_id: Optional[str] = None,
+    pago: Optional[bool] = None,
+    apos: Optional[Tuple[str, str, str]] = None,
+    limite: Optional[int] = None,
+) -> List[Lancamento]:
+    query, params = _consulta_lancamentos(
+        usuario_id,
+        competencia_inicio,
+        competencia_fim,
+        tipo_lancamento,
+        categoria_id,
+        pago,
+        apos,
+        limite,
+    )
+    listas: List[List[Lancamento]] = []
+    for alvo in _usuarios_alvo(usuario_id):
+        with get_leitura(alvo, analitica=True) as conn:
+            conn.row_factory = None
+            rows = conn.execute(query, params).fetchall()
+        listas.append(list(map(Lancamento._make, rows)))
+
+    if len(listas) == 1:
+        return listas[0]
+    mescladas = heapq.merge(*listas, key=ORDEM_LANCAMENTO)
+    return list(islice(mescladas, limite)) if limite is not None else list(mescladas)
+
+
+def _lotes_lancamentos(
+    usuario_id: Optional[str],
+    filtros: Dict[str, Any],
+    tamanho_lote: int,
+) -> Iterator[List[Lancamento]]:
+    apos: Optional[Tuple[str, str, str]] = None
+    while True:
+        query, params = _consulta_lancamentos(**filtros, apos=apos, limite=tamanho_lote)
+        with get_leitura(usuario_id, analitica=True) as conn:
+            conn.row_factory = None
+            lote = list(map(Lancamento._make, conn.execute(query, params).fetchall()))
+        if lote:
+            yield lote
+        if len(lote) < tamanho_lote:
+            return
+        apos = ORDEM_LANCAMENTO(lote[-1])
+
+
+@instrumentar_db
+def iter_lancamentos(
+    usuario_id: Optional[str] = None,
+    competencia_inicio: Optional[str] = None,
+    competencia_fim: Optional[str] = None,
+    tipo_lancamento: Optional[str] = None,
+    categoria_id: Optional[str] = None,
+    pago: Optional[bool] = None,
+    tamanho_lote: int = EXPORTACAO_TAMANHO_LOTE,
+) -> Iterator[List[Lancamento]]:
+    filtros = {
+        "usuario_id": usuario_id,
+        "competencia_inicio": competencia_inicio,
+        "competencia_fim": competencia_fim,
+        "tipo_lancamento": tipo_lancamento,
+        "categoria_id": categoria_id,
+        "pago": pago,
+    }
+
+    alvos = _usuarios_alvo(usuario_id)
+    if len(alvos) == 1:
+        yield from _lotes_lancamentos(alvos[0], filtros, tamanho_lote)
+        return
+
+    fontes = [_lotes_lancamentos(alvo, filtros, tamanho_lote) for alvo in alvos]
+    mescladas = heapq.merge(*map(chain.from_iterable, fontes), key=ORDEM_LANCAMENTO)
+    while True:
+        lote = list(islice(mescladas, tamanho_lote))
+        if not lote:
+            break
+        yield lote
 
-    return itens
 
+@instrumentar_db
+def list_usuarios_lancamentos() -> List[str]:
+    usuarios: Dict[str, None] = {}
+    for alvo in _usuarios_alvo(None):
+        with get_leitura(alvo) as conn:
+            rows = conn.execute("SELECT DISTINCT usuario_id FROM lancamentos").fetchall()
+        usuarios.update(dict.fromkeys(row[0] for row in rows))
+    return list(usuarios)
 
+
+@instrumentar_db
 def insert_categoria(categoria: Dict[str, Any]) -> None:
     payload = {
         "id": categoria["id"],
         "usuario_id": categoria["usuario_id"],
         "nome": categoria["nome"],
     }
-    with get_connection() as conn:
+    with get_connection(payload["usuario_id"]) as conn:
         conn.execute(
             """
             INSERT INTO categorias (id, usuario_id, nome)
@@ -191,43 +1065,54 @@ def insert_categoria(categoria: Dict[str, Any]) -> None:
             """,
             payload,
         )
+    _referencias.definir("categorias", payload["usuario_id"], payload["id"], payload["nome"])
+    _versoes.incrementar(payload["usuario_id"])
 
 
-def list_categorias() -> List[Dict[str, Any]]:
-    with get_connection() as conn:
-        conn.row_factory = sqlite3.Row
-        rows = conn.execute(
-            """
-            SELECT id, usuario_id, nome
-            FROM categorias
-            """
-        ).fetchall()
-    return [dict(row) for row in rows]
+@instrumentar_db
+def list_categorias(usuario_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    where = "" if usuario_id is None else " WHERE usuario_id = ?"
+    params = () if usuario_id is None else (usuario_id,)
+    categorias: List[Dict[str, Any]] = []
+    for alvo in _usuarios_alvo(usuario_id):
+        with get_leitura(alvo) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                f"""
+                SELECT id, usuario_id, nome
+                FROM categorias{where}
+                """,
+                params,
+            ).fetchall()
+        categorias.extend(dict(row) for row in rows)
+    return categorias
 
 
-def get_categoria(categoria_id: str) -> Optional[Dict[str, Any]]:
-    with get_connection() as conn:
+@instrumentar_db
+def get_categoria(categoria_id: str, usuario_id: str) -> Optional[Dict[str, Any]]:
+    with get_leitura(usuario_id) as conn:
         conn.row_factory = sqlite3.Row
         row = conn.execute(
             """
             SELECT id, usuario_id, nome
             FROM categorias
-            WHERE id = ?
+            WHERE id = ? AND usuario_id = ?
             """,
-            (categoria_id,),
+            (categoria_id, usuario_id),
         ).fetchone()
     return dict(row) if row else None
 
 
-def update_categoria(categoria_id: str, nome: str) -> Optional[Dict[str, Any]]:
-    with get_connection() as conn:
+@instrumentar_db
+def update_categoria(categoria_id: str, usuario_id: str, nome: str) -> Optional[Dict[str, Any]]:
+    with get_connection(usuario_id, criar=False) as conn:
         cursor = conn.execute(
             """
             UPDATE categorias
             SET nome = ?
-            WHERE id = ?
+            WHERE id = ? AND usuario_id = ?
             """,
-            (nome, categoria_id),
+            (nome, categoria_id, usuario_id),
         )
         if cursor.rowcount == 0:
             return None
@@ -236,33 +1121,42 @@ def update_categoria(categoria_id: str, nome: str) -> Optional[Dict[str, Any]]:
             """
             SELECT id, usuario_id, nome
             FROM categorias
-            WHERE id = ?
+            WHERE id = ? AND usuario_id = ?
             """,
-            (categoria_id,),
+            (categoria_id, usuario_id),
         ).fetchone()
-    return dict(row) if row else None
+    if row is None:
+        return None
+    _referencias.definir("categorias", usuario_id, row["id"], row["nome"])
+    _versoes.incrementar(usuario_id)
+    return dict(row)
 
 
-def delete_categoria(categoria_id: str) -> bool:
-    with get_connection() as conn:
+@instrumentar_db
+def delete_categoria(categoria_id: str, usuario_id: str) -> bool:
+    with get_connection(usuario_id, criar=False) as conn:
         cursor = conn.execute(
             """
             DELETE FROM categorias
-            WHERE id = ?
+            WHERE id = ? AND usuario_id = ?
             """,
-            (categoria_id,),
+            (categoria_id, usuario_id),
         )
         removido = cursor.rowcount > 0
+    if removido:
+        _referencias.remover("categorias", categoria_id, usuario_id)
+        _versoes.incrementar(usuario_id)
     return removido
 
 
+@instrumentar_db
 def insert_forma_pagamento(forma_pagamento: Dict[str, Any]) -> None:
     payload = {
         "id": forma_pagamento["id"],
         "usuario_id": forma_pagamento["usuario_id"],
         "nome": forma_pagamento["nome"],
     }
-    with get_connection() as conn:
+    with get_connection(payload["usuario_id"]) as conn:
         conn.execute(
             """
             INSERT INTO formas_pagamento (
@@ -277,10 +1171,18 @@ def insert_forma_pagamento(forma_pagamento: Dict[str, Any]) -> None:
             """,
             payload,
         )
+    _referencias.definir(
+        "formas_pagamento",
+        payload["usuario_id"],
+        payload["id"],
+        payload["nome"],
+    )
+    _versoes.incrementar(payload["usuario_id"])
 
 
+@instrumentar_db
 def list_formas_pagamento(usuario_id: str) -> List[Dict[str, Any]]:
-    with get_connection() as conn:
+    with get_leitura(usuario_id) as conn:
         conn.row_factory = sqlite3.Row
         rows = conn.execute(
             """
@@ -293,8 +1195,9 @@ def list_formas_pagamento(usuario_id: str) -> List[Dict[str, Any]]:
     return [dict(row) for row in rows]
 
 
+@instrumentar_db
 def get_forma_pagamento(forma_pagamento_id: str, usuario_id: str) -> Optional[Dict[str, Any]]:
-    with get_connection() as conn:
+    with get_leitura(usuario_id) as conn:
         conn.row_factory = sqlite3.Row
         row = conn.execute(
             """
@@ -307,12 +1210,13 @@ def get_forma_pagamento(forma_pagamento_id: str, usuario_id: str) -> Optional[Di
     return dict(row) if row else None
 
 
+@instrumentar_db
 def update_forma_pagamento(
     forma_pagamento_id: str,
     usuario_id: str,
     nome: str,
 ) -> Optional[Dict[str, Any]]:
-    with get_connection() as conn:
+    with get_connection(usuario_id, criar=False) as conn:
         conn.row_factory = sqlite3.Row
         existing = conn.execute(
             """
@@ -340,11 +1244,16 @@ def update_forma_pagamento(
             """,
             (forma_pagamento_id, usuario_id),
         ).fetchone()
-    return dict(row) if row else None
+    if row is None:
+        return None
+    _referencias.definir("formas_pagamento", usuario_id, row["id"], row["nome"])
+    _versoes.incrementar(usuario_id)
+    return dict(row)
 
 
+@instrumentar_db
 def delete_forma_pagamento(forma_pagamento_id: str, usuario_id: str) -> bool:
-    with get_connection() as conn:
+    with get_connection(usuario_id, criar=False) as conn:
         cursor = conn.execute(
             """
             DELETE FROM formas_pagamento
@@ -352,72 +1261,406 @@ def delete_forma_pagamento(forma_pagamento_id: str, usuario_id: str) -> bool:
             """,
             (forma_pagamento_id, usuario_id),
         )
-    return cursor.rowcount > 0
+    removido = cursor.rowcount > 0
+    if removido:
+        _referencias.remover("formas_pagamento", forma_pagamento_id, usuario_id)
+        _versoes.incrementar(usuario_id)
+    return removido
+
+
+def _carregar_referencias(tabela: str, usuario_id: str) -> Dict[str, str]:
+    with get_leitura(usuario_id) as conn:
+        rows = conn.execute(
+            f"""
+            SELECT id, nome
+            FROM {tabela}
+            WHERE usuario_id = ?
+            """,
+            (usuario_id,),
+        ).fetchall()
+    return {row["id"]: row["nome"] for row in rows}
+
 
+_referencias = ReferenciaCache(
+    _carregar_referencias,
+    tamanho_maximo=CACHE_REFERENCIAS_TAMANHO,
+    ttl_segundos=CACHE_REFERENCIAS_TTL,
+)
 
+
+def estatisticas_cache_referencias() -> Dict[str, Any]:
+    return _referencias.estatisticas()
+
+
+@instrumentar_db
 def categoria_existe(categoria_id: str, usuario_id: str) -> bool:
-    with get_connection() as conn:
+    return categoria_id in _referencias.obter("categorias", usuario_id)
+
+
+@instrumentar_db
+def forma_pagamento_existe(forma_pagamento_id: str, usuario_id: str) -> bool:
+    return forma_pagamento_id in _referencias.obter("formas_pagamento", usuario_id)
+
+
+@instrumentar_db
+def categorias_existentes(categoria_ids: Sequence[str], usuario_id: str) -> Set[str]:
+    return _referencias.obter("categorias", usuario_id).keys() & set(categoria_ids)
+
+
+@instrumentar_db
+def formas_pagamento_existentes(forma_pagamento_ids: Sequence[str], usuario_id: str) -> Set[str]:
+    return _referencias.obter("formas_pagamento", usuario_id).keys() & set(forma_pagamento_ids)
+
+
+COMPETENCIA_INDICE_SQL = (
+    "(CAST(substr(competencia, 1, 4) AS INTEGER) * 12"
+    " + CAST(substr(competencia, 6, 2) AS INTEGER) - 1)"
+)
+
+
+@instrumentar_db
+def consolidacao_periodo(
+    competencia_inicio: str,
+    competencia_fim: str,
+    usuario_id: str,
+) -> Dict[str, Any]:
+    params = {
+        "usuario_id": usuario_id,
+        "inicio": competencia_inicio,
+        "fim": competencia_fim,
+        "inicio_indice": competencia_to_index(competencia_inicio),
+    }
+    with get_leitura(usuario_id, analitica=True) as conn:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            f"""
+            SELECT
+                tipo_lancamento,
+                competencia,
+                valor_total_centavos,
+                numero_parcelas,
+                COALESCE(SUM(valor_centavos), 0) AS total,
+                COUNT(*) AS quantidade
+            FROM lancamentos
+            WHERE usuario_id = :usuario_id
+              AND competencia <= :fim
+              AND (
+                    (
+                        competencia >= :inicio
+                        AND tipo_lancamento IN ('ENTRADA', 'FIXO', 'VARIAVEL')
+                    )
+                    OR (
+                        tipo_lancamento = 'PARCELADO'
+                        AND {COMPETENCIA_INDICE_SQL} + numero_parcelas > :inicio_indice
+                    )
+              )
+            GROUP BY tipo_lancamento, competencia, valor_total_centavos, numero_parcelas
+            """,
+            params,
+        ).fetchall()
+
+    entradas: Dict[str, int] = {}
+    gastos: Dict[str, int] = {}
+    parcelados: List[Dict[str, Any]] = []
+    for row in rows:
+        tipo = row["tipo_lancamento"]
+        competencia = row["competencia"]
+        if tipo == "ENTRADA":
+            entradas[competencia] = entradas.get(competencia, 0) + row["total"]
+        elif tipo == "PARCELADO":
+            parcelados.append(
+                {
+                    "competencia": competencia,
+                    "valor_total_centavos": row["valor_total_centavos"],
+                    "numero_parcelas": row["numero_parcelas"],
+                    "quantidade": row["quantidade"],
+                }
+            )
+        else:
+            gastos[competencia] = gastos.get(competencia, 0) + row["total"]
+
+    return {"entradas": entradas, "gastos": gastos, "parcelados": parcelados}
+
+
+RECORRENCIA_COLUNAS = """
+    id,
+    usuario_id,
+    nome,
+    tipo_lancamento,
+    categoria_id,
+    forma_pagamento_id,
+    valor_centavos,
+    dia,
+    competencia_inicio,
+    competencia_fim
+"""
+
+RECORRENCIA_INSERT = """
+    INSERT INTO recorrencias (
+        id,
+        usuario_id,
+        nome,
+        tipo_lancamento,
+        categoria_id,
+        forma_pagamento_id,
+        valor_centavos,
+        dia,
+        competencia_inicio,
+        competencia_fim
+    ) VALUES (
+        :id,
+        :usuario_id,
+        :nome,
+        :tipo_lancamento,
+        :categoria_id,
+        :forma_pagamento_id,
+        :valor_centavos,
+        :dia,
+        :competencia_inicio,
+        :competencia_fim
+    )
+"""
+
+RECORRENCIAS_IDS_LOTE = 500
+
+
+@instrumentar_db
+def insert_recorrencia(recorrencia: Dict[str, Any]) -> None:
+    payload = {
+        "id": recorrencia["id"],
+        "usuario_id": recorrencia["usuario_id"],
+        "nome": recorrencia["nome"],
+        "tipo_lancamento": recorrencia["tipo_lancamento"],
+        "categoria_id": recorrencia.get("categoria_id"),
+        "forma_pagamento_id": recorrencia.get("forma_pagamento_id"),
+        "valor_centavos": para_centavos(recorrencia["valor"]),
+        "dia": recorrencia["dia"],
+        "competencia_inicio": recorrencia["competencia_inicio"],
+        "competencia_fim": recorrencia.get("competencia_fim"),
+    }
+    with get_connection(payload["usuario_id"]) as conn:
+        conn.execute(RECORRENCIA_INSERT, payload)
+    _versoes.incrementar(payload["usuario_id"])
+
+
+def _recorrencias_ativas(
+    conn: sqlite3.Connection,
+    usuario_id: str,
+    competencia_inicio: Optional[str] = None,
+    competencia_fim: Optional[str] = None,
+) -> List[Recorrencia]:
+    clausulas = ["usuario_id = ?"]
+    params: List[Any] = [usuario_id]
+    if competencia_fim is not None:
+        clausulas.append("competencia_inicio <= ?")
+        params.append(competencia_fim)
+    if competencia_inicio is not None:
+        clausulas.append("(competencia_fim IS NULL OR competencia_fim >= ?)")
+        params.append(competencia_inicio)
+    conn.row_factory = None
+    cursor = conn.execute(
+        f"""
+        SELECT {RECORRENCIA_COLUNAS}
+        FROM recorrencias
+        WHERE {" AND ".join(clausulas)}
+        ORDER BY competencia_inicio, id
+        """,
+        params,
+    )
+    return list(map(Recorrencia._make, cursor))
+
+
+@instrumentar_db
+def list_recorrencias(
+    usuario_id: str,
+    competencia_inicio: Optional[str] = None,
+    competencia_fim: Optional[str] = None,
+) -> List[Recorrencia]:
+    with get_leitura(usuario_id) as conn:
+        return _recorrencias_ativas(conn, usuario_id, competencia_inicio, competencia_fim)
+
+
+@instrumentar_db
+def get_recorrencia(recorrencia_id: str, usuario_id: str) -> Optional[Recorrencia]:
+    with get_leitura(usuario_id) as conn:
+        conn.row_factory = None
         row = conn.execute(
-            """
-            SELECT 1
-            FROM categorias
+            f"""
+            SELECT {RECORRENCIA_COLUNAS}
+            FROM recorrencias
             WHERE id = ? AND usuario_id = ?
-            LIMIT 1
             """,
-            (categoria_id, usuario_id),
+            (recorrencia_id, usuario_id),
         ).fetchone()
-    return row is not None
+    return Recorrencia._make(row) if row else None
 
 
-def forma_pagamento_existe(forma_pagamento_id: str, usuario_id: str) -> bool:
-    with get_connection() as conn:
-        row = conn.execute(
+@instrumentar_db
+def delete_recorrencia(recorrencia_id: str, usuario_id: str) -> bool:
+    with get_connection(usuario_id, criar=False) as conn:
+        cursor = conn.execute(
             """
-            SELECT 1
-            FROM formas_pagamento
+            DELETE FROM recorrencias
             WHERE id = ? AND usuario_id = ?
-            LIMIT 1
             """,
-            (forma_pagamento_id, usuario_id),
+            (recorrencia_id, usuario_id),
+        )
+        removido = cursor.rowcount > 0
+    if removido:
+        _versoes.incrementar(usuario_id)
+    return removido
+
+
+def _ocorrencias_pendentes(
+    conn: sqlite3.Connection,
+    regras: Sequence[Recorrencia],
+    competencia_inicio: str,
+    competencia_fim: str,
+) -> List[Dict[str, Any]]:
+    fechadas = (
+        _competencias_fechadas(conn, regras[0].usuario_id, competencia_inicio, competencia_fim)
+        if regras
+        else set()
+    )
+    candidatas = [
+        lancamento
+        for regra in regras
+        for lancamento in ocorrencias(regra, competencia_inicio, competencia_fim)
+        if lancamento["competencia"] not in fechadas
+    ]
+    existentes: Set[str] = set()
+    for inicio in range(0, len(candidatas), RECORRENCIAS_IDS_LOTE):
+        ids = [item["id"] for item in candidatas[inicio : inicio + RECORRENCIAS_IDS_LOTE]]
+        marcadores = ", ".join("?" * len(ids))
+        existentes.update(
+            row[0]
+            for row in conn.execute(f"SELECT id FROM lancamentos WHERE id IN ({marcadores})", ids)
+        )
+    return [item for item in candidatas if item["id"] not in existentes]
+
+
+@instrumentar_db
+def materializar_recorrencias(
+    usuario_id: str,
+    competencia_inicio: str,
+    competencia_fim: str,
+) -> int:
+    with get_connection(usuario_id, criar=False) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        regras = _recorrencias_ativas(conn, usuario_id, competencia_inicio, competencia_fim)
+        pendentes = _ocorrencias_pendentes(conn, regras, competencia_inicio, competencia_fim)
+        if pendentes:
+            _gravar_lancamentos(conn, pendentes)
+    if pendentes:
+        _versoes.incrementar(usuario_id)
+    return len(pendentes)
+
+
+@instrumentar_db
+def projecao_recorrencias(
+    competencia_inicio: str,
+    competencia_fim: str,
+    usuario_id: str,
+) -> Dict[str, Dict[str, int]]:
+    with get_leitura(usuario_id, analitica=True) as conn:
+        regras = _recorrencias_ativas(conn, usuario_id, competencia_inicio, competencia_fim)
+        pendentes = _ocorrencias_pendentes(conn, regras, competencia_inicio, competencia_fim)
+
+    meses: Dict[str, List[int]] = {}
+    for lancamento in pendentes:
+        acumular_deltas(resumo_deltas(lancamento), meses)
+    return {
+        competencia: {
+            "entradas_centavos": entradas,
+            "gastos_centavos": gastos,
+            "parcelas_centavos": parcelas,
+        }
+        for competencia, (entradas, gastos, parcelas) in meses.items()
+    }
+
+
+FECHAMENTO_COLUNAS = """
+    usuario_id,
+    competencia,
+    entradas_centavos,
+    gastos_centavos,
+    parcelas_centavos,
+    saldo_centavos,
+    fechado_em
+"""
+
+
+@instrumentar_db
+def fechar_competencia(competencia: str, usuario_id: str) -> Dict[str, Any]:
+    with get_connection(usuario_id) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            """
+            SELECT entradas_centavos, gastos_centavos, parcelas_centavos
+            FROM resumo_mensal
+            WHERE usuario_id = ? AND competencia = ?
+            """,
+            (usuario_id, competencia),
         ).fetchone()
-    return row is not None
+        entradas, gastos, parcelas = tuple(row) if row is not None else (0, 0, 0)
+        fechamento = {
+            "usuario_id": usuario_id,
+            "competencia": competencia,
+            "entradas_centavos": entradas,
+            "gastos_centavos": gastos,
+            "parcelas_centavos": parcelas,
+            "saldo_centavos": entradas - gastos - parcelas,
+            "fechado_em": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        conn.execute(
+            f"""
+            INSERT INTO fechamentos ({FECHAMENTO_COLUNAS})
+            VALUES (
+                :usuario_id,
+                :competencia,
+                :entradas_centavos,
+                :gastos_centavos,
+                :parcelas_centavos,
+                :saldo_centavos,
+                :fechado_em
+            )
+            """,
+            fechamento,
+        )
+    _versoes.incrementar(usuario_id)
+    return fechamento
 
 
-def _sum_valores_por_tipo(competencia: str, tipos: Sequence[str]) -> float:
-    placeholders = ", ".join("?" for _ in tipos)
-    query = f"""
-        SELECT COALESCE(SUM(valor), 0)
-        FROM lancamentos
-        WHERE competencia = ?
-          AND tipo_lancamento IN ({placeholders})
-    """
-    params = [competencia, *tipos]
-    with get_connection() as conn:
-        row = conn.execute(query, params).fetchone()
-    return float(row[0] or 0)
+@instrumentar_db
+def get_fechamento(competencia: str, usuario_id: str) -> Optional[Dict[str, Any]]:
+    with get_leitura(usuario_id, analitica=True) as conn:
+        conn.row_factory = sqlite3.Row
+        row = conn.execute(
+            f"""
+            SELECT {FECHAMENTO_COLUNAS}
+            FROM fechamentos
+            WHERE usuario_id = ? AND competencia = ?
+            """,
+            (usuario_id, competencia),
+        ).fetchone()
+    return dict(row) if row else None
 
 
-def list_parcelados_ate_competencia(competencia: str) -> List[Dict[str, Any]]:
-    with get_connection() as conn:
+@instrumentar_db
+def list_fechamentos(
+    usuario_id: str,
+    competencia_inicio: str = "0000-01",
+    competencia_fim: str = "9999-12",
+) -> List[Dict[str, Any]]:
+    with get_leitura(usuario_id, analitica=True) as conn:
         conn.row_factory = sqlite3.Row
         rows = conn.execute(
-            """
-            SELECT competencia, valor_total, numero_parcelas
-            FROM lancamentos
-            WHERE tipo_lancamento = 'PARCELADO'
-              AND competencia <= ?
+            f"""
+            SELECT {FECHAMENTO_COLUNAS}
+            FROM fechamentos
+            WHERE usuario_id = ? AND competencia BETWEEN ? AND ?
+            ORDER BY competencia
             """,
-            (competencia,),
+            (usuario_id, competencia_inicio, competencia_fim),
         ).fetchall()
     return [dict(row) for row in rows]
-
-
-def consolidacao_mensal(competencia: str) -> Dict[str, Any]:
-    total_entradas = _sum_valores_por_tipo(competencia, ["ENTRADA"])
-    total_gastos = _sum_valores_por_tipo(competencia, ["FIXO", "VARIAVEL"])
-    parcelados = list_parcelados_ate_competencia(competencia)
-    return {
-        "total_entradas": total_entradas,
-        "total_gastos": total_gastos,
-        "parcelados": parcelados,
-    }
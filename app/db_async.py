@@ -0,0 +1,449 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+import app.db
+from app.metricas import no_perfil
+from app.modelos import Lancamento, Recorrencia
+
+T = TypeVar("T")
+
+DB_LEITORES = int(
+    os.getenv(
+        "FINANCAS_DB_LEITORES",
+        str(max(1, min(os.cpu_count() or 1, app.db.DB_POOL_SIZE - 1))),
+    )
+)
+
+DB_ESCRITORES = (
+    max(1, int(os.getenv("FINANCAS_DB_ESCRITORES", "4"))) if app.db.SHARDS_ATIVOS else 1
+)
+
+GRUPO_COMMIT = app.db.GRUPO_COMMIT
+GRUPO_COMMIT_LATENCIA_MS = float(os.getenv("FINANCAS_GRUPO_COMMIT_LATENCIA_MS", "5"))
+GRUPO_COMMIT_MAX_LINHAS = int(os.getenv("FINANCAS_GRUPO_COMMIT_MAX_LINHAS", "256"))
+
+_leitores: Optional[ThreadPoolExecutor] = None
+_escritores: Optional[List[ThreadPoolExecutor]] = None
+_grupo: Optional["GrupoCommit"] = None
+_executores_lock = threading.Lock()
+
+
+def _executores() -> Tuple[ThreadPoolExecutor, List[ThreadPoolExecutor]]:
+    global _leitores, _escritores
+    if _leitores is None or _escritores is None:
+        with _executores_lock:
+            if _leitores is None:
+                _leitores = ThreadPoolExecutor(
+                    max_workers=DB_LEITORES,
+                    thread_name_prefix="financas-db-leitor",
+                )
+            if _escritores is None:
+                _escritores = [
+                    ThreadPoolExecutor(
+                        max_workers=1,
+                        thread_name_prefix=f"financas-db-escritor-{posicao}",
+                    )
+                    for posicao in range(DB_ESCRITORES)
+                ]
+    return _leitores, _escritores
+
+
+def _escritor(usuario_id: Optional[str] = None) -> ThreadPoolExecutor:
+    _, escritores = _executores()
+    if usuario_id is None or len(escritores) == 1:
+        return escritores[0]
+    return escritores[zlib.crc32(usuario_id.encode("utf-8")) % len(escritores)]
+
+
+def _chave_shard(lancamento: Dict[str, Any]) -> Hashable:
+    return lancamento["usuario_id"] if app.db.SHARDS_ATIVOS else None
+
+
+class GrupoCommit:
+    _FIM = object()
+
+    def __init__(
+        self,
+        gravar: Callable[[List[Dict[str, Any]]], Any],
+        latencia_ms: float,
+        max_linhas: int,
+        particionar: Optional[Callable[[Dict[str, Any]], Hashable]] = None,
+    ) -> None:
+        if max_linhas < 1:
+            raise ValueError("max_linhas deve ser maior ou igual a 1")
+        self._gravar = gravar
+        self._particionar = particionar
+        self.latencia_ms = latencia_ms
+        self.max_linhas = max_linhas
+        self._fila: "queue.Queue[Any]" = queue.Queue()
+        self._fechado = False
+        self.lotes = 0
+        self.linhas = 0
+        self._thread = threading.Thread(
+            target=self._executar,
+            name="financas-db-grupo-commit",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def enviar(self, lancamento: Dict[str, Any]) -> "Future[None]":
+        if self._fechado:
+            raise RuntimeError("grupo de commit encerrado")
+        futuro: "Future[None]" = Future()
+        self._fila.put((lancamento, futuro))
+        return futuro
+
+    def encerrar(self) -> None:
+        self._fechado = True
+        self._fila.put(self._FIM)
+        self._thread.join()
+
+    def _coletar(self, primeiro: Any) -> Tuple[List[Any], bool]:
+        lote = [primeiro]
+        prazo = time.monotonic() + self.latencia_ms / 1000
+        while len(lote) < self.max_linhas:
+            restante = prazo - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                item = self._fila.get(timeout=restante)
+            except queue.Empty:
+                break
+            if item is self._FIM:
+                return lote, True
+            lote.append(item)
+        return lote, False
+
+    def _executar(self) -> None:
+        while True:
+            item = self._fila.get()
+            if item is self._FIM:
+                return
+            lote, fim = self._coletar(item)
+            for parte in self._partes(lote):
+                self._confirmar(parte)
+            if fim:
+                return
+
+    def _partes(self, lote: List[Any]) -> List[List[Any]]:
+        if self._particionar is None:
+            return [lote]
+        partes: Dict[Hashable, List[Any]] = {}
+        for item in lote:
+            partes.setdefault(self._particionar(item[0]), []).append(item)
+        return list(partes.values())
+
+    def _confirmar(self, lote: List[Tuple[Dict[str, Any], "Future[None]"]]) -> None:
+        try:
+            self._gravar([lancamento for lancamento, _ in lote])
+        except Exception as exc:
+            if len(lote) == 1:
+                lote[0][1].set_exception(exc)
+                return
+            for item in lote:
+                self._confirmar([item])
+            return
+        self.lotes += 1
+        self.linhas += len(lote)
+        for _, futuro in lote:
+            futuro.set_result(None)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "latencia_ms": self.latencia_ms,
+            "max_linhas": self.max_linhas,
+            "lotes": self.lotes,
+            "linhas": self.linhas,
+        }
+
+
+def _gravar_lote(lancamentos: List[Dict[str, Any]]) -> None:
+    escritor = _escritor(_chave_shard(lancamentos[0]))
+    escritor.submit(app.db.insert_lancamentos, lancamentos).result()
+
+
+def _grupo_commit() -> GrupoCommit:
+    global _grupo
+    _executores()
+    if _grupo is None:
+        with _executores_lock:
+            if _grupo is None:
+                _grupo = GrupoCommit(
+                    _gravar_lote,
+                    GRUPO_COMMIT_LATENCIA_MS,
+                    GRUPO_COMMIT_MAX_LINHAS,
+                    particionar=_chave_shard,
+                )
+    return _grupo
+
+
+def estatisticas_grupo_commit() -> Optional[Dict[str, Any]]:
+    return _grupo.estatisticas() if _grupo is not None else None
+
+
+def encerrar_executores() -> None:
+    global _leitores, _escritores, _grupo
+    with _executores_lock:
+        if _grupo is not None:
+            _grupo.encerrar()
+            _grupo = None
+        for executor in [_leitores, *(_escritores or [])]:
+            if executor is not None:
+                executor.shutdown(wait=True)
+        _leitores = None
+        _escritores = None
+
+
+async def executar_leitura(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    leitores, _ = _executores()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(leitores, no_perfil(functools.partial(fn, *args, **kwargs)))
+
+
+async def _escrever(
+    usuario_id: Optional[str],
+    fn: Callable[..., T],
+    *args: Any,
+    **kwargs: Any,
+) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _escritor(usuario_id),
+        no_perfil(functools.partial(fn, *args, **kwargs)),
+    )
+
+
+async def insert_lancamento(lancamento: Dict[str, Any]) -> None:
+    if GRUPO_COMMIT:
+        await asyncio.wrap_future(_grupo_commit().enviar(lancamento))
+        return
+    await _escrever(lancamento["usuario_id"], app.db.insert_lancamento, lancamento)
+
+
+async def insert_lancamentos(lancamentos: Sequence[Dict[str, Any]]) -> int:
+    grupos: Dict[Hashable, List[Dict[str, Any]]] = {}
+    for lancamento in lancamentos:
+        grupos.setdefault(_chave_shard(lancamento), []).append(lancamento)
+    if len(grupos) <= 1:
+        chave = _chave_shard(lancamentos[0]) if lancamentos else None
+        return await _escrever(chave, app.db.insert_lancamentos, lancamentos)
+    totais = await asyncio.gather(
+        *(
+            _escrever(chave, app.db.insert_lancamentos, grupo)
+            for chave, grupo in grupos.items()
+        )
+    )
+    return sum(totais)
+
+
+async def list_lancamentos(**filtros: Any) -> List[Lancamento]:
+    return await executar_leitura(app.db.list_lancamentos, **filtros)
+
+
+async def iter_lancamentos(**filtros: Any) -> AsyncIterator[List[Lancamento]]:
+    lotes = app.db.iter_lancamentos(**filtros)
+    try:
+        while True:
+            lote = await executar_leitura(next, lotes, None)
+            if lote is None:
+                break
+            yield lote
+    finally:
+        await executar_leitura(lotes.close)
+
+
+async def get_resumo_mensal(competencia: str, usuario_id: str) -> Dict[str, int]:
+    return await executar_leitura(app.db.get_resumo_mensal, competencia, usuario_id)
+
+
+async def list_resumo_periodo(
+    competencia_inicio: str,
+    competencia_fim: str,
+    usuario_id: str,
+) -> Dict[str, Dict[str, int]]:
+    return await executar_leitura(
+        app.db.list_resumo_periodo,
+        competencia_inicio,
+        competencia_fim,
+        usuario_id,
+    )
+
+
+async def list_saldo_acumulado(
+    competencia_inicio: str,
+    competencia_fim: str,
+    usuario_id: str,
+) -> Tuple[int, Dict[str, int]]:
+    return await executar_leitura(
+        app.db.list_saldo_acumulado,
+        competencia_inicio,
+        competencia_fim,
+        usuario_id,
+    )
+
+
+async def categoria_existe(categoria_id: str, usuario_id: str) -> bool:
+    return await executar_leitura(app.db.categoria_existe, categoria_id, usuario_id)
+
+
+async def forma_pagamento_existe(forma_pagamento_id: str, usuario_id: str) -> bool:
+    return await executar_leitura(app.db.forma_pagamento_existe, forma_pagamento_id, usuario_id)
+
+
+async def categorias_existentes(categoria_ids: Sequence[str], usuario_id: str) -> Set[str]:
+    return await executar_leitura(app.db.categorias_existentes, categoria_ids, usuario_id)
+
+
+async def formas_pagamento_existentes(
+    forma_pagamento_ids: Sequence[str],
+    usuario_id: str,
+) -> Set[str]:
+    return await executar_leitura(
+        app.db.formas_pagamento_existentes,
+        forma_pagamento_ids,
+        usuario_id,
+    )
+
+
+async def insert_categoria(categoria: Dict[str, Any]) -> None:
+    await _escrever(categoria["usuario_id"], app.db.insert_categoria, categoria)
+
+
+async def list_categorias(usuario_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    return await executar_leitura(app.db.list_categorias, usuario_id)
+
+
+async def get_categoria(categoria_id: str, usuario_id: str) -> Optional[Dict[str, Any]]:
+    return await executar_leitura(app.db.get_categoria, categoria_id, usuario_id)
+
+
+async def update_categoria(
+    categoria_id: str,
+    usuario_id: str,
+    nome: str,
+) -> Optional[Dict[str, Any]]:
+    return await _escrever(usuario_id, app.db.update_categoria, categoria_id, usuario_id, nome)
+
+
+async def delete_categoria(categoria_id: str, usuario_id: str) -> bool:
+    return await _escrever(usuario_id, app.db.delete_categoria, categoria_id, usuario_id)
+
+
+async def insert_forma_pagamento(forma_pagamento: Dict[str, Any]) -> None:
+    await _escrever(forma_pagamento["usuario_id"], app.db.insert_forma_pagamento, forma_pagamento)
+
+
+async def list_formas_pagamento(usuario_id: str) -> List[Dict[str, Any]]:
+    return await executar_leitura(app.db.list_formas_pagamento, usuario_id)
+
+
+async def get_forma_pagamento(forma_pagamento_id: str, usuario_id: str) -> Optional[Dict[str, Any]]:
+    return await executar_leitura(app.db.get_forma_pagamento, forma_pagamento_id, usuario_id)
+
+
+async def update_forma_pagamento(
+    forma_pagamento_id: str,
+    usuario_id: str,
+    nome: str,
+) -> Optional[Dict[str, Any]]:
+    return await _escrever(
+        usuario_id,
+        app.db.update_forma_pagamento,
+        forma_pagamento_id,
+        usuario_id,
+        nome,
+    )
+
+
+async def delete_forma_pagamento(forma_pagamento_id: str, usuario_id: str) -> bool:
+    return await _escrever(
+        usuario_id,
+        app.db.delete_forma_pagamento,
+        forma_pagamento_id,
+        usuario_id,
+    )
+
+
+async def insert_recorrencia(recorrencia: Dict[str, Any]) -> None:
+    await _escrever(recorrencia["usuario_id"], app.db.insert_recorrencia, recorrencia)
+
+
+async def list_recorrencias(usuario_id: str) -> List[Recorrencia]:
+    return await executar_leitura(app.db.list_recorrencias, usuario_id)
+
+
+async def get_recorrencia(recorrencia_id: str, usuario_id: str) -> Optional[Recorrencia]:
+    return await executar_leitura(app.db.get_recorrencia, recorrencia_id, usuario_id)
+
+
+async def delete_recorrencia(recorrencia_id: str, usuario_id: str) -> bool:
+    return await _escrever(usuario_id, app.db.delete_recorrencia, recorrencia_id, usuario_id)
+
+
+async def materializar_recorrencias(
+    usuario_id: str,
+    competencia_inicio: str,
+    competencia_fim: str,
+) -> int:
+    return await _escrever(
+        usuario_id,
+        app.db.materializar_recorrencias,
+        usuario_id,
+        competencia_inicio,
+        competencia_fim,
+    )
+
+
+async def projecao_recorrencias(
+    competencia_inicio: str,
+    competencia_fim: str,
+    usuario_id: str,
+) -> Dict[str, Dict[str, int]]:
+    return await executar_leitura(
+        app.db.projecao_recorrencias,
+        competencia_inicio,
+        competencia_fim,
+        usuario_id,
+    )
+
+
+async def fechar_competencia(competencia: str, usuario_id: str) -> Dict[str, Any]:
+    return await _escrever(usuario_id, app.db.fechar_competencia, competencia, usuario_id)
+
+
+async def get_fechamento(competencia: str, usuario_id: str) -> Optional[Dict[str, Any]]:
+    return await executar_leitura(app.db.get_fechamento, competencia, usuario_id)
+
+
+async def list_fechamentos(
+    usuario_id: str,
+    competencia_inicio: str = "0000-01",
+    competencia_fim: str = "9999-12",
+) -> List[Dict[str, Any]]:
+    return await executar_leitura(
+        app.db.list_fechamentos,
+        usuario_id,
+        competencia_inicio,
+        competencia_fim,
+    )
@@ -1,34 +1,77 @@
 from __future__ import annotations
 
-from datetime import datetime
-from decimal import Decimal, ROUND_HALF_UP
+import base64
+import binascii
+import csv
+import hashlib
+import io
+import json
+import os
 import re
 import sqlite3
-from typing import Any, Dict, List, Optional
-from uuid import UUID, uuid4
-
-from fastapi import FastAPI, HTTPException, Response
-
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+from app import db_async
+from app.cache import RespostaCache, RespostaCacheada
+from app.calculos import (
+    competencia_to_index,
+    de_centavos,
+    index_to_competencia,
+)
+from app.codificacao import lancamentos_json
 from app.db import (
-    categoria_existe,
-    consolidacao_mensal,
-    delete_categoria,
-    delete_forma_pagamento,
-    forma_pagamento_existe,
-    get_categoria,
-    get_forma_pagamento,
+    PeriodoFechadoError,
+    check_pool,
+    close_pool,
+    consultas_lentas,
+    estatisticas_cache_referencias,
+    estatisticas_pools,
+    estatisticas_replica,
+    iniciar_replica,
     init_db,
-    insert_categoria,
-    insert_forma_pagamento,
-    insert_lancamento,
-    list_categorias,
-    list_formas_pagamento,
-    list_lancamentos,
-    update_categoria,
-    update_forma_pagamento,
+    versao_dados,
+)
+from app.metricas import (
+    PROMETHEUS_CONTENT_TYPE,
+    REGISTRO,
+    MetricasMiddleware,
+    cronometrar,
+    gauges,
+)
+from app.modelos import Lancamento
+from app.recorrencias import TIPOS_RECORRENCIA
+from app.validacao import (
+    AUSENTE,
+    Falha,
+    PayloadValidationError,
+    booleano,
+    compilar_validador,
+    data,
+    dinheiro,
+    inteiro,
+    opcao,
+    texto,
+    uuid_texto,
 )
 
-app = FastAPI(title="Financeiro B&L API", version="v1")
+
+class JSONResponseMedida(JSONResponse):
+    @cronometrar("serializacao")
+    def render(self, content: Any) -> bytes:
+        return super().render(content)
+
+
+app = FastAPI(
+    title="Financeiro B&L API",
+    version="v1",
+    default_response_class=JSONResponseMedida,
+)
+app.add_middleware(MetricasMiddleware)
 
 MOCK_USER_ID = "00000000-0000-0000-0000-000000000001"
 
@@ -37,23 +80,53 @@ COMPETENCIA_FORMATO = "%Y-%m"
 DATA_FORMATO = "%Y-%m-%d"
 COMPETENCIA_RE = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
 DATA_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
-MONEY_QUANT = Decimal("0.01")
+NUMERO_PARCELAS_MAXIMO = 600
+PERIODO_MESES_MAXIMO = 120
+ANO_RE = re.compile(r"^[0-9]{4}$")
+LISTAGEM_LIMITE_PADRAO = 100
+LISTAGEM_LIMITE_MAXIMO = 1000
+PROXIMO_CURSOR_HEADER = "X-Proximo-Cursor"
+FORMATOS_EXPORTACAO = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+LOTE_ITENS_MAXIMO = 10000
+LOTE_NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/jsonl"}
+EXPORTACAO_CSV_COLUNAS = (
+    "id",
+    "usuario_id",
+    "nome",
+    "data",
+    "competencia",
+    "tipo_lancamento",
+    "categoria_id",
+    "forma_pagamento_id",
+    "valor",
+    "pago",
+    "valor_total",
+    "numero_parcelas",
+)
 
 
-class PayloadValidationError(Exception):
-    def __init__(self, errors: List[Dict[str, Any]]) -> None:
-        super().__init__("payload validation error")
-        self.errors = errors
+CACHE_RESPOSTAS_TAMANHO = int(os.getenv("FINANCAS_CACHE_RESPOSTAS_TAMANHO", "512"))
+CACHE_RESPOSTAS_BYTES = int(os.getenv("FINANCAS_CACHE_RESPOSTAS_BYTES", str(32 * 1024 * 1024)))
+CACHE_RESPOSTAS_CORPO_MAXIMO = int(
+    os.getenv("FINANCAS_CACHE_RESPOSTAS_CORPO_MAXIMO", str(1024 * 1024))
+)
+CACHE_RESPOSTAS_CONTROLE = "private, no-cache"
+JSON_RAPIDO = os.getenv("FINANCAS_JSON_RAPIDO", "1") == "1"
+
+_respostas = RespostaCache(
+    CACHE_RESPOSTAS_TAMANHO,
+    CACHE_RESPOSTAS_BYTES,
+    CACHE_RESPOSTAS_CORPO_MAXIMO,
+)
 
 
 def _add_error(errors: List[Dict[str, Any]], loc: List[str], msg: str, err_type: str) -> None:
     errors.append({"loc": loc, "msg": msg, "type": err_type})
 
 
-def _is_number(value: Any) -> bool:
-    return isinstance(value, (int, float)) and not isinstance(value, bool)
-
-
 def _require_string(payload: Dict[str, Any], field: str, errors: List[Dict[str, Any]]) -> Optional[str]:
     if field not in payload:
         _add_error(errors, ["body", field], "campo obrigatorio", "value_error.missing")
@@ -68,274 +141,1024 @@ def _require_string(payload: Dict[str, Any], field: str, errors: List[Dict[str,
     return value
 
 
-def _require_date(
-    payload: Dict[str, Any],
-    field: str,
-    errors: List[Dict[str, Any]],
-    fmt: str,
-    pattern: re.Pattern[str],
-) -> Optional[str]:
-    value = _require_string(payload, field, errors)
-    if value is None:
-        return None
-    if not pattern.match(value):
-        _add_error(errors, ["body", field], f"formato invalido ({fmt})", "value_error")
-        return None
-    try:
-        datetime.strptime(value, fmt)
-    except ValueError:
-        _add_error(errors, ["body", field], f"formato invalido ({fmt})", "value_error")
-        return None
-    return value
+_CAMPOS_DESPESA = (
+    ("categoria_id", uuid_texto),
+    ("forma_pagamento_id", uuid_texto),
+    ("valor", dinheiro),
+    ("pago", booleano),
+)
 
 
-def _require_uuid(payload: Dict[str, Any], field: str, errors: List[Dict[str, Any]]) -> Optional[str]:
-    value = _require_string(payload, field, errors)
-    if value is None:
-        return None
-    try:
-        UUID(value)
-    except ValueError:
-        _add_error(errors, ["body", field], "uuid invalido", "value_error")
-        return None
-    return value
+_validar_lancamento = compilar_validador(
+    comuns=(
+        ("nome", texto),
+        ("data", data(DATA_FORMATO, DATA_RE)),
+        ("competencia", data(COMPETENCIA_FORMATO, COMPETENCIA_RE)),
+        (
+            "tipo_lancamento",
+            opcao(TIPOS_LANCAMENTO, Falha("tipo_lancamento invalido", "value_error")),
+        ),
+    ),
+    discriminador="tipo_lancamento",
+    por_tipo={
+        "ENTRADA": (("valor", dinheiro),),
+        "FIXO": _CAMPOS_DESPESA,
+        "VARIAVEL": _CAMPOS_DESPESA,
+        "PARCELADO": (
+            ("categoria_id", uuid_texto),
+            ("forma_pagamento_id", uuid_texto),
+            ("valor_total", dinheiro),
+            ("numero_parcelas", inteiro(1, NUMERO_PARCELAS_MAXIMO)),
+        ),
+    },
+    usuario_id=MOCK_USER_ID,
+)
 
 
-def _require_money(payload: Dict[str, Any], field: str, errors: List[Dict[str, Any]]) -> Optional[float]:
-    if field not in payload:
-        _add_error(errors, ["body", field], "campo obrigatorio", "value_error.missing")
-        return None
-    value = payload[field]
-    if not _is_number(value):
-        _add_error(errors, ["body", field], "deve ser numero", "type_error.number")
-        return None
-    if value < 0:
-        _add_error(errors, ["body", field], "deve ser maior ou igual a zero", "value_error")
-        return None
-    return float(value)
+@cronometrar("validacao")
+def _validate_payload(payload: Any) -> Dict[str, Any]:
+    return _validar_lancamento(payload)
+
+
+_validar_competencia = data(COMPETENCIA_FORMATO, COMPETENCIA_RE)
+COMPETENCIA_QUERY_INVALIDA = Falha("formato invalido (YYYY-MM)", "value_error")
+
+_validar_recorrencia = compilar_validador(
+    comuns=(
+        ("nome", texto),
+        (
+            "tipo_lancamento",
+            opcao(TIPOS_RECORRENCIA, Falha("tipo_lancamento invalido", "value_error")),
+        ),
+        ("valor", dinheiro),
+        ("dia", inteiro(1, 31)),
+        ("competencia_inicio", _validar_competencia),
+    ),
+    discriminador="tipo_lancamento",
+    por_tipo={
+        "ENTRADA": (),
+        "FIXO": (
+            ("categoria_id", uuid_texto),
+            ("forma_pagamento_id", uuid_texto),
+        ),
+    },
+    usuario_id=MOCK_USER_ID,
+)
 
 
-def _require_int(payload: Dict[str, Any], field: str, errors: List[Dict[str, Any]]) -> Optional[int]:
-    if field not in payload:
-        _add_error(errors, ["body", field], "campo obrigatorio", "value_error.missing")
-        return None
-    value = payload[field]
-    if not isinstance(value, int) or isinstance(value, bool):
-        _add_error(errors, ["body", field], "deve ser inteiro", "type_error.integer")
-        return None
-    return value
+@cronometrar("validacao")
+def _validate_recorrencia_payload(payload: Any) -> Dict[str, Any]:
+    recorrencia = _validar_recorrencia(payload)
+    errors: List[Dict[str, Any]] = []
+    fim = payload.get("competencia_fim")
+    recorrencia["competencia_fim"] = None
+    if fim is not None:
+        valor = _validar_competencia(fim)
+        if type(valor) is Falha:
+            _add_error(errors, ["body", "competencia_fim"], valor.msg, valor.tipo)
+        elif valor < recorrencia["competencia_inicio"]:
+            _add_error(
+                errors,
+                ["body", "competencia_fim"],
+                "deve ser maior ou igual a competencia_inicio",
+                "value_error",
+            )
+        else:
+            recorrencia["competencia_fim"] = valor
+    if errors:
+        raise PayloadValidationError(errors)
+    return recorrencia
 
 
-def _require_bool(payload: Dict[str, Any], field: str, errors: List[Dict[str, Any]]) -> Optional[bool]:
-    if field not in payload:
-        _add_error(errors, ["body", field], "campo obrigatorio", "value_error.missing")
-        return None
-    value = payload[field]
-    if not isinstance(value, bool):
-        _add_error(errors, ["body", field], "deve ser booleano", "type_error.bool")
-        return None
-    return value
+@cronometrar("validacao")
+def _validate_fechamento_payload(payload: Any) -> str:
+    if not isinstance(payload, dict):
+        raise PayloadValidationError(
+            [{"loc": ["body"], "msg": "deve ser objeto JSON", "type": "type_error.object"}]
+        )
+    competencia = _validar_competencia(payload.get("competencia", AUSENTE))
+    if type(competencia) is Falha:
+        raise PayloadValidationError(
+            [{"loc": ["body", "competencia"], "msg": competencia.msg, "type": competencia.tipo}]
+        )
+    return competencia
 
 
-def _validate_payload(payload: Any) -> Dict[str, Any]:
+@cronometrar("validacao")
+def _validate_nome_payload(payload: Any) -> Dict[str, Any]:
     errors: List[Dict[str, Any]] = []
     if not isinstance(payload, dict):
         _add_error(errors, ["body"], "deve ser objeto JSON", "type_error.object")
         raise PayloadValidationError(errors)
 
     nome = _require_string(payload, "nome", errors)
-    data = _require_date(payload, "data", errors, DATA_FORMATO, DATA_RE)
-    competencia = _require_date(payload, "competencia", errors, COMPETENCIA_FORMATO, COMPETENCIA_RE)
-
-    tipo_lancamento = _require_string(payload, "tipo_lancamento", errors)
-    if tipo_lancamento and tipo_lancamento not in TIPOS_LANCAMENTO:
-        _add_error(errors, ["body", "tipo_lancamento"], "tipo_lancamento invalido", "value_error")
-
     if errors:
         raise PayloadValidationError(errors)
 
-    tipo_lancamento = str(tipo_lancamento)
-    lancamento: Dict[str, Any] = {
-        "id": str(uuid4()),
-        "usuario_id": MOCK_USER_ID,
-        "nome": nome,
-        "data": data,
-        "competencia": competencia,
-        "tipo_lancamento": tipo_lancamento,
-    }
+    return {"nome": nome}
 
-    if tipo_lancamento == "ENTRADA":
-        valor = _require_money(payload, "valor", errors)
-        if errors:
-            raise PayloadValidationError(errors)
-        lancamento["valor"] = valor
-        return lancamento
 
-    categoria_id = _require_uuid(payload, "categoria_id", errors)
-    forma_pagamento_id = _require_uuid(payload, "forma_pagamento_id", errors)
+@cronometrar("validacao")
+def _validate_competencia_param(competencia: Optional[str]) -> str:
+    errors: List[Dict[str, Any]] = []
+    if competencia is None:
+        _add_error(errors, ["query", "competencia"], "campo obrigatorio", "value_error.missing")
+        raise PayloadValidationError(errors)
+    if type(_validar_competencia(competencia)) is Falha:
+        _add_error(
+            errors,
+            ["query", "competencia"],
+            COMPETENCIA_QUERY_INVALIDA.msg,
+            COMPETENCIA_QUERY_INVALIDA.tipo,
+        )
+        raise PayloadValidationError(errors)
+    return competencia
 
-    if tipo_lancamento in {"FIXO", "VARIAVEL"}:
-        valor = _require_money(payload, "valor", errors)
-        pago = _require_bool(payload, "pago", errors)
-        if errors:
-            raise PayloadValidationError(errors)
-        lancamento.update(
-            {
-                "categoria_id": categoria_id,
-                "forma_pagamento_id": forma_pagamento_id,
-                "valor": valor,
-                "pago": pago,
-            }
+
+@cronometrar("validacao")
+def _validate_competencia_opcional(
+    valor: Optional[str],
+    campo: str,
+    errors: List[Dict[str, Any]],
+) -> Optional[str]:
+    if valor is None:
+        return None
+    if type(_validar_competencia(valor)) is Falha:
+        _add_error(
+            errors,
+            ["query", campo],
+            COMPETENCIA_QUERY_INVALIDA.msg,
+            COMPETENCIA_QUERY_INVALIDA.tipo,
         )
-        return lancamento
+        return None
+    return valor
 
-    if tipo_lancamento == "PARCELADO":
-        valor_total = _require_money(payload, "valor_total", errors)
-        numero_parcelas = _require_int(payload, "numero_parcelas", errors)
-        if numero_parcelas is not None and numero_parcelas < 1:
+
+@cronometrar("validacao")
+def _validate_periodo_params(
+    ano: Optional[str],
+    competencia_inicio: Optional[str],
+    competencia_fim: Optional[str],
+) -> Tuple[str, str]:
+    errors: List[Dict[str, Any]] = []
+    if ano is not None:
+        if competencia_inicio is not None or competencia_fim is not None:
             _add_error(
                 errors,
-                ["body", "numero_parcelas"],
-                "deve ser maior ou igual a 1",
+                ["query", "ano"],
+                "informe ano ou competencia_inicio e competencia_fim",
                 "value_error",
             )
+        elif not ANO_RE.match(ano) or int(ano) < 1:
+            _add_error(errors, ["query", "ano"], "formato invalido (YYYY)", "value_error")
         if errors:
             raise PayloadValidationError(errors)
-        lancamento.update(
-            {
-                "categoria_id": categoria_id,
-                "forma_pagamento_id": forma_pagamento_id,
-                "valor_total": valor_total,
-                "numero_parcelas": numero_parcelas,
-            }
-        )
-        return lancamento
-
-    _add_error(errors, ["body", "tipo_lancamento"], "tipo_lancamento invalido", "value_error")
-    raise PayloadValidationError(errors)
+        return f"{ano}-01", f"{ano}-12"
 
-
-def _validate_nome_payload(payload: Any) -> Dict[str, Any]:
-    errors: List[Dict[str, Any]] = []
-    if not isinstance(payload, dict):
-        _add_error(errors, ["body"], "deve ser objeto JSON", "type_error.object")
+    for campo, valor in (("competencia_inicio", competencia_inicio), ("competencia_fim", competencia_fim)):
+        if valor is None:
+            _add_error(errors, ["query", campo], "campo obrigatorio", "value_error.missing")
+    inicio = _validate_competencia_opcional(competencia_inicio, "competencia_inicio", errors)
+    fim = _validate_competencia_opcional(competencia_fim, "competencia_fim", errors)
+    if errors:
         raise PayloadValidationError(errors)
 
-    nome = _require_string(payload, "nome", errors)
+    inicio_validado, fim_validado = str(inicio), str(fim)
+    meses = competencia_to_index(fim_validado) - competencia_to_index(inicio_validado) + 1
+    if meses < 1:
+        _add_error(
+            errors,
+            ["query", "competencia_fim"],
+            "deve ser maior ou igual a competencia_inicio",
+            "value_error",
+        )
+    elif meses > PERIODO_MESES_MAXIMO:
+        _add_error(
+            errors,
+            ["query", "competencia_fim"],
+            f"periodo deve ter no maximo {PERIODO_MESES_MAXIMO} meses",
+            "value_error",
+        )
     if errors:
         raise PayloadValidationError(errors)
+    return inicio_validado, fim_validado
 
-    return {"nome": nome}
+
+@cronometrar("validacao")
+def _validate_projetar_param(projetar: Optional[str]) -> bool:
+    if projetar is None:
+        return False
+    if projetar not in {"true", "false"}:
+        raise PayloadValidationError(
+            [{"loc": ["query", "projetar"], "msg": "deve ser booleano", "type": "type_error.bool"}]
+        )
+    return projetar == "true"
 
 
-def _validate_competencia_param(competencia: Optional[str]) -> str:
+def _encode_cursor(competencia: str, data: str, lancamento_id: str) -> str:
+    chave = json.dumps([competencia, data, lancamento_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(chave.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, str, str]:
+    padding = "=" * (-len(cursor) % 4)
+    try:
+        chave = json.loads(base64.urlsafe_b64decode(cursor + padding).decode("utf-8"))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("cursor invalido") from exc
+    if (
+        not isinstance(chave, list)
+        or len(chave) != 3
+        or not all(isinstance(parte, str) for parte in chave)
+    ):
+        raise ValueError("cursor invalido")
+    return chave[0], chave[1], chave[2]
+
+
+def _validate_filtros_lancamentos(
+    errors: List[Dict[str, Any]],
+    usuario_id: Optional[str],
+    competencia_inicio: Optional[str],
+    competencia_fim: Optional[str],
+    tipo_lancamento: Optional[str],
+    categoria_id: Optional[str],
+    pago: Optional[str],
+) -> Dict[str, Any]:
+    filtros: Dict[str, Any] = {
+        "usuario_id": usuario_id,
+        "competencia_inicio": _validate_competencia_opcional(
+            competencia_inicio, "competencia_inicio", errors
+        ),
+        "competencia_fim": _validate_competencia_opcional(competencia_fim, "competencia_fim", errors),
+        "tipo_lancamento": tipo_lancamento,
+        "categoria_id": categoria_id,
+        "pago": None,
+    }
+
+    if tipo_lancamento is not None and tipo_lancamento not in TIPOS_LANCAMENTO:
+        _add_error(errors, ["query", "tipo_lancamento"], "tipo_lancamento invalido", "value_error")
+
+    if pago is not None:
+        if pago not in {"true", "false"}:
+            _add_error(errors, ["query", "pago"], "deve ser booleano", "type_error.bool")
+        else:
+            filtros["pago"] = pago == "true"
+
+    if (
+        filtros["competencia_inicio"] is not None
+        and filtros["competencia_fim"] is not None
+        and filtros["competencia_inicio"] > filtros["competencia_fim"]
+    ):
+        _add_error(
+            errors,
+            ["query", "competencia_fim"],
+            "deve ser maior ou igual a competencia_inicio",
+            "value_error",
+        )
+    return filtros
+
+
+@cronometrar("validacao")
+def _validate_listagem_params(
+    limite: Optional[str],
+    cursor: Optional[str],
+    usuario_id: Optional[str],
+    competencia_inicio: Optional[str],
+    competencia_fim: Optional[str],
+    tipo_lancamento: Optional[str],
+    categoria_id: Optional[str],
+    pago: Optional[str],
+) -> Dict[str, Any]:
     errors: List[Dict[str, Any]] = []
-    if competencia is None:
-        _add_error(errors, ["query", "competencia"], "campo obrigatorio", "value_error.missing")
-        raise PayloadValidationError(errors)
-    if not COMPETENCIA_RE.match(competencia):
-        _add_error(errors, ["query", "competencia"], "formato invalido (YYYY-MM)", "value_error")
+    paginada = limite is not None or cursor is not None
+    filtros: Dict[str, Any] = {
+        "limite": LISTAGEM_LIMITE_PADRAO if paginada else None,
+        "apos": None,
+    }
+
+    if limite is not None:
+        if not limite.isdecimal() or not 1 <= int(limite) <= LISTAGEM_LIMITE_MAXIMO:
+            _add_error(
+                errors,
+                ["query", "limite"],
+                f"deve ser inteiro entre 1 e {LISTAGEM_LIMITE_MAXIMO}",
+                "value_error",
+            )
+        else:
+            filtros["limite"] = int(limite)
+
+    if cursor is not None:
+        try:
+            filtros["apos"] = _decode_cursor(cursor)
+        except ValueError:
+            _add_error(errors, ["query", "cursor"], "cursor invalido", "value_error")
+
+    filtros.update(
+        _validate_filtros_lancamentos(
+            errors,
+            usuario_id,
+            competencia_inicio,
+            competencia_fim,
+            tipo_lancamento,
+            categoria_id,
+            pago,
+        )
+    )
+    if errors:
         raise PayloadValidationError(errors)
-    try:
-        datetime.strptime(competencia, COMPETENCIA_FORMATO)
-    except ValueError:
-        _add_error(errors, ["query", "competencia"], "formato invalido (YYYY-MM)", "value_error")
+    return filtros
+
+
+@cronometrar("validacao")
+def _validate_exportacao_params(
+    formato: Optional[str],
+    usuario_id: Optional[str],
+    competencia_inicio: Optional[str],
+    competencia_fim: Optional[str],
+    tipo_lancamento: Optional[str],
+    categoria_id: Optional[str],
+    pago: Optional[str],
+) -> Tuple[str, Dict[str, Any]]:
+    errors: List[Dict[str, Any]] = []
+    formato = formato or "ndjson"
+    if formato not in FORMATOS_EXPORTACAO:
+        _add_error(errors, ["query", "formato"], "formato invalido (ndjson, csv)", "value_error")
+
+    filtros = _validate_filtros_lancamentos(
+        errors,
+        usuario_id,
+        competencia_inicio,
+        competencia_fim,
+        tipo_lancamento,
+        categoria_id,
+        pago,
+    )
+    if errors:
         raise PayloadValidationError(errors)
-    return competencia
+    return formato, filtros
 
 
-def _competencia_to_index(competencia: str) -> int:
-    ano, mes = competencia.split("-")
-    return int(ano) * 12 + int(mes) - 1
+async def _exportar_ndjson(lotes: AsyncIterator[List[Lancamento]]) -> AsyncIterator[str]:
+    async for lote in lotes:
+        yield "".join(json.dumps(item.como_dict(), ensure_ascii=False) + "\n" for item in lote)
 
 
-def _parcelado_valor_parcela(valor_total: Decimal, numero_parcelas: int, indice: int) -> Decimal:
-    base = (valor_total / Decimal(numero_parcelas)).quantize(MONEY_QUANT, rounding=ROUND_HALF_UP)
-    if indice == numero_parcelas - 1:
-        residual = valor_total - base * Decimal(numero_parcelas - 1)
-        return residual.quantize(MONEY_QUANT, rounding=ROUND_HALF_UP)
-    return base
+def _csv_valor(item: Dict[str, Any], coluna: str) -> Any:
+    valor = item.get(coluna)
+    if valor is None:
+        return ""
+    if isinstance(valor, bool):
+        return "true" if valor else "false"
+    return valor
 
 
-def _sum_parcelas(parcelados: List[Dict[str, Any]], competencia: str) -> Decimal:
-    competencia_idx = _competencia_to_index(competencia)
-    total = Decimal("0.00")
-    for item in parcelados:
-        inicio_idx = _competencia_to_index(item["competencia"])
-        numero_parcelas = int(item["numero_parcelas"])
-        indice = competencia_idx - inicio_idx
-        if indice < 0 or indice >= numero_parcelas:
-            continue
-        valor_total = Decimal(str(item["valor_total"]))
-        total += _parcelado_valor_parcela(valor_total, numero_parcelas, indice)
-    return total
+async def _exportar_csv(lotes: AsyncIterator[List[Lancamento]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORTACAO_CSV_COLUNAS)
+    async for lote in lotes:
+        writer.writerows(
+            [_csv_valor(dados, coluna) for coluna in EXPORTACAO_CSV_COLUNAS]
+            for dados in map(Lancamento.como_dict, lote)
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    resto = buffer.getvalue()
+    if resto:
+        yield resto
+
+
+def _somar_resumo(resumo: Dict[str, int], projecao: Optional[Dict[str, int]]) -> Dict[str, int]:
+    if projecao is None:
+        return resumo
+    return {campo: valor + projecao[campo] for campo, valor in resumo.items()}
+
+
+def _consolidacao_resposta(competencia: str, resumo: Dict[str, int]) -> Dict[str, Any]:
+    total_entradas = resumo["entradas_centavos"]
+    total_gastos = resumo["gastos_centavos"] + resumo["parcelas_centavos"]
+    total_investimentos = 0
+    saldo = total_entradas - total_gastos - total_investimentos
+    return {
+        "competencia": competencia,
+        "total_entradas": de_centavos(total_entradas),
+        "total_gastos": de_centavos(total_gastos),
+        "total_investimentos": de_centavos(total_investimentos),
+        "saldo": de_centavos(saldo),
+    }
 
 
-def _round_money(value: Decimal) -> float:
-    return float(value.quantize(MONEY_QUANT, rounding=ROUND_HALF_UP))
+def _fechamento_resposta(fechamento: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        **_consolidacao_resposta(fechamento["competencia"], fechamento),
+        "fechado_em": fechamento["fechado_em"],
+    }
 
 
-def _validar_referencias_lancamento(lancamento: Dict[str, Any]) -> None:
+async def _validar_referencias_lancamento(lancamento: Dict[str, Any]) -> None:
     if lancamento["tipo_lancamento"] == "ENTRADA":
         return
     usuario_id = lancamento["usuario_id"]
-    if not categoria_existe(lancamento["categoria_id"], usuario_id):
+    if not await db_async.categoria_existe(lancamento["categoria_id"], usuario_id):
         raise HTTPException(status_code=404, detail="categoria nao encontrada")
-    if not forma_pagamento_existe(lancamento["forma_pagamento_id"], usuario_id):
+    if not await db_async.forma_pagamento_existe(lancamento["forma_pagamento_id"], usuario_id):
         raise HTTPException(status_code=404, detail="forma de pagamento nao encontrada")
 
 
+@cronometrar("validacao")
+def _ler_lote(corpo: bytes, content_type: str) -> List[Any]:
+    errors: List[Dict[str, Any]] = []
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    try:
+        texto = corpo.decode("utf-8")
+    except UnicodeDecodeError:
+        _add_error(errors, ["body"], "deve ser texto UTF-8", "value_error")
+        raise PayloadValidationError(errors)
+
+    if media_type in LOTE_NDJSON_MEDIA_TYPES:
+        itens: List[Any] = []
+        for linha in texto.splitlines():
+            if not linha.strip():
+                continue
+            try:
+                itens.append(json.loads(linha))
+            except ValueError:
+                _add_error(errors, ["body", len(itens)], "json invalido", "value_error.jsondecode")
+                itens.append(None)
+    else:
+        try:
+            itens = json.loads(texto)
+        except ValueError:
+            _add_error(errors, ["body"], "json invalido", "value_error.jsondecode")
+            raise PayloadValidationError(errors)
+        if not isinstance(itens, list):
+            _add_error(errors, ["body"], "deve ser lista JSON", "type_error.list")
+            raise PayloadValidationError(errors)
+
+    if not itens:
+        _add_error(errors, ["body"], "deve conter ao menos um item", "value_error")
+    elif len(itens) > LOTE_ITENS_MAXIMO:
+        _add_error(
+            errors,
+            ["body"],
+            f"deve conter no maximo {LOTE_ITENS_MAXIMO} itens",
+            "value_error",
+        )
+    if errors:
+        raise PayloadValidationError(errors)
+    return itens
+
+
+@cronometrar("validacao")
+def _validate_itens_lote(
+    itens: List[Any],
+    errors: List[Dict[str, Any]],
+) -> List[Tuple[int, Dict[str, Any]]]:
+    validos: List[Tuple[int, Dict[str, Any]]] = []
+    for indice, item in enumerate(itens):
+        try:
+            validos.append((indice, _validate_payload(item)))
+        except PayloadValidationError as exc:
+            errors.extend(
+                {**erro, "loc": ["body", indice, *erro["loc"][1:]]} for erro in exc.errors
+            )
+    return validos
+
+
+async def _validar_referencias_lote(
+    validos: List[Tuple[int, Dict[str, Any]]],
+    errors: List[Dict[str, Any]],
+) -> None:
+    com_referencias = [
+        (indice, lancamento)
+        for indice, lancamento in validos
+        if lancamento["tipo_lancamento"] != "ENTRADA"
+    ]
+    if com_referencias:
+        categorias = await db_async.categorias_existentes(
+            [lancamento["categoria_id"] for _, lancamento in com_referencias],
+            MOCK_USER_ID,
+        )
+        formas_pagamento = await db_async.formas_pagamento_existentes(
+            [lancamento["forma_pagamento_id"] for _, lancamento in com_referencias],
+            MOCK_USER_ID,
+        )
+        for indice, lancamento in com_referencias:
+            if lancamento["categoria_id"] not in categorias:
+                _add_error(
+                    errors,
+                    ["body", indice, "categoria_id"],
+                    "categoria nao encontrada",
+                    "value_error.not_found",
+                )
+            if lancamento["forma_pagamento_id"] not in formas_pagamento:
+                _add_error(
+                    errors,
+                    ["body", indice, "forma_pagamento_id"],
+                    "forma de pagamento nao encontrada",
+                    "value_error.not_found",
+                )
+
+
+async def _validate_lote(corpo: bytes, content_type: str) -> List[Dict[str, Any]]:
+    errors: List[Dict[str, Any]] = []
+    itens = await run_in_threadpool(_ler_lote, corpo, content_type)
+    validos = await run_in_threadpool(_validate_itens_lote, itens, errors)
+    await _validar_referencias_lote(validos, errors)
+    if errors:
+        errors.sort(key=lambda erro: erro["loc"][1] if len(erro["loc"]) > 1 else -1)
+        raise PayloadValidationError(errors)
+    return [lancamento for _, lancamento in validos]
+
+
+def _sem_cache(request: Request) -> bool:
+    diretivas = request.headers.get("cache-control", "").lower()
+    return any(
+        diretiva.strip() in ("no-cache", "no-store") for diretiva in diretivas.split(",")
+    )
+
+
+def _etag_confere(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidatos = {parte.strip() for parte in if_none_match.split(",")}
+    if "*" in candidatos:
+        return True
+    return etag in {
+        candidato[2:] if candidato.startswith("W/") else candidato for candidato in candidatos
+    }
+
+
+@cronometrar("serializacao")
+def _serializar_resposta(conteudo: Any) -> bytes:
+    return json.dumps(
+        conteudo,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _coletar_metricas_internas() -> List[str]:
+    linhas: List[str] = []
+    caches = (
+        ("referencias", estatisticas_cache_referencias()),
+        ("respostas", _respostas.estatisticas()),
+    )
+    for campo in ("entradas", "hits", "misses", "evictions"):
+        linhas.extend(
+            gauges(
+                f"financas_cache_{campo}",
+                f"Campo {campo} das estatisticas de cache.",
+                [({"cache": nome}, estatisticas[campo]) for nome, estatisticas in caches],
+            )
+        )
+    pools = estatisticas_pools()
+    linhas.extend(
+        gauges(
+            "financas_db_pool_connections",
+            "Conexoes do pool SQLite por estado.",
+            [({"estado": "abertas"}, pools["abertas"]), ({"estado": "ociosas"}, pools["ociosas"])],
+        )
+    )
+    shards = pools["shards"]
+    if shards is not None:
+        linhas.extend(
+            gauges(
+                "financas_db_shards",
+                "Shards por usuario: abertos no LRU e contadores do roteador.",
+                [({"campo": campo}, valor) for campo, valor in shards.items()],
+            )
+        )
+    replica = estatisticas_replica()
+    if replica is not None:
+        linhas.extend(
+            gauges(
+                "financas_db_replica",
+                "Replica de leitura: geracao, idade e duracao da ultima copia.",
+                [
+                    ({"campo": "geracao"}, replica["geracao"]),
+                    ({"campo": "idade_segundos"}, replica["idade_s"] or 0),
+                    ({"campo": "ultima_copia_ms"}, replica["ultima_copia_ms"]),
+                    ({"campo": "falhas"}, replica["falhas"]),
+                ],
+            )
+        )
+    lentas = consultas_lentas()
+    linhas.extend(
+        gauges(
+            "financas_db_slow_queries",
+            "Consultas acima do limiar desde o inicio do processo.",
+            [
+                ({"tipo": "total"}, lentas["total"]),
+                ({"tipo": "scan_completo"}, lentas["scans_completos"]),
+            ],
+        )
+    )
+    grupo = db_async.estatisticas_grupo_commit()
+    if grupo is not None:
+        linhas.extend(
+            gauges(
+                "financas_grupo_commit_total",
+                "Lotes e linhas confirmados pelo group commit.",
+                [({"campo": "lotes"}, grupo["lotes"]), ({"campo": "linhas"}, grupo["linhas"])],
+            )
+        )
+    return linhas
+
+
+REGISTRO.coletor("app", _coletar_metricas_internas)
+
+
+async def _resposta_cacheada(
+    request: Request,
+    usuario_id: Optional[str],
+    gerar: Callable[[], Awaitable[Tuple[Any, Dict[str, str]]]],
+) -> Response:
+    versao = versao_dados(usuario_id)
+    chave = (request.url.path, tuple(sorted(request.query_params.multi_items())), usuario_id)
+    entrada = None if _sem_cache(request) else _respostas.obter(chave, versao)
+    if entrada is None:
+        conteudo, headers = await gerar()
+        corpo = conteudo if isinstance(conteudo, bytes) else _serializar_resposta(conteudo)
+        etag = f'"{hashlib.blake2b(corpo, digest_size=16).hexdigest()}"'
+        entrada = RespostaCacheada(versao, etag, corpo, tuple(headers.items()))
+        _respostas.guardar(chave, entrada)
+
+    headers = {
+        "ETag": entrada.etag,
+        "Cache-Control": CACHE_RESPOSTAS_CONTROLE,
+        **dict(entrada.headers),
+    }
+    if _etag_confere(request.headers.get("if-none-match"), entrada.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entrada.corpo, media_type="application/json", headers=headers)
+
+
+async def _pagina_lancamentos(
+    filtros: Dict[str, Any],
+    tamanho_pagina: Optional[int],
+) -> Tuple[Any, Dict[str, str]]:
+    itens = await db_async.list_lancamentos(**filtros)
+    headers: Dict[str, str] = {}
+    if tamanho_pagina is not None and len(itens) > tamanho_pagina:
+        itens = itens[:tamanho_pagina]
+        ultimo = itens[-1]
+        headers[PROXIMO_CURSOR_HEADER] = _encode_cursor(ultimo.competencia, ultimo.data, ultimo.id)
+    if JSON_RAPIDO:
+        return lancamentos_json(itens), headers
+    return [item.como_dict() for item in itens], headers
+
+
 @app.on_event("startup")
 def startup() -> None:
     init_db()
+    if not check_pool():
+        raise RuntimeError("banco de dados indisponivel")
+    iniciar_replica()
+
+
+@app.on_event("shutdown")
+def shutdown() -> None:
+    db_async.encerrar_executores()
+    close_pool()
 
 
 @app.post("/lancamentos", status_code=201)
-def criar_lancamento(payload: Dict[str, Any]) -> Dict[str, Any]:
+async def criar_lancamento(payload: Dict[str, Any]) -> Dict[str, Any]:
     try:
         lancamento = _validate_payload(payload)
-        _validar_referencias_lancamento(lancamento)
+        await _validar_referencias_lancamento(lancamento)
     except PayloadValidationError as exc:
         raise HTTPException(status_code=422, detail=exc.errors) from exc
 
-    insert_lancamento(lancamento)
+    try:
+        await db_async.insert_lancamento(lancamento)
+    except PeriodoFechadoError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
     return lancamento
 
 
-@app.get("/lancamentos")
-def listar_lancamentos() -> List[Dict[str, Any]]:
+@app.post("/lancamentos/lote", status_code=201)
+async def importar_lancamentos_lote(request: Request) -> Dict[str, Any]:
+    corpo = await request.body()
+    try:
+        lancamentos = await _validate_lote(
+            corpo,
+            request.headers.get("content-type", "application/json"),
+        )
+    except PayloadValidationError as exc:
+        raise HTTPException(status_code=422, detail=exc.errors) from exc
+
     try:
-        return list_lancamentos()
+        quantidade = await db_async.insert_lancamentos(lancamentos)
+    except PeriodoFechadoError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
     except sqlite3.Error as exc:
         raise HTTPException(status_code=500, detail="erro ao acessar banco") from exc
+    return {"quantidade": quantidade, "ids": [lancamento["id"] for lancamento in lancamentos]}
+
+
+@app.get("/lancamentos")
+async def listar_lancamentos(
+    request: Request,
+    limite: Optional[str] = None,
+    cursor: Optional[str] = None,
+    usuario_id: Optional[str] = None,
+    competencia_inicio: Optional[str] = None,
+    competencia_fim: Optional[str] = None,
+    tipo_lancamento: Optional[str] = None,
+    categoria_id: Optional[str] = None,
+    pago: Optional[str] = None,
+) -> Response:
+    try:
+        filtros = _validate_listagem_params(
+            limite,
+            cursor,
+            usuario_id,
+            competencia_inicio,
+            competencia_fim,
+            tipo_lancamento,
+            categoria_id,
+            pago,
+        )
+    except PayloadValidationError as exc:
+        raise HTTPException(status_code=422, detail=exc.errors) from exc
+
+    tamanho_pagina = filtros["limite"]
+    if tamanho_pagina is not None:
+        filtros["limite"] = tamanho_pagina + 1
+
+    async def gerar() -> Tuple[Any, Dict[str, str]]:
+        try:
+            return await _pagina_lancamentos(filtros, tamanho_pagina)
+        except sqlite3.Error as exc:
+            raise HTTPException(status_code=500, detail="erro ao acessar banco") from exc
+
+    return await _resposta_cacheada(request, filtros["usuario_id"], gerar)
+
+
+@app.get("/lancamentos/exportar")
+async def exportar_lancamentos(
+    formato: Optional[str] = None,
+    usuario_id: Optional[str] = None,
+    competencia_inicio: Optional[str] = None,
+    competencia_fim: Optional[str] = None,
+    tipo_lancamento: Optional[str] = None,
+    categoria_id: Optional[str] = None,
+    pago: Optional[str] = None,
+) -> StreamingResponse:
+    try:
+        formato_validado, filtros = _validate_exportacao_params(
+            formato,
+            usuario_id,
+            competencia_inicio,
+            competencia_fim,
+            tipo_lancamento,
+            categoria_id,
+            pago,
+        )
+    except PayloadValidationError as exc:
+        raise HTTPException(status_code=422, detail=exc.errors) from exc
+
+    lotes = db_async.iter_lancamentos(**filtros)
+    if formato_validado == "csv":
+        corpo = _exportar_csv(lotes)
+    else:
+        corpo = _exportar_ndjson(lotes)
+    return StreamingResponse(
+        corpo,
+        media_type=FORMATOS_EXPORTACAO[formato_validado],
+        headers={
+            "Content-Disposition": f'attachment; filename="lancamentos.{formato_validado}"'
+        },
+    )
 
 
 @app.get("/consolidacoes/mensal")
-def consolidar_mensal(competencia: Optional[str] = None) -> Dict[str, Any]:
+async def consolidar_mensal(
+    request: Request,
+    competencia: Optional[str] = None,
+    projetar: Optional[str] = None,
+) -> Response:
     try:
         competencia_validada = _validate_competencia_param(competencia)
+        projetar_recorrencias = _validate_projetar_param(projetar)
     except PayloadValidationError as exc:
         raise HTTPException(status_code=422, detail=exc.errors) from exc
 
-    dados = consolidacao_mensal(competencia_validada)
-    total_entradas = Decimal(str(dados["total_entradas"]))
-    total_gastos_base = Decimal(str(dados["total_gastos"]))
-    total_parcelas = _sum_parcelas(dados["parcelados"], competencia_validada)
-    total_gastos = total_gastos_base + total_parcelas
-    total_investimentos = Decimal("0.00")
-    saldo = total_entradas - total_gastos - total_investimentos
+    async def gerar() -> Tuple[Dict[str, Any], Dict[str, str]]:
+        fechamento = await db_async.get_fechamento(competencia_validada, MOCK_USER_ID)
+        if fechamento is not None:
+            return _consolidacao_resposta(competencia_validada, fechamento), {}
+        resumo = await db_async.get_resumo_mensal(competencia_validada, MOCK_USER_ID)
+        if projetar_recorrencias:
+            projecao = await db_async.projecao_recorrencias(
+                competencia_validada, competencia_validada, MOCK_USER_ID
+            )
+            resumo = _somar_resumo(resumo, projecao.get(competencia_validada))
+        return _consolidacao_resposta(competencia_validada, resumo), {}
 
-    return {
-        "competencia": competencia_validada,
-        "total_entradas": _round_money(total_entradas),
-        "total_gastos": _round_money(total_gastos),
-        "total_investimentos": _round_money(total_investimentos),
-        "saldo": _round_money(saldo),
-    }
+    return await _resposta_cacheada(request, MOCK_USER_ID, gerar)
+
+
+@app.get("/consolidacoes/anual")
+async def consolidar_anual(
+    request: Request,
+    ano: Optional[str] = None,
+    competencia_inicio: Optional[str] = None,
+    competencia_fim: Optional[str] = None,
+    projetar: Optional[str] = None,
+) -> Response:
+    try:
+        inicio, fim = _validate_periodo_params(ano, competencia_inicio, competencia_fim)
+        projetar_recorrencias = _validate_projetar_param(projetar)
+    except PayloadValidationError as exc:
+        raise HTTPException(status_code=422, detail=exc.errors) from exc
+
+    async def gerar() -> Tuple[Dict[str, Any], Dict[str, str]]:
+        resumos = await db_async.list_resumo_periodo(inicio, fim, MOCK_USER_ID)
+        fechados = {
+            fechamento["competencia"]: fechamento
+            for fechamento in await db_async.list_fechamentos(MOCK_USER_ID, inicio, fim)
+        }
+        projecao: Dict[str, Dict[str, int]] = {}
+        if projetar_recorrencias:
+            projecao = await db_async.projecao_recorrencias(inicio, fim, MOCK_USER_ID)
+        vazio = {"entradas_centavos": 0, "gastos_centavos": 0, "parcelas_centavos": 0}
+        acumulado = dict(vazio)
+        meses: List[Dict[str, Any]] = []
+        for indice in range(competencia_to_index(inicio), competencia_to_index(fim) + 1):
+            competencia = index_to_competencia(indice)
+            resumo = fechados.get(competencia) or _somar_resumo(
+                resumos.get(competencia, vazio), projecao.get(competencia)
+            )
+            for campo in acumulado:
+                acumulado[campo] += resumo[campo]
+            meses.append(_consolidacao_resposta(competencia, resumo))
+
+        totais = _consolidacao_resposta(inicio, acumulado)
+        del totais["competencia"]
+        resposta = {
+            "ano": int(ano) if ano is not None else None,
+            "competencia_inicio": inicio,
+            "competencia_fim": fim,
+            **totais,
+            "resumos": meses,
+        }
+        return resposta, {}
+
+    return await _resposta_cacheada(request, MOCK_USER_ID, gerar)
+
+
+@app.get("/consolidacoes/saldo-acumulado")
+async def consolidar_saldo_acumulado(
+    request: Request,
+    ano: Optional[str] = None,
+    competencia_inicio: Optional[str] = None,
+    competencia_fim: Optional[str] = None,
+) -> Response:
+    try:
+        inicio, fim = _validate_periodo_params(ano, competencia_inicio, competencia_fim)
+    except PayloadValidationError as exc:
+        raise HTTPException(status_code=422, detail=exc.errors) from exc
+
+    async def gerar() -> Tuple[Dict[str, Any], Dict[str, str]]:
+        inicial, acumulados = await db_async.list_saldo_acumulado(inicio, fim, MOCK_USER_ID)
+        anterior = inicial
+        saldos: List[Dict[str, Any]] = []
+        for indice in range(competencia_to_index(inicio), competencia_to_index(fim) + 1):
+            competencia = index_to_competencia(indice)
+            acumulado = acumulados.get(competencia, anterior)
+            saldos.append(
+                {
+                    "competencia": competencia,
+                    "saldo": de_centavos(acumulado - anterior),
+                    "saldo_acumulado": de_centavos(acumulado),
+                }
+            )
+            anterior = acumulado
+        resposta = {
+            "competencia_inicio": inicio,
+            "competencia_fim": fim,
+            "saldo_inicial": de_centavos(inicial),
+            "saldo_final": de_centavos(anterior),
+            "saldos": saldos,
+        }
+        return resposta, {}
+
+    return await _resposta_cacheada(request, MOCK_USER_ID, gerar)
+
+
+@app.post("/fechamentos", status_code=201)
+async def fechar_competencia(payload: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        competencia = _validate_fechamento_payload(payload)
+    except PayloadValidationError as exc:
+        raise HTTPException(status_code=422, detail=exc.errors) from exc
+
+    try:
+        fechamento = await db_async.fechar_competencia(competencia, MOCK_USER_ID)
+    except sqlite3.IntegrityError as exc:
+        raise HTTPException(status_code=409, detail="competencia ja fechada") from exc
+    except sqlite3.Error as exc:
+        raise HTTPException(status_code=500, detail="erro ao acessar banco") from exc
+    return _fechamento_resposta(fechamento)
+
+
+@app.get("/fechamentos")
+async def listar_fechamentos(request: Request) -> Response:
+    async def gerar() -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+        try:
+            fechamentos = await db_async.list_fechamentos(MOCK_USER_ID)
+        except sqlite3.Error as exc:
+            raise HTTPException(status_code=500, detail="erro ao acessar banco") from exc
+        return [_fechamento_resposta(fechamento) for fechamento in fechamentos], {}
+
+    return await _resposta_cacheada(request, MOCK_USER_ID, gerar)
+
+
+@app.get("/fechamentos/{competencia}")
+async def obter_fechamento(competencia: str) -> Dict[str, Any]:
+    try:
+        fechamento = await db_async.get_fechamento(competencia, MOCK_USER_ID)
+    except sqlite3.Error as exc:
+        raise HTTPException(status_code=500, detail="erro ao acessar banco") from exc
+    if fechamento is None:
+        raise HTTPException(status_code=404, detail="recurso nao encontrado")
+    return _fechamento_resposta(fechamento)
+
+
+@app.post("/recorrencias", status_code=201)
+async def criar_recorrencia(payload: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        recorrencia = _validate_recorrencia_payload(payload)
+        await _validar_referencias_lancamento(recorrencia)
+    except PayloadValidationError as exc:
+        raise HTTPException(status_code=422, detail=exc.errors) from exc
+
+    try:
+        await db_async.insert_recorrencia(recorrencia)
+    except sqlite3.Error as exc:
+        raise HTTPException(status_code=500, detail="erro ao acessar banco") from exc
+    return recorrencia
+
+
+@app.get("/recorrencias")
+async def listar_recorrencias(request: Request) -> Response:
+    async def gerar() -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+        try:
+            regras = await db_async.list_recorrencias(MOCK_USER_ID)
+        except sqlite3.Error as exc:
+            raise HTTPException(status_code=500, detail="erro ao acessar banco") from exc
+        return [regra.como_dict() for regra in regras], {}
+
+    return await _resposta_cacheada(request, MOCK_USER_ID, gerar)
+
+
+@app.post("/recorrencias/materializar")
+async def materializar_recorrencias(
+    ano: Optional[str] = None,
+    competencia_inicio: Optional[str] = None,
+    competencia_fim: Optional[str] = None,
+) -> Dict[str, Any]:
+    try:
+        inicio, fim = _validate_periodo_params(ano, competencia_inicio, competencia_fim)
+    except PayloadValidationError as exc:
+        raise HTTPException(status_code=422, detail=exc.errors) from exc
+
+    try:
+        quantidade = await db_async.materializar_recorrencias(MOCK_USER_ID, inicio, fim)
+    except sqlite3.Error as exc:
+        raise HTTPException(status_code=500, detail="erro ao acessar banco") from exc
+    return {"competencia_inicio": inicio, "competencia_fim": fim, "quantidade": quantidade}
+
+
+@app.get("/recorrencias/{recorrencia_id}")
+async def obter_recorrencia(recorrencia_id: str) -> Dict[str, Any]:
+    try:
+        recorrencia = await db_async.get_recorrencia(recorrencia_id, MOCK_USER_ID)
+    except sqlite3.Error as exc:
+        raise HTTPException(status_code=500, detail="erro ao acessar banco") from exc
+    if recorrencia is None:
+        raise HTTPException(status_code=404, detail="recurso nao encontrado")
+    return recorrencia.como_dict()
+
+
+@app.delete("/recorrencias/{recorrencia_id}", status_code=204)
+async def remover_recorrencia(recorrencia_id: str) -> Response:
+    try:
+        removido = await db_async.delete_recorrencia(recorrencia_id, MOCK_USER_ID)
+    except sqlite3.Error as exc:
+        raise HTTPException(status_code=500, detail="erro ao acessar banco") from exc
+    if not removido:
+        raise HTTPException(status_code=404, detail="recurso nao encontrado")
+    return Response(status_code=204)
 
 
 @app.post("/categorias", status_code=201)
-def criar_categoria(payload: Dict[str, Any]) -> Dict[str, Any]:
+async def criar_categoria(payload: Dict[str, Any]) -> Dict[str, Any]:
     try:
         dados = _validate_nome_payload(payload)
     except PayloadValidationError as exc:
@@ -347,7 +1170,7 @@ def criar_categoria(payload: Dict[str, Any]) -> Dict[str, Any]:
         "nome": dados["nome"],
     }
     try:
-        insert_categoria(categoria)
+        await db_async.insert_categoria(categoria)
     except sqlite3.IntegrityError as exc:
         raise HTTPException(status_code=409, detail="recurso ja existente") from exc
     except sqlite3.Error as exc:
@@ -356,17 +1179,20 @@ def criar_categoria(payload: Dict[str, Any]) -> Dict[str, Any]:
 
 
 @app.get("/categorias")
-def listar_categorias_endpoint() -> List[Dict[str, Any]]:
-    try:
-        return list_categorias()
-    except sqlite3.Error as exc:
-        raise HTTPException(status_code=500, detail="erro ao acessar banco") from exc
+async def listar_categorias_endpoint(request: Request) -> Response:
+    async def gerar() -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+        try:
+            return await db_async.list_categorias(MOCK_USER_ID), {}
+        except sqlite3.Error as exc:
+            raise HTTPException(status_code=500, detail="erro ao acessar banco") from exc
+
+    return await _resposta_cacheada(request, MOCK_USER_ID, gerar)
 
 
 @app.get("/categorias/{categoria_id}")
-def obter_categoria(categoria_id: str) -> Dict[str, Any]:
+async def obter_categoria(categoria_id: str) -> Dict[str, Any]:
     try:
-        categoria = get_categoria(categoria_id)
+        categoria = await db_async.get_categoria(categoria_id, MOCK_USER_ID)
     except sqlite3.Error as exc:
         raise HTTPException(status_code=500, detail="erro ao acessar banco") from exc
     if categoria is None:
@@ -375,14 +1201,14 @@ def obter_categoria(categoria_id: str) -> Dict[str, Any]:
 
 
 @app.put("/categorias/{categoria_id}")
-def atualizar_categoria(categoria_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+async def atualizar_categoria(categoria_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
     try:
         dados = _validate_nome_payload(payload)
     except PayloadValidationError as exc:
         raise HTTPException(status_code=422, detail=exc.errors) from exc
 
     try:
-        categoria = update_categoria(categoria_id, dados["nome"])
+        categoria = await db_async.update_categoria(categoria_id, MOCK_USER_ID, dados["nome"])
     except sqlite3.IntegrityError as exc:
         raise HTTPException(status_code=409, detail="recurso ja existente") from exc
     except sqlite3.Error as exc:
@@ -393,9 +1219,9 @@ def atualizar_categoria(categoria_id: str, payload: Dict[str, Any]) -> Dict[str,
 
 
 @app.delete("/categorias/{categoria_id}", status_code=204)
-def remover_categoria(categoria_id: str) -> Response:
+async def remover_categoria(categoria_id: str) -> Response:
     try:
-        removido = delete_categoria(categoria_id)
+        removido = await db_async.delete_categoria(categoria_id, MOCK_USER_ID)
     except sqlite3.Error as exc:
         raise HTTPException(status_code=500, detail="erro ao acessar banco") from exc
     if not removido:
@@ -404,7 +1230,7 @@ def remover_categoria(categoria_id: str) -> Response:
 
 
 @app.post("/formas-pagamento", status_code=201)
-def criar_forma_pagamento(payload: Dict[str, Any]) -> Dict[str, Any]:
+async def criar_forma_pagamento(payload: Dict[str, Any]) -> Dict[str, Any]:
     try:
         data = _validate_nome_payload(payload)
     except PayloadValidationError as exc:
@@ -416,7 +1242,7 @@ def criar_forma_pagamento(payload: Dict[str, Any]) -> Dict[str, Any]:
         "nome": data["nome"],
     }
     try:
-        insert_forma_pagamento(forma_pagamento)
+        await db_async.insert_forma_pagamento(forma_pagamento)
     except sqlite3.IntegrityError as exc:
         errors: List[Dict[str, Any]] = []
         _add_error(errors, ["body", "nome"], "recurso ja existente", "value_error")
@@ -427,17 +1253,20 @@ def criar_forma_pagamento(payload: Dict[str, Any]) -> Dict[str, Any]:
 
 
 @app.get("/formas-pagamento")
-def listar_formas_pagamento_endpoint() -> List[Dict[str, Any]]:
-    try:
-        return list_formas_pagamento(MOCK_USER_ID)
-    except sqlite3.Error as exc:
-        raise HTTPException(status_code=500, detail="erro ao acessar banco") from exc
+async def listar_formas_pagamento_endpoint(request: Request) -> Response:
+    async def gerar() -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+        try:
+            return await db_async.list_formas_pagamento(MOCK_USER_ID), {}
+        except sqlite3.Error as exc:
+            raise HTTPException(status_code=500, detail="erro ao acessar banco") from exc
+
+    return await _resposta_cacheada(request, MOCK_USER_ID, gerar)
 
 
 @app.get("/formas-pagamento/{forma_pagamento_id}")
-def obter_forma_pagamento(forma_pagamento_id: str) -> Dict[str, Any]:
+async def obter_forma_pagamento(forma_pagamento_id: str) -> Dict[str, Any]:
     try:
-        forma_pagamento = get_forma_pagamento(forma_pagamento_id, MOCK_USER_ID)
+        forma_pagamento = await db_async.get_forma_pagamento(forma_pagamento_id, MOCK_USER_ID)
     except sqlite3.Error as exc:
         raise HTTPException(status_code=500, detail="erro ao acessar banco") from exc
     if forma_pagamento is None:
@@ -446,7 +1275,7 @@ def obter_forma_pagamento(forma_pagamento_id: str) -> Dict[str, Any]:
 
 
 @app.put("/formas-pagamento/{forma_pagamento_id}")
-def atualizar_forma_pagamento(
+async def atualizar_forma_pagamento(
     forma_pagamento_id: str,
     payload: Dict[str, Any],
 ) -> Dict[str, Any]:
@@ -456,7 +1285,7 @@ def atualizar_forma_pagamento(
         raise HTTPException(status_code=422, detail=exc.errors) from exc
 
     try:
-        forma_pagamento = update_forma_pagamento(
+        forma_pagamento = await db_async.update_forma_pagamento(
             forma_pagamento_id,
             MOCK_USER_ID,
             data["nome"],
@@ -473,11 +1302,29 @@ def atualizar_forma_pagamento(
 
 
 @app.delete("/formas-pagamento/{forma_pagamento_id}", status_code=204)
-def remover_forma_pagamento(forma_pagamento_id: str) -> Response:
+async def remover_forma_pagamento(forma_pagamento_id: str) -> Response:
     try:
-        deleted = delete_forma_pagamento(forma_pagamento_id, MOCK_USER_ID)
+        deleted = await db_async.delete_forma_pagamento(forma_pagamento_id, MOCK_USER_ID)
     except sqlite3.Error as exc:
         raise HTTPException(status_code=500, detail="erro ao acessar banco") from exc
     if not deleted:
         raise HTTPException(status_code=404, detail="recurso nao encontrado")
     return Response(status_code=204)
+
+
+@app.get("/monitoramento/cache")
+async def monitorar_cache() -> Dict[str, Any]:
+    return {
+        "referencias": estatisticas_cache_referencias(),
+        "respostas": _respostas.estatisticas(),
+    }
+
+
+@app.get("/monitoramento/consultas-lentas")
+async def monitorar_consultas_lentas() -> Dict[str, Any]:
+    return consultas_lentas()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metricas() -> PlainTextResponse:
+    return PlainTextResponse(REGISTRO.renderizar(), media_type=PROMETHEUS_CONTENT_TYPE)
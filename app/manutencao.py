@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app import db
+from app.migracoes import VERSAO_ATUAL, versao_schema
+from app.calculos import (
+    acumular_deltas,
+    competencia_to_index,
+    consolidar_periodo,
+    de_centavos,
+    resumo_deltas,
+)
+
+RESUMO_CAMPOS = ("entradas_centavos", "gastos_centavos", "parcelas_centavos")
+SALDO_CAMPO = "saldo_acumulado_centavos"
+
+
+def _competencias_afetadas(usuario_id: str) -> List[str]:
+    meses: Dict[str, List[int]] = {}
+    for lote in db.iter_lancamentos(usuario_id=usuario_id):
+        for lancamento in lote:
+            acumular_deltas(resumo_deltas(lancamento.como_dict()), meses)
+    return list(meses)
+
+
+def verificar_resumo_mensal(usuario_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    resumo: Dict[Tuple[str, str], Dict[str, Any]] = {
+        (linha["usuario_id"], linha["competencia"]): linha
+        for linha in db.list_resumo_mensal(usuario_id)
+    }
+    usuarios = {usuario for usuario, _ in resumo}
+    if usuario_id is not None:
+        usuarios.add(usuario_id)
+    else:
+        usuarios.update(db.list_usuarios_lancamentos())
+
+    divergencias: List[Dict[str, Any]] = []
+    for usuario in sorted(usuarios):
+        competencias = set(_competencias_afetadas(usuario))
+        competencias.update(competencia for dono, competencia in resumo if dono == usuario)
+        if not competencias:
+            continue
+        inicio = min(competencias, key=competencia_to_index)
+        fim = max(competencias, key=competencia_to_index)
+        calculados = consolidar_periodo(db.consolidacao_periodo(inicio, fim, usuario), inicio, fim)
+        acumulado, acumulados = db.list_saldo_acumulado(inicio, fim, usuario)
+        saldo = 0
+        for esperado in calculados:
+            competencia = esperado["competencia"]
+            linha = dict(resumo.get((usuario, competencia), {}))
+            saldo += esperado["entradas_centavos"] - esperado["gastos_centavos"]
+            saldo -= esperado["parcelas_centavos"]
+            acumulado = acumulados.get(competencia, acumulado)
+            linha[SALDO_CAMPO] = acumulado
+            esperado = {**esperado, SALDO_CAMPO: saldo}
+            for campo in (*RESUMO_CAMPOS, SALDO_CAMPO):
+                materializado = linha.get(campo, 0)
+                if materializado != esperado[campo]:
+                    divergencias.append(
+                        {
+                            "usuario_id": usuario,
+                            "competencia": competencia,
+                            "campo": campo,
+                            "resumo": de_centavos(materializado),
+                            "calculado": de_centavos(esperado[campo]),
+                        }
+                    )
+    return divergencias
+
+
+TABELAS_POR_USUARIO = (
+    ("categorias", "id, usuario_id, nome"),
+    ("formas_pagamento", "id, usuario_id, nome"),
+    ("lancamentos", db.LANCAMENTO_COLUNAS),
+    ("recorrencias", db.RECORRENCIA_COLUNAS),
+    ("fechamentos", db.FECHAMENTO_COLUNAS),
+)
+
+
+def descrever_shards() -> List[Dict[str, Any]]:
+    shards: List[Dict[str, Any]] = []
+    for usuario_id in db.listar_shards():
+        with db.get_connection(usuario_id, criar=False) as conn:
+            versao = versao_schema(conn)
+            lancamentos = conn.execute("SELECT COUNT(*) FROM lancamentos").fetchone()[0]
+        caminho = db.caminho_shard(usuario_id)
+        shards.append(
+            {
+                "usuario_id": usuario_id,
+                "versao": versao,
+                "lancamentos": lancamentos,
+                "bytes": caminho.stat().st_size,
+            }
+        )
+    return shards
+
+
+def particionar_banco(origem: str) -> Dict[str, int]:
+    if not db.SHARDS_ATIVOS:
+        raise ValueError("particionar exige FINANCAS_DB_SHARDS=1")
+    fonte = sqlite3.connect(f"file:{origem}?mode=ro", uri=True)
+    try:
+        if versao_schema(fonte) < VERSAO_ATUAL:
+            raise ValueError("banco de origem desatualizado: rode migrar nele antes")
+        existentes = {
+            row[0] for row in fonte.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+        tabelas = [item for item in TABELAS_POR_USUARIO if item[0] in existentes]
+        usuarios = sorted(
+            {
+                row[0]
+                for tabela, _ in tabelas
+                for row in fonte.execute(f"SELECT DISTINCT usuario_id FROM {tabela}")
+            }
+        )
+        copiados: Dict[str, int] = {}
+        for usuario_id in usuarios:
+            with db.get_connection(usuario_id) as conn:
+                for tabela, colunas in tabelas:
+                    marcadores = ", ".join("?" * len(colunas.split(",")))
+                    cursor = conn.executemany(
+                        f"INSERT OR IGNORE INTO {tabela} ({colunas}) VALUES ({marcadores})",
+                        fonte.execute(
+                            f"SELECT {colunas} FROM {tabela} WHERE usuario_id = ?",
+                            (usuario_id,),
+                        ),
+                    )
+                    if tabela == "lancamentos":
+                        copiados[usuario_id] = cursor.rowcount
+            db.rebuild_resumo_mensal(usuario_id)
+    finally:
+        fonte.close()
+    return copiados
+
+
+def _cmd_migrar(args: argparse.Namespace) -> int:
+    if db.SHARDS_ATIVOS:
+        shards = descrever_shards()
+        for shard in shards:
+            print(f"{shard['usuario_id']}: schema na versao {shard['versao']}")
+        print(f"{len(shards)} shards na versao {VERSAO_ATUAL}")
+        return 0
+    with db.get_connection() as conn:
+        versao = versao_schema(conn)
+    print(f"schema na versao {versao}")
+    return 0
+
+
+def _cmd_shards(args: argparse.Namespace) -> int:
+    if not db.SHARDS_ATIVOS:
+        print("shards desativados (FINANCAS_DB_SHARDS=0)")
+        return 1
+    shards = descrever_shards()
+    for shard in shards:
+        print(
+            f"{shard['usuario_id']} versao={shard['versao']} "
+            f"lancamentos={shard['lancamentos']} bytes={shard['bytes']}"
+        )
+    print(f"{len(shards)} shards em {db.SHARDS_DIR}")
+    return 0
+
+
+def _cmd_particionar(args: argparse.Namespace) -> int:
+    try:
+        copiados = particionar_banco(args.origem)
+    except (ValueError, sqlite3.Error) as exc:
+        print(f"erro: {exc}")
+        return 1
+    for usuario_id, quantidade in copiados.items():
+        print(f"{usuario_id}: {quantidade} lancamentos copiados")
+    print(f"{len(copiados)} usuarios particionados")
+    return 0
+
+
+def _cmd_resumo_rebuild(args: argparse.Namespace) -> int:
+    linhas = db.rebuild_resumo_mensal(args.usuario_id)
+    print(f"resumo_mensal reconstruido: {linhas} linhas")
+    return 0
+
+
+def _cmd_resumo_verificar(args: argparse.Namespace) -> int:
+    divergencias = verificar_resumo_mensal(args.usuario_id)
+    for item in divergencias:
+        print(
+            f"{item['usuario_id']} {item['competencia']} {item['campo']}: "
+            f"resumo={item['resumo']:.2f} calculado={item['calculado']:.2f}"
+        )
+    if divergencias:
+        print(f"{len(divergencias)} divergencias encontradas")
+        return 1
+    print("resumo_mensal consistente")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.manutencao")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    migrar = subparsers.add_parser("migrar", help="aplica as migracoes pendentes do schema")
+    migrar.set_defaults(func=_cmd_migrar)
+
+    shards = subparsers.add_parser("shards", help="lista os bancos por usuario")
+    shards.set_defaults(func=_cmd_shards)
+
+    particionar = subparsers.add_parser(
+        "particionar",
+        help="copia um banco unico para os bancos por usuario",
+    )
+    particionar.add_argument("origem", help="caminho do financas.db de origem")
+    particionar.set_defaults(func=_cmd_particionar)
+
+    rebuild = subparsers.add_parser("resumo-rebuild", help="recalcula resumo_mensal do zero")
+    rebuild.add_argument("--usuario-id")
+    rebuild.set_defaults(func=_cmd_resumo_rebuild)
+
+    verificar = subparsers.add_parser(
+        "resumo-verificar",
+        help="compara resumo_mensal com o calculo a partir dos lancamentos",
+    )
+    verificar.add_argument("--usuario-id")
+    verificar.set_defaults(func=_cmd_resumo_verificar)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    db.init_db()
+    try:
+        return args.func(args)
+    finally:
+        db.close_pool()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,468 @@
+from __future__ import annotations
+
+import bisect
+import contextvars
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+T = TypeVar("T")
+Labels = Tuple[Tuple[str, str], ...]
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+METRICAS_ATIVAS = os.getenv("FINANCAS_METRICAS", "1") == "1"
+PROFILER_ATIVO = os.getenv("FINANCAS_PROFILER", "0") == "1"
+PROFILER_LIMIAR_MS = float(os.getenv("FINANCAS_PROFILER_LIMIAR_MS", "500"))
+PROFILER_INTERVALO_MS = float(os.getenv("FINANCAS_PROFILER_INTERVALO_MS", "5"))
+PROFILER_DIR = Path(os.getenv("FINANCAS_PROFILER_DIR", str(BASE_DIR / "data" / "perfis")))
+
+BUCKETS_SEGUNDOS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+COMANDOS_SEM_QUERY = (
+    "BEGIN",
+    "COMMIT",
+    "ROLLBACK",
+    "PRAGMA",
+    "SAVEPOINT",
+    "RELEASE",
+    "EXPLAIN",
+)
+
+
+def _labels(valores: Dict[str, str]) -> Labels:
+    return tuple(sorted(valores.items()))
+
+
+def _formatar_labels(labels: Labels, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pares = list(labels) + list(extra)
+    if not pares:
+        return ""
+    texto = ",".join(
+        f'{nome}="{str(valor).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for nome, valor in pares
+    )
+    return "{" + texto + "}"
+
+
+def _formatar_numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+class Contador:
+    def __init__(self, nome: str, ajuda: str) -> None:
+        self.nome = nome
+        self.ajuda = ajuda
+        self._valores: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, valor: float = 1.0, **labels: str) -> None:
+        chave = _labels(labels)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0.0) + valor
+
+    def valor(self, **labels: str) -> float:
+        return self._valores.get(_labels(labels), 0.0)
+
+    def renderizar(self) -> List[str]:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} counter"]
+        with self._lock:
+            itens = sorted(self._valores.items())
+        for labels, valor in itens:
+            linhas.append(f"{self.nome}{_formatar_labels(labels)} {_formatar_numero(valor)}")
+        return linhas
+
+
+class Histograma:
+    def __init__(
+        self,
+        nome: str,
+        ajuda: str,
+        buckets: Sequence[float] = BUCKETS_SEGUNDOS,
+    ) -> None:
+        self.nome = nome
+        self.ajuda = ajuda
+        self.buckets = tuple(buckets)
+        self._series: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, **labels: str) -> None:
+        chave = _labels(labels)
+        posicao = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = [0.0] * (len(self.buckets) + 3)
+            serie[posicao] += 1
+            serie[-2] += 1
+            serie[-1] += valor
+
+    def contagem(self, **labels: str) -> int:
+        serie = self._series.get(_labels(labels))
+        return int(serie[-2]) if serie else 0
+
+    def renderizar(self) -> List[str]:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} histogram"]
+        with self._lock:
+            itens = sorted((labels, list(serie)) for labels, serie in self._series.items())
+        for labels, serie in itens:
+            acumulado = 0.0
+            for limite, quantidade in zip(self.buckets + (float("inf"),), serie):
+                acumulado += quantidade
+                le = _formatar_labels(labels, [("le", _formatar_numero(limite))])
+                linhas.append(f"{self.nome}_bucket{le} {_formatar_numero(acumulado)}")
+            linhas.append(f"{self.nome}_count{_formatar_labels(labels)} {_formatar_numero(serie[-2])}")
+            linhas.append(f"{self.nome}_sum{_formatar_labels(labels)} {_formatar_numero(serie[-1])}")
+        return linhas
+
+
+class Registro:
+    def __init__(self) -> None:
+        self._metricas: List[Any] = []
+        self._coletores: Dict[str, Callable[[], Iterable[str]]] = {}
+
+    def contador(self, nome: str, ajuda: str) -> Contador:
+        metrica = Contador(nome, ajuda)
+        self._metricas.append(metrica)
+        return metrica
+
+    def histograma(self, nome: str, ajuda: str) -> Histograma:
+        metrica = Histograma(nome, ajuda)
+        self._metricas.append(metrica)
+        return metrica
+
+    def coletor(self, nome: str, coletor: Callable[[], Iterable[str]]) -> None:
+        self._coletores[nome] = coletor
+
+    def renderizar(self) -> str:
+        linhas: List[str] = []
+        for metrica in self._metricas:
+            linhas.extend(metrica.renderizar())
+        for coletor in self._coletores.values():
+            linhas.extend(coletor())
+        return "\n".join(linhas) + "\n"
+
+
+def gauges(nome: str, ajuda: str, valores: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    linhas = [f"# HELP {nome} {ajuda}", f"# TYPE {nome} gauge"]
+    for labels, valor in valores:
+        linhas.append(f"{nome}{_formatar_labels(_labels(labels))} {_formatar_numero(valor)}")
+    return linhas
+
+
+REGISTRO = Registro()
+
+HTTP_DURACAO = REGISTRO.histograma(
+    "financas_http_request_duration_seconds",
+    "Latencia das requisicoes HTTP por rota.",
+)
+DB_DURACAO = REGISTRO.histograma(
+    "financas_db_call_duration_seconds",
+    "Tempo gasto em cada funcao de app.db.",
+)
+DB_QUERIES = REGISTRO.contador(
+    "financas_db_queries_total",
+    "Comandos SQL executados por funcao de app.db.",
+)
+DB_LINHAS = REGISTRO.contador(
+    "financas_db_rows_total",
+    "Linhas devolvidas por funcao de app.db.",
+)
+DB_ERROS = REGISTRO.contador(
+    "financas_db_errors_total",
+    "Chamadas de app.db que terminaram com excecao.",
+)
+ETAPA_DURACAO = REGISTRO.histograma(
+    "financas_stage_duration_seconds",
+    "Tempo de validacao e serializacao por funcao.",
+)
+
+_queries_chamada: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar(
+    "financas_queries_chamada",
+    default=None,
+)
+_perfil_requisicao: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar(
+    "financas_perfil_requisicao",
+    default=None,
+)
+
+
+def contar_query(sql: str) -> None:
+    contador = _queries_chamada.get()
+    if contador is None:
+        return
+    if sql.lstrip()[:9].upper().startswith(COMANDOS_SEM_QUERY):
+        return
+    contador[0] += 1
+
+
+def _linhas(resultado: Any) -> int:
+    if resultado is None or isinstance(resultado, bool):
+        return 0
+    if isinstance(resultado, (list, tuple, set, frozenset)):
+        return len(resultado)
+    if isinstance(resultado, dict):
+        return 1
+    return 0
+
+
+def _registrar_db(funcao: str, inicio: float, queries: List[int], linhas: int, erro: bool) -> None:
+    DB_DURACAO.observar(time.perf_counter() - inicio, funcao=funcao)
+    DB_QUERIES.incrementar(queries[0], funcao=funcao)
+    DB_LINHAS.incrementar(linhas, funcao=funcao)
+    if erro:
+        DB_ERROS.incrementar(funcao=funcao)
+
+
+def instrumentar_db(fn: F) -> F:
+    if not METRICAS_ATIVAS:
+        return fn
+    nome = fn.__name__
+
+    if inspect.isgeneratorfunction(fn):
+
+        @functools.wraps(fn)
+        def gerador(*args: Any, **kwargs: Any) -> Any:
+            queries = [0]
+            linhas = 0
+            decorrido = 0.0
+            geracao = fn(*args, **kwargs)
+            try:
+                while True:
+                    inicio = time.perf_counter()
+                    token = _queries_chamada.set(queries)
+                    try:
+                        lote = next(geracao)
+                    except StopIteration:
+                        break
+                    finally:
+                        _queries_chamada.reset(token)
+                        decorrido += time.perf_counter() - inicio
+                    linhas += _linhas(lote)
+                    yield lote
+            except Exception:
+                DB_ERROS.incrementar(funcao=nome)
+                raise
+            finally:
+                geracao.close()
+                _registrar_db(nome, time.perf_counter() - decorrido, queries, linhas, False)
+
+        return gerador  # type: ignore[return-value]
+
+    @functools.wraps(fn)
+    def chamada(*args: Any, **kwargs: Any) -> Any:
+        queries = [0]
+        token = _queries_chamada.set(queries)
+        inicio = time.perf_counter()
+        resultado = None
+        erro = True
+        try:
+            resultado = fn(*args, **kwargs)
+            erro = False
+            return resultado
+        finally:
+            _queries_chamada.reset(token)
+            externo = _queries_chamada.get()
+            if externo is not None:
+                externo[0] += queries[0]
+            _registrar_db(nome, inicio, queries, _linhas(resultado), erro)
+
+    return chamada  # type: ignore[return-value]
+
+
+def cronometrar(etapa: str) -> Callable[[F], F]:
+    def decorador(fn: F) -> F:
+        if not METRICAS_ATIVAS:
+            return fn
+        nome = fn.__name__
+
+        @functools.wraps(fn)
+        def chamada(*args: Any, **kwargs: Any) -> Any:
+            inicio = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                ETAPA_DURACAO.observar(time.perf_counter() - inicio, etapa=etapa, funcao=nome)
+
+        return chamada  # type: ignore[return-value]
+
+    return decorador
+
+
+def _pilha_colapsada(frame: Any) -> str:
+    partes: List[str] = []
+    while frame is not None:
+        codigo = frame.f_code
+        partes.append(f"{Path(codigo.co_filename).name}:{codigo.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(partes))
+
+
+ESPERAS_OCIOSAS = {("selectors.py", "select"), ("queue.py", "get")}
+
+
+def _ociosa(frame: Any) -> bool:
+    codigo = frame.f_code
+    return (Path(codigo.co_filename).name, codigo.co_name) in ESPERAS_OCIOSAS
+
+
+class AmostradorPerfil:
+    def __init__(self, intervalo_ms: float) -> None:
+        self.intervalo_s = intervalo_ms / 1000
+        self._amostras: Dict[int, Counter] = {}
+        self._threads: Dict[int, Counter] = {}
+        self._proximo = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self) -> int:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._executar,
+                    name="financas-profiler",
+                    daemon=True,
+                )
+                self._thread.start()
+            self._proximo += 1
+            self._amostras[self._proximo] = Counter()
+            self._threads[self._proximo] = Counter([threading.get_ident()])
+            return self._proximo
+
+    def finalizar(self, token: int) -> Counter:
+        with self._lock:
+            self._threads.pop(token, None)
+            return self._amostras.pop(token, Counter())
+
+    def entrar(self, token: int) -> None:
+        with self._lock:
+            threads = self._threads.get(token)
+            if threads is not None:
+                threads[threading.get_ident()] += 1
+
+    def sair(self, token: int) -> None:
+        with self._lock:
+            threads = self._threads.get(token)
+            if threads is not None:
+                thread_id = threading.get_ident()
+                threads[thread_id] -= 1
+                if threads[thread_id] <= 0:
+                    del threads[thread_id]
+
+    def _executar(self) -> None:
+        while True:
+            time.sleep(self.intervalo_s)
+            with self._lock:
+                if not self._amostras:
+                    continue
+                destinos = [
+                    (self._amostras[token], list(threads))
+                    for token, threads in self._threads.items()
+                ]
+            amostradas = {thread_id for _, threads in destinos for thread_id in threads}
+            pilhas = {
+                thread_id: _pilha_colapsada(frame)
+                for thread_id, frame in sys._current_frames().items()
+                if thread_id in amostradas and not _ociosa(frame)
+            }
+            with self._lock:
+                for destino, threads in destinos:
+                    destino.update(
+                        pilhas[thread_id] for thread_id in threads if thread_id in pilhas
+                    )
+
+
+def no_perfil(fn: Callable[[], T]) -> Callable[[], T]:
+    token = _perfil_requisicao.get()
+    if token is None:
+        return fn
+
+    def chamada() -> T:
+        _amostrador.entrar(token)
+        try:
+            return fn()
+        finally:
+            _amostrador.sair(token)
+
+    return chamada
+
+
+def gravar_perfil(metodo: str, rota: str, duracao_s: float, amostras: Counter) -> Optional[Path]:
+    if not amostras:
+        return None
+    PROFILER_DIR.mkdir(parents=True, exist_ok=True)
+    carimbo = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    rota_arquivo = rota.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "raiz"
+    caminho = PROFILER_DIR / f"{carimbo}-{metodo}-{rota_arquivo}-{int(duracao_s * 1000)}ms.folded"
+    caminho.write_text(
+        "".join(f"{pilha} {quantidade}\n" for pilha, quantidade in amostras.most_common()),
+        encoding="utf-8",
+    )
+    return caminho
+
+
+_amostrador = AmostradorPerfil(PROFILER_INTERVALO_MS)
+
+
+class MetricasMiddleware:
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not METRICAS_ATIVAS:
+            await self.app(scope, receive, send)
+            return
+
+        status = {"codigo": 500}
+
+        async def enviar(mensagem: Dict[str, Any]) -> None:
+            if mensagem["type"] == "http.response.start":
+                status["codigo"] = mensagem["status"]
+            await send(mensagem)
+
+        token = _amostrador.iniciar() if PROFILER_ATIVO else None
+        contexto = _perfil_requisicao.set(token)
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _perfil_requisicao.reset(contexto)
+            duracao = time.perf_counter() - inicio
+            rota_obj = scope.get("route")
+            rota = getattr(rota_obj, "path", None) or "desconhecida"
+            HTTP_DURACAO.observar(
+                duracao,
+                metodo=scope["method"],
+                rota=rota,
+                status=str(status["codigo"]),
+            )
+            if token is not None:
+                amostras = _amostrador.finalizar(token)
+                if duracao * 1000 >= PROFILER_LIMIAR_MS:
+                    gravar_perfil(scope["method"], rota, duracao, amostras)
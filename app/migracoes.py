@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+from contextlib import AbstractContextManager
+from typing import Callable, List, Set, Tuple
+
+from app.calculos import para_centavos
+
+ConnectionFactory = Callable[[], AbstractContextManager]
+
+MIGRACAO_TAMANHO_LOTE = int(os.getenv("FINANCAS_MIGRACAO_TAMANHO_LOTE", "1000"))
+
+
+def versao_schema(conn: sqlite3.Connection) -> int:
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def definir_versao_schema(conn: sqlite3.Connection, versao: int) -> None:
+    conn.execute(f"PRAGMA user_version = {int(versao)}")
+
+
+def _colunas(conn: sqlite3.Connection, tabela: str) -> Set[str]:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({tabela})").fetchall()}
+
+
+def _migrar_valores_para_centavos(get_connection: ConnectionFactory, tamanho_lote: int) -> None:
+    with get_connection() as conn:
+        colunas = _colunas(conn, "lancamentos")
+        if "valor_centavos" not in colunas:
+            conn.execute("ALTER TABLE lancamentos ADD COLUMN valor_centavos INTEGER")
+        if "valor_total_centavos" not in colunas:
+            conn.execute("ALTER TABLE lancamentos ADD COLUMN valor_total_centavos INTEGER")
+        if "valor" not in colunas:
+            return
+
+    ultimo_rowid = 0
+    while True:
+        with get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT rowid, valor, valor_total
+                FROM lancamentos
+                WHERE rowid > ?
+                ORDER BY rowid
+                LIMIT ?
+                """,
+                (ultimo_rowid, tamanho_lote),
+            ).fetchall()
+            if not rows:
+                break
+            conn.executemany(
+                """
+                UPDATE lancamentos
+                SET valor_centavos = ?, valor_total_centavos = ?
+                WHERE rowid = ?
+                """,
+                [
+                    (
+                        para_centavos(valor) if valor is not None else None,
+                        para_centavos(valor_total) if valor_total is not None else None,
+                        rowid,
+                    )
+                    for rowid, valor, valor_total in rows
+                ],
+            )
+            ultimo_rowid = rows[-1][0]
+
+    with get_connection() as conn:
+        conn.execute("ALTER TABLE lancamentos DROP COLUMN valor")
+        conn.execute("ALTER TABLE lancamentos DROP COLUMN valor_total")
+
+
+MIGRACOES: List[Tuple[int, str, Callable[[ConnectionFactory, int], None]]] = [
+    (1, "valores monetarios em centavos inteiros", _migrar_valores_para_centavos),
+]
+VERSAO_ATUAL = MIGRACOES[-1][0]
+
+
+def aplicar_migracoes(
+    get_connection: ConnectionFactory,
+    tamanho_lote: int = MIGRACAO_TAMANHO_LOTE,
+) -> List[int]:
+    with get_connection() as conn:
+        versao = versao_schema(conn)
+
+    aplicadas: List[int] = []
+    for numero, _descricao, migracao in MIGRACOES:
+        if numero <= versao:
+            continue
+        migracao(get_connection, tamanho_lote)
+        with get_connection() as conn:
+            definir_versao_schema(conn, numero)
+        aplicadas.append(numero)
+    return aplicadas
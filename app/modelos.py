@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from typing import Any, Dict, NamedTuple, Optional
+
+from app.calculos import de_centavos
+
+
+class Lancamento(NamedTuple):
+    id: str
+    usuario_id: str
+    nome: str
+    data: str
+    competencia: str
+    tipo_lancamento: str
+    categoria_id: Optional[str]
+    forma_pagamento_id: Optional[str]
+    valor_centavos: Optional[int]
+    pago: Optional[int]
+    valor_total_centavos: Optional[int]
+    numero_parcelas: Optional[int]
+
+    def como_dict(self) -> Dict[str, Any]:
+        item: Dict[str, Any] = {
+            "id": self.id,
+            "usuario_id": self.usuario_id,
+            "nome": self.nome,
+            "data": self.data,
+            "competencia": self.competencia,
+            "tipo_lancamento": self.tipo_lancamento,
+        }
+
+        tipo = self.tipo_lancamento
+        if tipo == "ENTRADA":
+            item["valor"] = de_centavos(self.valor_centavos)
+        elif tipo == "FIXO" or tipo == "VARIAVEL":
+            item["categoria_id"] = self.categoria_id
+            item["forma_pagamento_id"] = self.forma_pagamento_id
+            item["valor"] = de_centavos(self.valor_centavos)
+            item["pago"] = bool(self.pago)
+        elif tipo == "PARCELADO":
+            item["categoria_id"] = self.categoria_id
+            item["forma_pagamento_id"] = self.forma_pagamento_id
+            item["valor_total"] = de_centavos(self.valor_total_centavos)
+            item["numero_parcelas"] = self.numero_parcelas
+
+        return item
+
+
+class Recorrencia(NamedTuple):
+    id: str
+    usuario_id: str
+    nome: str
+    tipo_lancamento: str
+    categoria_id: Optional[str]
+    forma_pagamento_id: Optional[str]
+    valor_centavos: int
+    dia: int
+    competencia_inicio: str
+    competencia_fim: Optional[str]
+
+    def como_dict(self) -> Dict[str, Any]:
+        item: Dict[str, Any] = {
+            "id": self.id,
+            "usuario_id": self.usuario_id,
+            "nome": self.nome,
+            "tipo_lancamento": self.tipo_lancamento,
+        }
+        if self.tipo_lancamento == "FIXO":
+            item["categoria_id"] = self.categoria_id
+            item["forma_pagamento_id"] = self.forma_pagamento_id
+        item["valor"] = de_centavos(self.valor_centavos)
+        item["dia"] = self.dia
+        item["competencia_inicio"] = self.competencia_inicio
+        item["competencia_fim"] = self.competencia_fim
+        return item
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence, Tuple
+
+CENTAVOS_QUANT = Decimal("1")
+
+# Acima deste limite o centavo deixa de ser exato em float; esses valores
+# seguem pela conversao em Decimal de `para_centavos`.
+LIMITE_CENTAVOS = 10**15
+
+
+def centavos_exatos(valor: Any) -> Optional[int]:
+    if isinstance(valor, int) and not isinstance(valor, bool):
+        centavos = valor * 100
+    elif isinstance(valor, float):
+        centavos = round(valor * 100)
+        if centavos / 100 != valor:
+            return None
+    else:
+        return None
+    if not 0 <= centavos < LIMITE_CENTAVOS:
+        return None
+    return centavos
+
+
+def agenda_parcelas_centavos(
+    totais_centavos: Sequence[int],
+    numeros_parcelas: Sequence[int],
+) -> Tuple[List[int], List[int]]:
+    bases = [
+        (2 * total + numero) // (2 * numero)
+        for total, numero in zip(totais_centavos, numeros_parcelas)
+    ]
+    ultimas = [
+        total - base * (numero - 1)
+        for total, base, numero in zip(totais_centavos, bases, numeros_parcelas)
+    ]
+    return bases, ultimas
+
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+from typing import Callable, List, Optional, Sequence, Tuple, Type
+
+DEFAULT_PRAGMAS: Tuple[Tuple[str, str], ...] = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", "-16000"),
+    ("mmap_size", "134217728"),
+    ("busy_timeout", "5000"),
+    ("temp_store", "MEMORY"),
+)
+
+
+class PoolClosedError(sqlite3.OperationalError):
+    pass
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        path: str,
+        size: int,
+        pragmas: Sequence[Tuple[str, str]] = DEFAULT_PRAGMAS,
+        timeout: float = 30.0,
+        inicializar: Optional[Callable[[sqlite3.Connection], None]] = None,
+        fabrica: Type[sqlite3.Connection] = sqlite3.Connection,
+        uri: bool = False,
+    ) -> None:
+        if size < 1:
+            raise ValueError("size deve ser maior ou igual a 1")
+        self.path = path
+        self.size = size
+        self.pragmas = tuple(pragmas)
+        self.timeout = timeout
+        self.inicializar = inicializar
+        self.fabrica = fabrica
+        self.uri = uri
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._closed = False
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            factory=self.fabrica,
+            uri=self.uri,
+        )
+        for name, value in self.pragmas:
+            conn.execute(f"PRAGMA {name} = {value}").fetchall()
+        conn.row_factory = sqlite3.Row
+        if self.inicializar is not None:
+            self.inicializar(conn)
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        if self._closed:
+            raise PoolClosedError("pool de conexoes encerrado")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                try:
+                    return self._open()
+                except Exception:
+                    self._opened -= 1
+                    raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty as exc:
+            raise sqlite3.OperationalError("pool de conexoes esgotado") from exc
+
+    def release(self, conn: sqlite3.Connection, broken: bool = False) -> None:
+        if broken or self._closed:
+            self._discard(conn)
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        conn.row_factory = sqlite3.Row
+        self._idle.put_nowait(conn)
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._opened -= 1
+
+    def check(self) -> bool:
+        saudaveis = 0
+        conexoes: List[sqlite3.Connection] = []
+        while True:
+            try:
+                conexoes.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        if not conexoes:
+            conexoes.append(self.acquire())
+
+        for conn in conexoes:
+            try:
+                conn.execute("SELECT 1").fetchone()
+            except sqlite3.Error:
+                self._discard(conn)
+                continue
+            saudaveis += 1
+            self.release(conn)
+        return saudaveis > 0
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    @property
+    def opened(self) -> int:
+        return self._opened
+
+    @property
+    def idle(self) -> int:
+        return self._idle.qsize()
+
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from itertools import chain
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Sequence, Sized
+
+logger = logging.getLogger("financas.db.lentas")
+
+ESPACOS_RE = re.compile(r"\s+")
+PLANOS_TAMANHO_MAXIMO = 256
+
+
+def _normalizar_sql(sql: str) -> str:
+    return ESPACOS_RE.sub(" ", sql).strip()
+
+
+def forma_parametros(parametros: Any) -> Any:
+    if parametros is None:
+        return []
+    if isinstance(parametros, dict):
+        return {chave: type(valor).__name__ for chave, valor in parametros.items()}
+    return [type(valor).__name__ for valor in parametros]
+
+
+def tabelas_com_scan_completo(plano: Sequence[str], tabelas: Sequence[str]) -> List[str]:
+    encontradas = []
+    for tabela in tabelas:
+        padrao = re.compile(rf"^SCAN (TABLE )?{re.escape(tabela)}( AS \w+)?$")
+        if any(padrao.match(detalhe) for detalhe in plano):
+            encontradas.append(tabela)
+    return encontradas
+
+
+class RegistroConsultasLentas:
+    def __init__(
+        self,
+        limiar_ms: float,
+        historico: int = 100,
+        tabelas_monitoradas: Sequence[str] = ("lancamentos",),
+    ) -> None:
+        self.limiar_ms = limiar_ms
+        self.tabelas_monitoradas = tuple(tabelas_monitoradas)
+        self._recentes: Deque[Dict[str, Any]] = deque(maxlen=historico)
+        self._planos: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total = 0
+        self.scans_completos = 0
+
+    @property
+    def ativo(self) -> bool:
+        return self.limiar_ms >= 0
+
+    def _plano(self, conn: sqlite3.Connection, sql: str, parametros: Any) -> List[str]:
+        with self._lock:
+            plano = self._planos.get(sql)
+            if plano is not None:
+                self._planos.move_to_end(sql)
+                return plano
+        try:
+            linhas = sqlite3.Connection.execute(
+                conn,
+                f"EXPLAIN QUERY PLAN {sql}",
+                parametros if parametros is not None else (),
+            ).fetchall()
+        except sqlite3.Error:
+            return []
+        plano = [linha[3] for linha in linhas]
+        with self._lock:
+            self._planos[sql] = plano
+            if len(self._planos) > PLANOS_TAMANHO_MAXIMO:
+                self._planos.popitem(last=False)
+        return plano
+
+    def registrar(
+        self,
+        conn: sqlite3.Connection,
+        sql: str,
+        parametros: Any,
+        duracao_s: float,
+        linhas: int,
+        execucoes: Optional[int] = 1,
+    ) -> Optional[Dict[str, Any]]:
+        duracao_ms = duracao_s * 1000
+        if not self.ativo or duracao_ms < self.limiar_ms:
+            return None
+        plano = self._plano(conn, sql, parametros)
+        scans = tabelas_com_scan_completo(plano, self.tabelas_monitoradas)
+        entrada = {
+            "registrado_em": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "sql": _normalizar_sql(sql),
+            "parametros": forma_parametros(parametros),
+            "execucoes": execucoes,
+            "linhas": linhas,
+            "duracao_ms": round(duracao_ms, 3),
+            "plano": plano,
+            "scan_completo": scans,
+        }
+        with self._lock:
+            self._recentes.append(entrada)
+            self.total += 1
+            if scans:
+                self.scans_completos += 1
+        logger.warning(
+            "consulta lenta %.1f ms linhas=%d scan_completo=%s sql=%s parametros=%s plano=%s",
+            duracao_ms,
+            linhas,
+            ",".join(scans) or "-",
+            entrada["sql"],
+            entrada["parametros"],
+            " | ".join(plano),
+        )
+        return entrada
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._recentes.clear()
+            self._planos.clear()
+            self.total = 0
+            self.scans_completos = 0
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "limiar_ms": self.limiar_ms,
+                "total": self.total,
+                "scans_completos": self.scans_completos,
+                "recentes": list(reversed(self._recentes)),
+            }
+
+
+class CursorRastreado(sqlite3.Cursor):
+    _consulta: Optional[List[Any]] = None
+
+    def _registro(self) -> Optional[RegistroConsultasLentas]:
+        return getattr(self.connection, "consultas_lentas", None)
+
+    def _iniciar(
+        self,
+        sql: str,
+        parametros: Any,
+        duracao_s: float,
+        execucoes: Optional[int],
+    ) -> None:
+        self._consulta = [sql, parametros, duracao_s, 0, execucoes]
+        if self.description is None:
+            self._consulta[3] = max(self.rowcount, 0)
+            self._finalizar()
+
+    def _acumular(self, inicio: float, linhas: int) -> None:
+        if self._consulta is not None:
+            self._consulta[2] += time.perf_counter() - inicio
+            self._consulta[3] += linhas
+
+    def _finalizar(self) -> None:
+        consulta, self._consulta = self._consulta, None
+        registro = self._registro()
+        if consulta is None or registro is None:
+            return
+        sql, parametros, duracao_s, linhas, execucoes = consulta
+        try:
+            registro.registrar(self.connection, sql, parametros, duracao_s, linhas, execucoes)
+        except sqlite3.Error:
+            pass
+
+    def execute(self, sql: str, parameters: Any = ()) -> "CursorRastreado":
+        self._finalizar()
+        inicio = time.perf_counter()
+        super().execute(sql, parameters)
+        self._iniciar(sql, parameters, time.perf_counter() - inicio, 1)
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> "CursorRastreado":
+        self._finalizar()
+        execucoes = len(seq_of_parameters) if isinstance(seq_of_parameters, Sized) else None
+        iterador = iter(seq_of_parameters)
+        primeiro = next(iterador, None)
+        restantes = iterador if primeiro is None else chain((primeiro,), iterador)
+        inicio = time.perf_counter()
+        super().executemany(sql, restantes)
+        self._iniciar(sql, primeiro, time.perf_counter() - inicio, execucoes)
+        return self
+
+    def fetchone(self) -> Any:
+        inicio = time.perf_counter()
+        row = super().fetchone()
+        self._acumular(inicio, 0 if row is None else 1)
+        if row is None:
+            self._finalizar()
+        return row
+
+    def fetchmany(self, size: Optional[int] = None) -> List[Any]:
+        tamanho = self.arraysize if size is None else size
+        inicio = time.perf_counter()
+        rows = super().fetchmany(tamanho)
+        self._acumular(inicio, len(rows))
+        if len(rows) < tamanho:
+            self._finalizar()
+        return rows
+
+    def fetchall(self) -> List[Any]:
+        inicio = time.perf_counter()
+        rows = super().fetchall()
+        self._acumular(inicio, len(rows))
+        self._finalizar()
+        return rows
+
+    def __next__(self) -> Any:
+        inicio = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._acumular(inicio, 0)
+            self._finalizar()
+            raise
+        self._acumular(inicio, 1)
+        return row
+
+    def close(self) -> None:
+        self._finalizar()
+        super().close()
+
+    def __del__(self) -> None:
+        try:
+            self._finalizar()
+        except Exception:
+            pass
+
+
+class ConexaoRastreada(sqlite3.Connection):
+    consultas_lentas: Optional[RegistroConsultasLentas] = None
+
+    def cursor(self, factory: Any = CursorRastreado) -> Any:
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Any = ()) -> Any:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> Any:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
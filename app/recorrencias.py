@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import calendar
+from typing import Any, Dict, Iterator, Optional, Tuple
+from uuid import UUID, uuid5
+
+from app.calculos import competencia_to_index, de_centavos, index_to_competencia
+from app.modelos import Recorrencia
+
+NAMESPACE_RECORRENCIAS = UUID("5aa5c63c-e75e-4955-a69e-a15dd1333a24")
+TIPOS_RECORRENCIA = ("ENTRADA", "FIXO")
+
+
+def id_ocorrencia(recorrencia_id: str, competencia: str) -> str:
+    return str(uuid5(NAMESPACE_RECORRENCIAS, f"{recorrencia_id}/{competencia}"))
+
+
+def data_ocorrencia(dia: int, competencia: str) -> str:
+    ano, mes = int(competencia[0:4]), int(competencia[5:7])
+    return f"{competencia}-{min(dia, calendar.monthrange(ano, mes)[1]):02d}"
+
+
+def intervalo_ativo(
+    regra: Recorrencia,
+    competencia_inicio: str,
+    competencia_fim: str,
+) -> Optional[Tuple[int, int]]:
+    inicio = max(
+        competencia_to_index(competencia_inicio),
+        competencia_to_index(regra.competencia_inicio),
+    )
+    fim = competencia_to_index(competencia_fim)
+    if regra.competencia_fim is not None:
+        fim = min(fim, competencia_to_index(regra.competencia_fim))
+    if inicio > fim:
+        return None
+    return inicio, fim
+
+
+def ocorrencias(
+    regra: Recorrencia,
+    competencia_inicio: str,
+    competencia_fim: str,
+) -> Iterator[Dict[str, Any]]:
+    intervalo = intervalo_ativo(regra, competencia_inicio, competencia_fim)
+    if intervalo is None:
+        return
+    valor = de_centavos(regra.valor_centavos)
+    for indice in range(intervalo[0], intervalo[1] + 1):
+        competencia = index_to_competencia(indice)
+        lancamento: Dict[str, Any] = {
+            "id": id_ocorrencia(regra.id, competencia),
+            "usuario_id": regra.usuario_id,
+            "nome": regra.nome,
+            "data": data_ocorrencia(regra.dia, competencia),
+            "competencia": competencia,
+            "tipo_lancamento": regra.tipo_lancamento,
+            "valor": valor,
+        }
+        if regra.tipo_lancamento == "FIXO":
+            lancamento["categoria_id"] = regra.categoria_id
+            lancamento["forma_pagamento_id"] = regra.forma_pagamento_id
+            lancamento["pago"] = False
+        yield lancamento
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.pool import ConnectionPool
+
+
+def copiar_banco(origem: str, destino: str, timeout: float = 30.0) -> None:
+    temporario = f"{destino}.tmp"
+    if os.path.exists(temporario):
+        os.remove(temporario)
+    fonte = sqlite3.connect(origem, timeout=timeout)
+    try:
+        copia = sqlite3.connect(temporario)
+        try:
+            fonte.backup(copia)
+            copia.execute("PRAGMA journal_mode = DELETE").fetchall()
+        finally:
+            copia.close()
+    finally:
+        fonte.close()
+    os.replace(temporario, destino)
+
+
+class ReplicaLeitura:
+    def __init__(
+        self,
+        origem: str,
+        destino: str,
+        abrir: Callable[[str], ConnectionPool],
+        intervalo_s: float = 5.0,
+        versao: Optional[Callable[[], str]] = None,
+    ) -> None:
+        self.origem = origem
+        self.destino = destino
+        self.intervalo_s = intervalo_s
+        self._abrir = abrir
+        self._versao = versao
+        self._pool: Optional[ConnectionPool] = None
+        self._versao_copiada: Optional[str] = None
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.geracao = 0
+        self.atualizada_em: Optional[float] = None
+        self.ultima_copia_ms = 0.0
+        self.falhas = 0
+
+    def pool(self) -> ConnectionPool:
+        pool = self._pool
+        if pool is None:
+            self.atualizar()
+            pool = self._pool
+        if pool is None:
+            raise sqlite3.OperationalError("replica de leitura encerrada")
+        return pool
+
+    def atualizar(self, forcar: bool = True) -> bool:
+        with self._lock:
+            versao = self._versao() if self._versao is not None else None
+            if not forcar and self._pool is not None and versao == self._versao_copiada:
+                return False
+            inicio = time.perf_counter()
+            copiar_banco(self.origem, self.destino)
+            novo = self._abrir(self.destino)
+            antigo, self._pool = self._pool, novo
+            self._versao_copiada = versao
+            self.geracao += 1
+            self.atualizada_em = time.time()
+            self.ultima_copia_ms = (time.perf_counter() - inicio) * 1000
+        if antigo is not None:
+            antigo.close()
+        return True
+
+    def _executar(self) -> None:
+        while not self._parar.wait(self.intervalo_s):
+            try:
+                self.atualizar(forcar=False)
+            except (OSError, sqlite3.Error):
+                self.falhas += 1
+
+    def iniciar(self) -> None:
+        if self._thread is not None:
+            return
+        self.pool()
+        self._parar.clear()
+        self._thread = threading.Thread(
+            target=self._executar,
+            name="financas-db-replica",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def encerrar(self) -> None:
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        idade = None if self.atualizada_em is None else time.time() - self.atualizada_em
+        return {
+            "geracao": self.geracao,
+            "intervalo_s": self.intervalo_s,
+            "idade_s": None if idade is None else round(idade, 3),
+            "ultima_copia_ms": round(self.ultima_copia_ms, 3),
+            "falhas": self.falhas,
+        }
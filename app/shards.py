@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+from uuid import UUID
+
+from app.pool import ConnectionPool
+
+SHARD_SUFIXO = ".db"
+
+
+def nome_shard(usuario_id: str) -> str:
+    try:
+        return str(UUID(usuario_id))
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"usuario_id invalido para shard: {usuario_id!r}") from exc
+
+
+class RoteadorShards:
+    def __init__(
+        self,
+        diretorio: str,
+        abrir: Callable[[str], ConnectionPool],
+        preparar: Callable[[ConnectionPool], None],
+        max_abertos: int = 64,
+    ) -> None:
+        if max_abertos < 1:
+            raise ValueError("max_abertos deve ser maior ou igual a 1")
+        self.diretorio = Path(diretorio)
+        self.max_abertos = max_abertos
+        self._abrir = abrir
+        self._preparar = preparar
+        self._abertos: "OrderedDict[str, ConnectionPool]" = OrderedDict()
+        self._preparados: Set[str] = set()
+        self._lock = threading.Lock()
+        self._abertura = threading.Lock()
+        self.hits = 0
+        self.aberturas = 0
+        self.evictions = 0
+
+    def caminho(self, usuario_id: str) -> Path:
+        return self.diretorio / (nome_shard(usuario_id) + SHARD_SUFIXO)
+
+    def pool(self, usuario_id: str, criar: bool = True) -> Optional[ConnectionPool]:
+        nome = nome_shard(usuario_id)
+        with self._lock:
+            pool = self._abertos.get(nome)
+            if pool is not None:
+                self._abertos.move_to_end(nome)
+                self.hits += 1
+                return pool
+
+        with self._abertura:
+            with self._lock:
+                pool = self._abertos.get(nome)
+            if pool is not None:
+                return pool
+            caminho = self.diretorio / (nome + SHARD_SUFIXO)
+            if not criar and not caminho.exists():
+                return None
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+            pool = self._abrir(str(caminho))
+            if nome not in self._preparados:
+                try:
+                    self._preparar(pool)
+                except Exception:
+                    pool.close()
+                    raise
+                self._preparados.add(nome)
+
+            despejados: List[ConnectionPool] = []
+            with self._lock:
+                self._abertos[nome] = pool
+                self.aberturas += 1
+                while len(self._abertos) > self.max_abertos:
+                    despejados.append(self._abertos.popitem(last=False)[1])
+                    self.evictions += 1
+        for despejado in despejados:
+            despejado.close()
+        return pool
+
+    def shards(self) -> List[str]:
+        if not self.diretorio.is_dir():
+            return []
+        return sorted(caminho.stem for caminho in self.diretorio.glob(f"*{SHARD_SUFIXO}"))
+
+    def abertos(self) -> List[ConnectionPool]:
+        with self._lock:
+            return list(self._abertos.values())
+
+    def fechar(self) -> None:
+        with self._abertura, self._lock:
+            pools = list(self._abertos.values())
+            self._abertos.clear()
+            self._preparados.clear()
+        for pool in pools:
+            pool.close()
+
+    def estatisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "abertos": len(self._abertos),
+                "max_abertos": self.max_abertos,
+                "hits": self.hits,
+                "aberturas": self.aberturas,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import math
+import re
+from datetime import datetime
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+from uuid import UUID, uuid4
+
+from app.calculos import arredondar_centavos
+from app.parcelas import LIMITE_CENTAVOS
+
+
+class PayloadValidationError(Exception):
+    def __init__(self, errors: List[Dict[str, Any]]) -> None:
+        super().__init__("payload validation error")
+        self.errors = errors
+
+
+class Falha(NamedTuple):
+    msg: str
+    tipo: str
+
+
+Verificador = Callable[[Any], Any]
+Campos = Tuple[Tuple[str, Verificador], ...]
+
+AUSENTE = object()
+
+FALTANDO = Falha("campo obrigatorio", "value_error.missing")
+NAO_STRING = Falha("deve ser string", "type_error.string")
+VAZIO = Falha("nao pode ser vazio", "value_error")
+NAO_NUMERO = Falha("deve ser numero", "type_error.number")
+NEGATIVO = Falha("deve ser maior ou igual a zero", "value_error")
+NAO_FINITO = Falha("deve ser numero finito", "value_error")
+DINHEIRO_MAXIMO = LIMITE_CENTAVOS // 100
+ACIMA_DO_MAXIMO = Falha(f"deve ser menor que {DINHEIRO_MAXIMO}", "value_error")
+NAO_INTEIRO = Falha("deve ser inteiro", "type_error.integer")
+NAO_BOOLEANO = Falha("deve ser booleano", "type_error.bool")
+UUID_INVALIDO = Falha("uuid invalido", "value_error")
+NAO_OBJETO = Falha("deve ser objeto JSON", "type_error.object")
+
+DATA_ASCII_RE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
+COMPETENCIA_ASCII_RE = re.compile(r"[0-9]{4}-[0-9]{2}")
+UUID_CANONICO_RE = re.compile(
+    r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+)
+DIAS_POR_MES = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _bissexto(ano: int) -> bool:
+    return ano % 4 == 0 and (ano % 100 != 0 or ano % 400 == 0)
+
+
+def _data_rapida(valor: str) -> Optional[bool]:
+    if not DATA_ASCII_RE.fullmatch(valor):
+        return None
+    ano = int(valor[0:4])
+    mes = int(valor[5:7])
+    dia = int(valor[8:10])
+    if ano < 1 or not 1 <= mes <= 12 or dia < 1:
+        return False
+    if mes == 2 and _bissexto(ano):
+        return dia <= 29
+    return dia <= DIAS_POR_MES[mes - 1]
+
+
+def _competencia_rapida(valor: str) -> Optional[bool]:
+    if not COMPETENCIA_ASCII_RE.fullmatch(valor):
+        return None
+    return int(valor[0:4]) >= 1 and 1 <= int(valor[5:7]) <= 12
+
+
+VERIFICACOES_RAPIDAS: Dict[str, Callable[[str], Optional[bool]]] = {
+    "%Y-%m-%d": _data_rapida,
+    "%Y-%m": _competencia_rapida,
+}
+
+
+def texto(valor: Any) -> Any:
+    if valor is AUSENTE:
+        return FALTANDO
+    if not isinstance(valor, str):
+        return NAO_STRING
+    if not valor or valor.isspace():
+        return VAZIO
+    return valor
+
+
+def data(formato: str, padrao: re.Pattern[str]) -> Verificador:
+    invalido = Falha(f"formato invalido ({formato})", "value_error")
+    rapida = VERIFICACOES_RAPIDAS.get(formato)
+
+    def verificar(valor: Any) -> Any:
+        valor = texto(valor)
+        if type(valor) is Falha:
+            return valor
+        if rapida is not None:
+            resultado = rapida(valor)
+            if resultado is not None:
+                return valor if resultado else invalido
+        if not padrao.match(valor):
+            return invalido
+        try:
+            datetime.strptime(valor, formato)
+        except ValueError:
+            return invalido
+        return valor
+
+    return verificar
+
+
+def uuid_texto(valor: Any) -> Any:
+    valor = texto(valor)
+    if type(valor) is Falha or UUID_CANONICO_RE.fullmatch(valor):
+        return valor
+    try:
+        UUID(valor)
+    except ValueError:
+        return UUID_INVALIDO
+    return valor
+
+
+def opcao(opcoes: Iterable[str], falha: Falha) -> Verificador:
+    validas: FrozenSet[str] = frozenset(opcoes)
+
+    def verificar(valor: Any) -> Any:
+        valor = texto(valor)
+        if type(valor) is Falha or valor in validas:
+            return valor
+        return falha
+
+    return verificar
+
+
+def dinheiro(valor: Any) -> Any:
+    if valor is AUSENTE:
+        return FALTANDO
+    if not isinstance(valor, (int, float)) or isinstance(valor, bool):
+        return NAO_NUMERO
+    if isinstance(valor, float) and not math.isfinite(valor):
+        return NAO_FINITO
+    if valor < 0:
+        return NEGATIVO
+    if valor >= DINHEIRO_MAXIMO:
+        return ACIMA_DO_MAXIMO
+    return arredondar_centavos(valor)
+
+
+def inteiro(minimo: int, maximo: int) -> Verificador:
+    abaixo = Falha(f"deve ser maior ou igual a {minimo}", "value_error")
+    acima = Falha(f"deve ser menor ou igual a {maximo}", "value_error")
+
+    def verificar(valor: Any) -> Any:
+        if valor is AUSENTE:
+            return FALTANDO
+        if not isinstance(valor, int) or isinstance(valor, bool):
+            return NAO_INTEIRO
+        if valor < minimo:
+            return abaixo
+        if valor > maximo:
+            return acima
+        return valor
+
+    return verificar
+
+
+def booleano(valor: Any) -> Any:
+    if valor is AUSENTE:
+        return FALTANDO
+    if not isinstance(valor, bool):
+        return NAO_BOOLEANO
+    return valor
+
+
+def _falhas(payload: Mapping[str, Any], campos: Campos) -> List[Dict[str, Any]]:
+    errors = []
+    for campo, verificar in campos:
+        valor = verificar(payload.get(campo, AUSENTE))
+        if type(valor) is Falha:
+            errors.append({"loc": ["body", campo], "msg": valor.msg, "type": valor.tipo})
+    return errors
+
+
+def _compilar_campos(campos: Campos) -> Callable[[Mapping[str, Any], Dict[str, Any]], bool]:
+    def aplicar(payload: Mapping[str, Any], destino: Dict[str, Any]) -> bool:
+        for campo, verificar in campos:
+            valor = verificar(payload.get(campo, AUSENTE))
+            if type(valor) is Falha:
+                return False
+            destino[campo] = valor
+        return True
+
+    return aplicar
+
+
+def compilar_validador(
+    comuns: Campos,
+    discriminador: str,
+    por_tipo: Mapping[str, Campos],
+    usuario_id: str,
+) -> Callable[[Any], Dict[str, Any]]:
+    aplicar_comuns = _compilar_campos(comuns)
+    especificos = {
+        tipo: (_compilar_campos(campos), campos) for tipo, campos in por_tipo.items()
+    }
+
+    def validar(payload: Any) -> Dict[str, Any]:
+        if not isinstance(payload, dict):
+            raise PayloadValidationError(
+                [{"loc": ["body"], "msg": NAO_OBJETO.msg, "type": NAO_OBJETO.tipo}]
+            )
+        lancamento: Dict[str, Any] = {"id": "", "usuario_id": usuario_id}
+        if not aplicar_comuns(payload, lancamento):
+            raise PayloadValidationError(_falhas(payload, comuns))
+        aplicar, campos = especificos[lancamento[discriminador]]
+        if not aplicar(payload, lancamento):
+            raise PayloadValidationError(_falhas(payload, campos))
+        lancamento["id"] = str(uuid4())
+        return lancamento
+
+    return validar
@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+import argparse
+import http.client
+import importlib
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from bench.comum import BASE_DIR, gravar_resultado, ler_resultado, metadados
+from bench.gerador import (
+    MIX_PADRAO,
+    competencias,
+    gerar_lancamento,
+    gerar_lancamentos,
+    gerar_usuarios,
+    parse_mix,
+)
+
+SEMEADURA_LOTE = 5000
+
+Requisicao = Callable[[random.Random], Tuple[str, str, Optional[bytes]]]
+
+
+def percentil(amostras: Sequence[float], p: float) -> float:
+    if not amostras:
+        return 0.0
+    ordenadas = sorted(amostras)
+    posicao = max(1, math.ceil(p / 100 * len(ordenadas)))
+    return ordenadas[posicao - 1]
+
+
+def resumir(latencias_s: List[float], erros: int, duracao_s: float) -> Dict[str, Any]:
+    latencias_ms = [latencia * 1000 for latencia in latencias_s]
+    return {
+        "requisicoes": len(latencias_ms),
+        "erros": erros,
+        "duracao_s": round(duracao_s, 4),
+        "throughput_rps": round(len(latencias_ms) / duracao_s, 2) if duracao_s else 0.0,
+        "p50_ms": round(percentil(latencias_ms, 50), 3),
+        "p95_ms": round(percentil(latencias_ms, 95), 3),
+        "p99_ms": round(percentil(latencias_ms, 99), 3),
+        "max_ms": round(max(latencias_ms, default=0.0), 3),
+    }
+
+
+def _porta_livre() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def semear(
+    db_path: Path,
+    rng: random.Random,
+    usuarios: List[Dict[str, Any]],
+    total: int,
+    meses: List[str],
+    mix: Dict[str, float],
+    densidade_parcelados: float,
+    parcelas_max: int,
+) -> None:
+    os.environ["FINANCAS_DB_PATH"] = str(db_path)
+    import app.db as db
+
+    importlib.reload(db)
+    db.init_db()
+    try:
+        for usuario in usuarios:
+            for indice, categoria_id in enumerate(usuario["categorias"]):
+                db.insert_categoria(
+                    {"id": categoria_id, "usuario_id": usuario["id"], "nome": f"Categoria {indice}"}
+                )
+            for indice, forma_id in enumerate(usuario["formas_pagamento"]):
+                db.insert_forma_pagamento(
+                    {"id": forma_id, "usuario_id": usuario["id"], "nome": f"Forma {indice}"}
+                )
+
+        lote: List[Dict[str, Any]] = []
+        for lancamento in gerar_lancamentos(
+            rng, usuarios, total, meses, mix, densidade_parcelados, parcelas_max
+        ):
+            lote.append(lancamento)
+            if len(lote) >= SEMEADURA_LOTE:
+                db.insert_lancamentos(lote)
+                lote = []
+        if lote:
+            db.insert_lancamentos(lote)
+    finally:
+        db.close_pool()
+
+
+class Servidor:
+    def __init__(self, db_path: Path, env_extra: Dict[str, str]) -> None:
+        self.porta = _porta_livre()
+        env = os.environ.copy()
+        env.update(env_extra)
+        env["FINANCAS_DB_PATH"] = str(db_path)
+        self._proc = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "app.main:app",
+                "--port",
+                str(self.porta),
+                "--log-level",
+                "warning",
+            ],
+            cwd=str(BASE_DIR),
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+
+    def aguardar(self, timeout_s: float = 15.0) -> None:
+        prazo = time.monotonic() + timeout_s
+        while time.monotonic() < prazo:
+            if self._proc.poll() is not None:
+                saida = self._proc.stderr.read() if self._proc.stderr else b""
+                erro = saida.decode("utf-8", "replace")
+                raise RuntimeError(f"servidor encerrou ao iniciar: {erro}")
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", self.porta, timeout=1)
+                conn.request("GET", "/categorias")
+                if conn.getresponse().status == 200:
+                    conn.close()
+                    return
+            except OSError:
+                time.sleep(0.1)
+        raise RuntimeError("servidor nao iniciou")
+
+    def encerrar(self) -> None:
+        if self._proc.poll() is None:
+            self._proc.terminate()
+            try:
+                self._proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+
+
+def medir(
+    porta: int,
+    requisicao: Requisicao,
+    total: int,
+    concorrencia: int,
+    aquecimento: int,
+    semente: int,
+    com_cache: bool = False,
+) -> Dict[str, Any]:
+    locais = threading.local()
+    lock = threading.Lock()
+    latencias: List[float] = []
+    erros = 0
+
+    def executar(indice: int, medir_tempo: bool) -> None:
+        nonlocal erros
+        conn = getattr(locais, "conn", None)
+        if conn is None:
+            conn = locais.conn = http.client.HTTPConnection("127.0.0.1", porta, timeout=30)
+            locais.rng = random.Random(semente * 7919 + indice)
+        metodo, caminho, corpo = requisicao(locais.rng)
+        headers = {"Content-Type": "application/json"} if corpo is not None else {}
+        if metodo == "GET" and not com_cache:
+            headers["Cache-Control"] = "no-cache"
+        inicio = time.perf_counter()
+        try:
+            conn.request(metodo, caminho, body=corpo, headers=headers)
+            resposta = conn.getresponse()
+            resposta.read()
+            ok = resposta.status < 400
+        except (OSError, http.client.HTTPException):
+            locais.conn = None
+            ok = False
+        decorrido = time.perf_counter() - inicio
+        if not medir_tempo:
+            return
+        with lock:
+            if ok:
+                latencias.append(decorrido)
+            else:
+                erros += 1
+
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        list(executor.map(lambda indice: executar(indice, False), range(aquecimento)))
+        inicio = time.perf_counter()
+        list(executor.map(lambda indice: executar(indice, True), range(total)))
+        duracao = time.perf_counter() - inicio
+    return resumir(latencias, erros, duracao)
+
+
+def _cenarios(
+    usuario: Dict[str, Any],
+    meses: List[str],
+    mix: Dict[str, float],
+    densidade_parcelados: float,
+    parcelas_max: int,
+) -> Dict[str, Requisicao]:
+    def post_lancamento(rng: random.Random) -> Tuple[str, str, Optional[bytes]]:
+        payload = gerar_lancamento(
+            rng,
+            usuario,
+            rng.choice(meses),
+            mix,
+            densidade_parcelados,
+            parcelas_max,
+            com_id=False,
+        )
+        return "POST", "/lancamentos", json.dumps(payload).encode("utf-8")
+
+    def get_lancamentos(rng: random.Random) -> Tuple[str, str, Optional[bytes]]:
+        competencia = rng.choice(meses)
+        return (
+            "GET",
+            f"/lancamentos?usuario_id={usuario['id']}&competencia_inicio={competencia}&limite=100",
+            None,
+        )
+
+    def get_consolidacao(rng: random.Random) -> Tuple[str, str, Optional[bytes]]:
+        return "GET", f"/consolidacoes/mensal?competencia={rng.choice(meses)}", None
+
+    return {
+        "POST /lancamentos": post_lancamento,
+        "GET /lancamentos": get_lancamentos,
+        "GET /consolidacoes/mensal": get_consolidacao,
+    }
+
+
+def executar(args: argparse.Namespace) -> Dict[str, Any]:
+    mix = parse_mix(args.mix) if args.mix else MIX_PADRAO
+    meses = competencias(args.competencia_inicio, args.meses)
+    env_extra = dict(item.split("=", 1) for item in args.env)
+    resultado: Dict[str, Any] = {
+        **metadados("carga"),
+        "config": {
+            "tamanhos": args.tamanhos,
+            "usuarios": args.usuarios,
+            "meses": args.meses,
+            "competencia_inicio": args.competencia_inicio,
+            "mix": mix,
+            "densidade_parcelados": args.densidade_parcelados,
+            "parcelas_max": args.parcelas_max,
+            "requisicoes": args.requisicoes,
+            "concorrencia": args.concorrencia,
+            "aquecimento": args.aquecimento,
+            "semente": args.semente,
+            "com_cache": args.com_cache,
+            "env": env_extra,
+        },
+        "resultados": [],
+    }
+
+    with tempfile.TemporaryDirectory(prefix="financas-bench-") as tmp:
+        for tamanho in args.tamanhos:
+            rng = random.Random(args.semente)
+            usuarios = gerar_usuarios(rng, args.usuarios)
+            db_path = Path(tmp) / f"carga-{tamanho}.db"
+            inicio = time.perf_counter()
+            semear(
+                db_path,
+                rng,
+                usuarios,
+                tamanho,
+                meses,
+                mix,
+                args.densidade_parcelados,
+                args.parcelas_max,
+            )
+            semeadura_s = time.perf_counter() - inicio
+            print(f"[{tamanho}] base semeada em {semeadura_s:.1f}s", file=sys.stderr)
+
+            servidor = Servidor(db_path, env_extra)
+            try:
+                servidor.aguardar()
+                cenarios = _cenarios(
+                    usuarios[0],
+                    meses,
+                    mix,
+                    args.densidade_parcelados,
+                    args.parcelas_max,
+                )
+                for endpoint, requisicao in cenarios.items():
+                    metricas = medir(
+                        servidor.porta,
+                        requisicao,
+                        args.requisicoes,
+                        args.concorrencia,
+                        args.aquecimento,
+                        args.semente,
+                        args.com_cache,
+                    )
+                    resultado["resultados"].append(
+                        {"tamanho": tamanho, "endpoint": endpoint, **metricas}
+                    )
+                    print(
+                        f"[{tamanho}] {endpoint}: {metricas['throughput_rps']} req/s"
+                        f" p50={metricas['p50_ms']}ms p95={metricas['p95_ms']}ms"
+                        f" p99={metricas['p99_ms']}ms erros={metricas['erros']}",
+                        file=sys.stderr,
+                    )
+            finally:
+                servidor.encerrar()
+    return resultado
+
+
+def comparar(base: Dict[str, Any], novo: Dict[str, Any], tolerancia: float) -> List[str]:
+    indice_base = {(item["tamanho"], item["endpoint"]): item for item in base["resultados"]}
+    regressoes: List[str] = []
+    for item in novo["resultados"]:
+        referencia = indice_base.get((item["tamanho"], item["endpoint"]))
+        if referencia is None:
+            continue
+        rotulo = f"[{item['tamanho']}] {item['endpoint']}"
+        for campo in ("p50_ms", "p95_ms", "p99_ms"):
+            if referencia[campo] and item[campo] > referencia[campo] * (1 + tolerancia):
+                regressoes.append(f"{rotulo} {campo}: {referencia[campo]} -> {item[campo]}")
+        antes, depois = referencia["throughput_rps"], item["throughput_rps"]
+        if depois < antes * (1 - tolerancia):
+            regressoes.append(f"{rotulo} throughput_rps: {antes} -> {depois}")
+        if item["erros"] > referencia["erros"]:
+            regressoes.append(f"{rotulo} erros: {referencia['erros']} -> {item['erros']}")
+    return regressoes
+
+
+def _tamanhos(texto: str) -> List[int]:
+    return [int(parte) for parte in texto.split(",") if parte.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.carga")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    executar_parser = subparsers.add_parser("executar", help="roda a suite de carga")
+    executar_parser.add_argument("--tamanhos", type=_tamanhos, default=[1000, 10000, 100000])
+    executar_parser.add_argument("--usuarios", type=int, default=5)
+    executar_parser.add_argument("--meses", type=int, default=24)
+    executar_parser.add_argument("--competencia-inicio", default="2024-01")
+    executar_parser.add_argument("--mix", help="pesos por tipo, ex.: ENTRADA=1,FIXO=2,VARIAVEL=6")
+    executar_parser.add_argument("--densidade-parcelados", type=float, default=0.1)
+    executar_parser.add_argument("--parcelas-max", type=int, default=24)
+    executar_parser.add_argument("--requisicoes", type=int, default=2000)
+    executar_parser.add_argument("--concorrencia", type=int, default=8)
+    executar_parser.add_argument("--aquecimento", type=int, default=100)
+    executar_parser.add_argument("--semente", type=int, default=42)
+    executar_parser.add_argument(
+        "--com-cache",
+        action="store_true",
+        help="deixa os GETs usarem o cache de respostas (padrao: Cache-Control: no-cache)",
+    )
+    executar_parser.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        metavar="CHAVE=VALOR",
+        help="variavel de ambiente extra para o servidor (repetivel)",
+    )
+    executar_parser.add_argument("--saida", type=Path)
+
+    comparar_parser = subparsers.add_parser("comparar", help="compara dois resultados")
+    comparar_parser.add_argument("base", type=Path)
+    comparar_parser.add_argument("novo", type=Path)
+    comparar_parser.add_argument("--tolerancia", type=float, default=0.10)
+
+    args = parser.parse_args(argv)
+
+    if args.comando == "comparar":
+        regressoes = comparar(ler_resultado(args.base), ler_resultado(args.novo), args.tolerancia)
+        for regressao in regressoes:
+            print(regressao)
+        return 1 if regressoes else 0
+
+    print(gravar_resultado(executar(args), args.saida))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+RESULTADOS_DIR = BASE_DIR / "bench" / "resultados"
+
+
+def commit_atual() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadados(suite: str) -> Dict[str, Any]:
+    return {
+        "suite": suite,
+        "commit": commit_atual(),
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+    }
+
+
+def gravar_resultado(resultado: Dict[str, Any], saida: Optional[Path]) -> Path:
+    if saida is None:
+        carimbo = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        nome = f"{resultado['suite']}-{resultado['commit'] or 'local'}-{carimbo}.json"
+        saida = RESULTADOS_DIR / nome
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return saida
+
+
+def ler_resultado(caminho: Path) -> Dict[str, Any]:
+    return json.loads(caminho.read_text(encoding="utf-8"))
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import random
+import uuid
+from typing import Any, Dict, Iterator, List, Optional
+
+MOCK_USER_ID = "00000000-0000-0000-0000-000000000001"
+
+MIX_PADRAO: Dict[str, float] = {"ENTRADA": 1.0, "FIXO": 2.0, "VARIAVEL": 6.0}
+NOMES = {
+    "ENTRADA": ("Salario", "Freela", "Reembolso", "Rendimento"),
+    "FIXO": ("Aluguel", "Condominio", "Internet", "Academia", "Escola"),
+    "VARIAVEL": ("Mercado", "Farmacia", "Restaurante", "Combustivel", "Padaria"),
+    "PARCELADO": ("Notebook", "Geladeira", "Viagem", "Sofa", "Celular"),
+}
+
+
+def parse_mix(texto: str) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for parte in texto.split(","):
+        tipo, _, peso = parte.partition("=")
+        tipo = tipo.strip().upper()
+        if tipo not in MIX_PADRAO:
+            raise ValueError(f"tipo invalido no mix: {tipo}")
+        mix[tipo] = float(peso)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("mix deve ter ao menos um peso positivo")
+    return mix
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def competencias(inicio: str, meses: int) -> List[str]:
+    ano, mes = (int(parte) for parte in inicio.split("-"))
+    indice = ano * 12 + mes - 1
+    return [f"{(indice + i) // 12:04d}-{(indice + i) % 12 + 1:02d}" for i in range(meses)]
+
+
+def gerar_usuarios(rng: random.Random, quantidade: int) -> List[Dict[str, Any]]:
+    usuarios = []
+    for posicao in range(quantidade):
+        usuarios.append(
+            {
+                "id": MOCK_USER_ID if posicao == 0 else _uuid(rng),
+                "categorias": [_uuid(rng) for _ in range(8)],
+                "formas_pagamento": [_uuid(rng) for _ in range(3)],
+            }
+        )
+    return usuarios
+
+
+def _valor(rng: random.Random, minimo: float, maximo: float) -> float:
+    return round(rng.uniform(minimo, maximo), 2)
+
+
+def gerar_lancamento(
+    rng: random.Random,
+    usuario: Dict[str, Any],
+    competencia: str,
+    mix: Dict[str, float],
+    densidade_parcelados: float,
+    parcelas_max: int,
+    com_id: bool = True,
+) -> Dict[str, Any]:
+    if rng.random() < densidade_parcelados:
+        tipo = "PARCELADO"
+    else:
+        tipo = rng.choices(list(mix), weights=list(mix.values()))[0]
+
+    lancamento: Dict[str, Any] = {
+        "nome": rng.choice(NOMES[tipo]),
+        "data": f"{competencia}-{rng.randint(1, 28):02d}",
+        "competencia": competencia,
+        "tipo_lancamento": tipo,
+    }
+    if com_id:
+        lancamento["id"] = _uuid(rng)
+        lancamento["usuario_id"] = usuario["id"]
+
+    if tipo == "ENTRADA":
+        lancamento["valor"] = _valor(rng, 100, 10000)
+        return lancamento
+
+    lancamento["categoria_id"] = rng.choice(usuario["categorias"])
+    lancamento["forma_pagamento_id"] = rng.choice(usuario["formas_pagamento"])
+    if tipo == "PARCELADO":
+        lancamento["valor_total"] = _valor(rng, 100, 8000)
+        lancamento["numero_parcelas"] = rng.randint(2, parcelas_max)
+    else:
+        lancamento["valor"] = _valor(rng, 5, 3000)
+        lancamento["pago"] = rng.random() < 0.7
+    return lancamento
+
+
+def gerar_lancamentos(
+    rng: random.Random,
+    usuarios: List[Dict[str, Any]],
+    total: int,
+    meses: List[str],
+    mix: Optional[Dict[str, float]] = None,
+    densidade_parcelados: float = 0.1,
+    parcelas_max: int = 24,
+) -> Iterator[Dict[str, Any]]:
+    mix = mix or MIX_PADRAO
+    for posicao in range(total):
+        usuario = usuarios[posicao % len(usuarios)]
+        yield gerar_lancamento(
+            rng,
+            usuario,
+            rng.choice(meses),
+            mix,
+            densidade_parcelados,
+            parcelas_max,
+        )
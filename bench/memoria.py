@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import sqlite3
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from bench.comum import gravar_resultado, metadados
+from bench.micro import SEMENTE, banco_lancamentos
+
+Representacao = Callable[[sqlite3.Connection, str], List[Any]]
+
+
+def representacao_dicts(conn: sqlite3.Connection, sql: str) -> List[Any]:
+    from app.modelos import Lancamento
+
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute(sql).fetchall()
+    return [Lancamento._make(row).como_dict() for row in rows]
+
+
+def representacao_registros(conn: sqlite3.Connection, sql: str) -> List[Any]:
+    from app.modelos import Lancamento
+
+    conn.row_factory = None
+    return list(map(Lancamento._make, conn.execute(sql)))
+
+
+REPRESENTACOES: Dict[str, Representacao] = {
+    "dicts": representacao_dicts,
+    "lancamento": representacao_registros,
+}
+
+
+def medir_representacao(conn: sqlite3.Connection, representacao: Representacao) -> Dict[str, int]:
+    from app.db import LANCAMENTO_COLUNAS
+
+    sql = f"SELECT {LANCAMENTO_COLUNAS} FROM lancamentos"
+    gc.collect()
+    tracemalloc.start()
+    try:
+        itens = representacao(conn, sql)
+        gc.collect()
+        retido, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "itens": len(itens),
+        "retido_bytes": retido,
+        "pico_bytes": pico,
+        "bytes_por_item": round(retido / max(len(itens), 1)),
+    }
+
+
+def executar(quantidade: int) -> Dict[str, Any]:
+    conn = banco_lancamentos(quantidade)
+    resultado: Dict[str, Any] = {
+        **metadados("memoria"),
+        "config": {"lancamentos": quantidade, "semente": SEMENTE},
+        "resultados": {},
+    }
+    try:
+        for nome, representacao in REPRESENTACOES.items():
+            metricas = medir_representacao(conn, representacao)
+            resultado["resultados"][nome] = metricas
+            print(
+                f"{nome}: {metricas['retido_bytes'] / 2**20:.1f} MiB retidos"
+                f" ({metricas['bytes_por_item']} B/item),"
+                f" pico {metricas['pico_bytes'] / 2**20:.1f} MiB",
+                file=sys.stderr,
+            )
+    finally:
+        conn.close()
+    return resultado
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.memoria")
+    parser.add_argument("--lancamentos", type=int, default=100_000)
+    parser.add_argument("--saida", type=Path)
+    args = parser.parse_args(argv)
+
+    print(gravar_resultado(executar(args.lancamentos), args.saida))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
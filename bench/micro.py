@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bench.comum import BASE_DIR, gravar_resultado, ler_resultado, metadados
+from bench.gerador import competencias, gerar_lancamentos, gerar_usuarios
+
+BASELINE_PADRAO = BASE_DIR / "bench" / "baselines" / "micro.json"
+SEMENTE = 20240101
+
+Caso = Callable[[], Tuple[Callable[[], Any], int]]
+
+
+def _payloads(quantidade: int) -> List[Dict[str, Any]]:
+    rng = random.Random(SEMENTE)
+    usuarios = gerar_usuarios(rng, 1)
+    meses = competencias("2025-01", 12)
+    payloads = []
+    for lancamento in gerar_lancamentos(rng, usuarios, quantidade, meses):
+        lancamento.pop("id")
+        lancamento.pop("usuario_id")
+        payloads.append(lancamento)
+    return payloads
+
+
+def _parcelados(quantidade: int) -> List[Dict[str, Any]]:
+    rng = random.Random(SEMENTE)
+    meses = competencias("2024-01", 24)
+    return [
+        {
+            "competencia": rng.choice(meses),
+            "valor_total_centavos": rng.randint(10_000, 800_000),
+            "numero_parcelas": rng.randint(2, 24),
+            "quantidade": rng.randint(1, 3),
+        }
+        for _ in range(quantidade)
+    ]
+
+
+def caso_validate_payload() -> Tuple[Callable[[], Any], int]:
+    from app.main import _validate_payload
+
+    payloads = _payloads(500)
+
+    def executar() -> None:
+        for payload in payloads:
+            _validate_payload(payload)
+
+    return executar, len(payloads)
+
+
+def caso_validar_datas() -> Tuple[Callable[[], Any], int]:
+    from app.main import COMPETENCIA_FORMATO, COMPETENCIA_RE, DATA_FORMATO, DATA_RE
+    from app.validacao import data
+
+    validar_data = data(DATA_FORMATO, DATA_RE)
+    validar_competencia = data(COMPETENCIA_FORMATO, COMPETENCIA_RE)
+    payloads = _payloads(500)
+
+    def executar() -> None:
+        for payload in payloads:
+            validar_data(payload["data"])
+            validar_competencia(payload["competencia"])
+
+    return executar, len(payloads) * 2
+
+
+def caso_parcelas_por_competencia() -> Tuple[Callable[[], Any], int]:
+    from app.calculos import parcelas_por_competencia
+
+    parcelados = _parcelados(500)
+
+    def executar() -> None:
+        parcelas_por_competencia(parcelados, "2024-07", "2025-06")
+
+    return executar, len(parcelados)
+
+
+def caso_agenda_parcelas_centavos() -> Tuple[Callable[[], Any], int]:
+    from app.parcelas import agenda_parcelas_centavos
+
+    parcelados = _parcelados(500)
+    totais = [item["valor_total_centavos"] for item in parcelados]
+    numeros = [item["numero_parcelas"] for item in parcelados]
+
+    def executar() -> None:
+        agenda_parcelas_centavos(totais, numeros)
+
+    return executar, len(parcelados)
+
+
+def banco_lancamentos(quantidade: int) -> sqlite3.Connection:
+    from app import db
+
+    rng = random.Random(SEMENTE)
+    usuarios = gerar_usuarios(rng, 1)
+    lancamentos = gerar_lancamentos(rng, usuarios, quantidade, competencias("2025-01", 12))
+    parametros = [db._lancamento_params(lancamento) for lancamento in lancamentos]
+
+    conn = sqlite3.connect(":memory:")
+    colunas = ", ".join(parametros[0])
+    conn.execute(f"CREATE TABLE lancamentos ({colunas})")
+    conn.executemany(db.LANCAMENTO_INSERT, parametros)
+    return conn
+
+
+def _linhas_lancamentos() -> List[Any]:
+    from app import db
+
+    conn = banco_lancamentos(1000)
+    rows = conn.execute(f"SELECT {db.LANCAMENTO_COLUNAS} FROM lancamentos").fetchall()
+    conn.close()
+    return rows
+
+
+def caso_lancamento_make() -> Tuple[Callable[[], Any], int]:
+    from app.modelos import Lancamento
+
+    rows = _linhas_lancamentos()
+
+    def executar() -> None:
+        list(map(Lancamento._make, rows))
+
+    return executar, len(rows)
+
+
+def caso_lancamento_como_dict() -> Tuple[Callable[[], Any], int]:
+    from app.modelos import Lancamento
+
+    lancamentos = list(map(Lancamento._make, _linhas_lancamentos()))
+
+    def executar() -> None:
+        [lancamento.como_dict() for lancamento in lancamentos]
+
+    return executar, len(lancamentos)
+
+
+def caso_listagem_dicts() -> Tuple[Callable[[], Any], int]:
+    from app.main import _serializar_resposta
+    from app.modelos import Lancamento
+
+    lancamentos = list(map(Lancamento._make, _linhas_lancamentos()))
+
+    def executar() -> None:
+        _serializar_resposta([lancamento.como_dict() for lancamento in lancamentos])
+
+    return executar, len(lancamentos)
+
+
+def caso_listagem_json_rapido() -> Tuple[Callable[[], Any], int]:
+    from app.codificacao import lancamentos_json
+    from app.modelos import Lancamento
+
+    lancamentos = list(map(Lancamento._make, _linhas_lancamentos()))
+
+    def executar() -> None:
+        lancamentos_json(lancamentos)
+
+    return executar, len(lancamentos)
+
+
+CASOS: Dict[str, Caso] = {
+    "main._validate_payload": caso_validate_payload,
+    "validacao.data": caso_validar_datas,
+    "calculos.parcelas_por_competencia": caso_parcelas_por_competencia,
+    "parcelas.agenda_parcelas_centavos": caso_agenda_parcelas_centavos,
+    "modelos.Lancamento._make": caso_lancamento_make,
+    "modelos.Lancamento.como_dict": caso_lancamento_como_dict,
+    "listagem.dicts_json_dumps": caso_listagem_dicts,
+    "listagem.json_rapido": caso_listagem_json_rapido,
+}
+
+
+def medir_caso(
+    funcao: Callable[[], Any],
+    itens: int,
+    repeticoes: int,
+    tempo_minimo_s: float,
+) -> Dict[str, Any]:
+    timer = timeit.Timer(funcao)
+    numero = 1
+    while True:
+        duracao = timer.timeit(numero)
+        if duracao >= tempo_minimo_s:
+            break
+        numero *= 2
+    tempos = timer.repeat(repeat=repeticoes, number=numero)
+    por_item_ns = [tempo / numero / itens * 1e9 for tempo in tempos]
+    return {
+        "itens_por_chamada": itens,
+        "chamadas_por_rodada": numero,
+        "rodadas": repeticoes,
+        "min_ns": round(min(por_item_ns), 1),
+        "mediana_ns": round(statistics.median(por_item_ns), 1),
+        "media_ns": round(statistics.fmean(por_item_ns), 1),
+        "desvio_ns": round(statistics.pstdev(por_item_ns), 1),
+    }
+
+
+def executar(filtro: Optional[str], repeticoes: int, tempo_minimo_s: float) -> Dict[str, Any]:
+    resultado: Dict[str, Any] = {
+        **metadados("micro"),
+        "config": {"repeticoes": repeticoes, "tempo_minimo_s": tempo_minimo_s, "semente": SEMENTE},
+        "resultados": {},
+    }
+    for nome, caso in CASOS.items():
+        if filtro and filtro not in nome:
+            continue
+        funcao, itens = caso()
+        metricas = medir_caso(funcao, itens, repeticoes, tempo_minimo_s)
+        resultado["resultados"][nome] = metricas
+        print(
+            f"{nome}: mediana {metricas['mediana_ns']} ns/item (min {metricas['min_ns']})",
+            file=sys.stderr,
+        )
+    return resultado
+
+
+def comparar(base: Dict[str, Any], novo: Dict[str, Any], tolerancia: float) -> List[str]:
+    regressoes: List[str] = []
+    for nome, metricas in novo["resultados"].items():
+        referencia = base["resultados"].get(nome)
+        if referencia is None or not referencia["mediana_ns"]:
+            continue
+        razao = metricas["mediana_ns"] / referencia["mediana_ns"]
+        if razao > 1 + tolerancia:
+            regressoes.append(
+                f"{nome}: {referencia['mediana_ns']} -> {metricas['mediana_ns']} ns/item"
+                f" ({razao:.2f}x)"
+            )
+    return regressoes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.micro")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    executar_parser = subparsers.add_parser("executar", help="roda os micro-benchmarks")
+    executar_parser.add_argument("--filtro", help="roda apenas casos cujo nome contem o texto")
+    executar_parser.add_argument("--repeticoes", type=int, default=7)
+    executar_parser.add_argument("--tempo-minimo", type=float, default=0.2)
+    executar_parser.add_argument("--saida", type=Path)
+    executar_parser.add_argument(
+        "--baseline",
+        type=Path,
+        nargs="?",
+        const=BASELINE_PADRAO,
+        help="compara com a baseline (padrao bench/baselines/micro.json)",
+    )
+    executar_parser.add_argument("--tolerancia", type=float, default=0.20)
+
+    comparar_parser = subparsers.add_parser("comparar", help="compara dois resultados")
+    comparar_parser.add_argument("base", type=Path)
+    comparar_parser.add_argument("novo", type=Path)
+    comparar_parser.add_argument("--tolerancia", type=float, default=0.20)
+
+    args = parser.parse_args(argv)
+
+    if args.comando == "comparar":
+        regressoes = comparar(ler_resultado(args.base), ler_resultado(args.novo), args.tolerancia)
+    else:
+        resultado = executar(args.filtro, args.repeticoes, args.tempo_minimo)
+        print(gravar_resultado(resultado, args.saida))
+        regressoes = []
+        if args.baseline is not None:
+            regressoes = comparar(ler_resultado(args.baseline), resultado, args.tolerancia)
+
+    for regressao in regressoes:
+        print(regressao)
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,106 @@
+import random
+from collections import Counter
+
+from bench import memoria, micro
+from bench.carga import comparar, percentil
+from bench.gerador import competencias, gerar_lancamentos, gerar_usuarios, parse_mix
+
+
+def _gerar(semente, total=2000, **kwargs):
+    rng = random.Random(semente)
+    usuarios = gerar_usuarios(rng, 3)
+    meses = competencias("2025-11", 4)
+    return usuarios, list(gerar_lancamentos(rng, usuarios, total, meses, **kwargs))
+
+
+def test_gerador_reprodutivel_por_semente():
+    assert _gerar(7) == _gerar(7)
+    assert _gerar(7) != _gerar(8)
+
+
+def test_gerador_respeita_mix_e_densidade():
+    usuarios, lancamentos = _gerar(
+        1,
+        mix=parse_mix("ENTRADA=1,VARIAVEL=1"),
+        densidade_parcelados=0.25,
+        parcelas_max=6,
+    )
+    tipos = Counter(item["tipo_lancamento"] for item in lancamentos)
+
+    assert set(tipos) == {"ENTRADA", "VARIAVEL", "PARCELADO"}
+    assert 0.2 < tipos["PARCELADO"] / len(lancamentos) < 0.3
+    assert {item["competencia"] for item in lancamentos} == {
+        "2025-11",
+        "2025-12",
+        "2026-01",
+        "2026-02",
+    }
+    assert all(
+        2 <= item["numero_parcelas"] <= 6
+        for item in lancamentos
+        if item["tipo_lancamento"] == "PARCELADO"
+    )
+    categorias = {usuario["id"]: set(usuario["categorias"]) for usuario in usuarios}
+    assert all(
+        item["categoria_id"] in categorias[item["usuario_id"]]
+        for item in lancamentos
+        if item["tipo_lancamento"] != "ENTRADA"
+    )
+
+
+def test_percentil_nearest_rank():
+    amostras = list(range(1, 101))
+    assert percentil(amostras, 50) == 50
+    assert percentil(amostras, 95) == 95
+    assert percentil(amostras, 99) == 99
+    assert percentil([], 50) == 0.0
+
+
+def test_comparar_aponta_regressoes():
+    base = {
+        "resultados": [
+            {
+                "tamanho": 1000,
+                "endpoint": "GET /lancamentos",
+                "p50_ms": 2.0,
+                "p95_ms": 5.0,
+                "p99_ms": 8.0,
+                "throughput_rps": 1000.0,
+                "erros": 0,
+            }
+        ]
+    }
+    novo = {"resultados": [dict(base["resultados"][0], p95_ms=6.0, throughput_rps=950.0)]}
+
+    assert comparar(base, novo, 0.10) == ["[1000] GET /lancamentos p95_ms: 5.0 -> 6.0"]
+
+
+def test_micro_casos_executam():
+    for nome, caso in micro.CASOS.items():
+        funcao, itens = caso()
+        funcao()
+        assert itens > 0, nome
+
+
+def test_micro_comparar_usa_mediana():
+    base = {"resultados": {"calculos.parcelas_por_competencia": {"mediana_ns": 100.0}}}
+    dentro = {"resultados": {"calculos.parcelas_por_competencia": {"mediana_ns": 119.0}}}
+    fora = {"resultados": {"calculos.parcelas_por_competencia": {"mediana_ns": 150.0}}}
+
+    assert micro.comparar(base, dentro, 0.20) == []
+    assert micro.comparar(base, fora, 0.20) == [
+        "calculos.parcelas_por_competencia: 100.0 -> 150.0 ns/item (1.50x)"
+    ]
+
+
+def test_memoria_registros_ocupam_menos_que_dicts():
+    conn = micro.banco_lancamentos(2000)
+    try:
+        dicts = memoria.medir_representacao(conn, memoria.representacao_dicts)
+        registros = memoria.medir_representacao(conn, memoria.representacao_registros)
+    finally:
+        conn.close()
+
+    assert dicts["itens"] == registros["itens"] == 2000
+    assert registros["retido_bytes"] < dicts["retido_bytes"]
+    assert registros["pico_bytes"] < dicts["pico_bytes"]
@@ -0,0 +1,145 @@
+import importlib
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.cache import ReferenciaCache
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    db_path = tmp_path / "financas.db"
+    monkeypatch.setenv("FINANCAS_DB_PATH", str(db_path))
+
+    import app.db as db
+    import app.main as main
+
+    importlib.reload(db)
+    importlib.reload(main)
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+def _cache(dados, **kwargs):
+    cargas = []
+
+    def carregar(tabela, usuario_id):
+        cargas.append((tabela, usuario_id))
+        return dict(dados.get((tabela, usuario_id), {}))
+
+    return ReferenciaCache(carregar, **kwargs), cargas
+
+
+def test_cache_conta_hits_e_misses():
+    cache, cargas = _cache({("categorias", "u1"): {"c1": "Mercado"}})
+
+    assert "c1" in cache.obter("categorias", "u1")
+    assert "c1" in cache.obter("categorias", "u1")
+
+    assert cargas == [("categorias", "u1")]
+    assert cache.estatisticas()["hits"] == 1
+    assert cache.estatisticas()["misses"] == 1
+
+
+def test_cache_expira_por_ttl():
+    relogio = Relogio()
+    cache, cargas = _cache({}, ttl_segundos=10, relogio=relogio)
+
+    cache.obter("categorias", "u1")
+    relogio.agora = 9.9
+    cache.obter("categorias", "u1")
+    relogio.agora = 10.0
+    cache.obter("categorias", "u1")
+
+    assert len(cargas) == 2
+
+
+def test_cache_descarta_menos_usado_quando_cheio():
+    cache, cargas = _cache({}, tamanho_maximo=2)
+
+    cache.obter("categorias", "u1")
+    cache.obter("categorias", "u2")
+    cache.obter("categorias", "u1")
+    cache.obter("categorias", "u3")
+    cache.obter("categorias", "u1")
+    cache.obter("categorias", "u2")
+
+    assert cargas.count(("categorias", "u1")) == 1
+    assert cargas.count(("categorias", "u2")) == 2
+    assert cache.estatisticas()["evictions"] == 2
+
+
+def test_cache_write_through():
+    cache, _ = _cache({("categorias", "u1"): {"c1": "Mercado"}})
+    cache.obter("categorias", "u1")
+
+    cache.definir("categorias", "u1", "c2", "Lazer")
+    cache.definir("categorias", "u1", "c1", "Feira")
+    cache.remover("categorias", "c2")
+
+    assert cache.obter("categorias", "u1") == {"c1": "Feira"}
+
+
+def test_escrita_nao_altera_mapa_ja_entregue():
+    cache, _ = _cache({("categorias", "u1"): {"c1": "Mercado"}})
+    lido = cache.obter("categorias", "u1")
+
+    for chave in lido:
+        cache.definir("categorias", "u1", "c2", "Lazer")
+        cache.remover("categorias", chave)
+
+    assert lido == {"c1": "Mercado"}
+    assert cache.obter("categorias", "u1") == {"c2": "Lazer"}
+
+
+def test_cache_nao_guarda_carga_concorrente_com_escrita():
+    cache = None
+
+    def carregar(tabela, usuario_id):
+        cache.definir(tabela, usuario_id, "c1", "Mercado")
+        return {}
+
+    cache = ReferenciaCache(carregar)
+    cache.obter("categorias", "u1")
+
+    assert cache.estatisticas()["entradas"] == 0
+
+
+def test_lancamento_reflete_escritas_de_referencias(client):
+    categoria = client.post("/categorias", json={"nome": "Mercado"}).json()
+    forma = client.post("/formas-pagamento", json={"nome": "Cartao"}).json()
+    payload = {
+        "nome": "Feira",
+        "data": "2026-01-10",
+        "competencia": "2026-01",
+        "tipo_lancamento": "VARIAVEL",
+        "categoria_id": categoria["id"],
+        "forma_pagamento_id": forma["id"],
+        "valor": 80.0,
+        "pago": False,
+    }
+
+    assert client.post("/lancamentos", json=payload).status_code == 201
+    assert client.post("/lancamentos", json=payload).status_code == 201
+
+    estatisticas = client.get("/monitoramento/cache").json()["referencias"]
+    assert estatisticas["misses"] == 2
+    assert estatisticas["hits"] == 2
+
+    assert client.delete(f"/categorias/{categoria['id']}").status_code == 204
+    response = client.post("/lancamentos", json=payload)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "categoria nao encontrada"
+
+    nova = client.post("/categorias", json={"nome": "Lazer"}).json()
+    payload["categoria_id"] = nova["id"]
+    assert client.post("/lancamentos", json=payload).status_code == 201
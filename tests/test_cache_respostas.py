@@ -0,0 +1,143 @@
+import importlib
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.cache import RespostaCache, RespostaCacheada
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    db_path = tmp_path / "financas.db"
+    monkeypatch.setenv("FINANCAS_DB_PATH", str(db_path))
+
+    import app.db as db
+    import app.main as main
+
+    importlib.reload(db)
+    importlib.reload(main)
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def _entrada(valor):
+    return {
+        "nome": "Salario",
+        "data": "2026-01-05",
+        "competencia": "2026-01",
+        "tipo_lancamento": "ENTRADA",
+        "valor": valor,
+    }
+
+
+def _estatisticas(client):
+    return client.get("/monitoramento/cache").json()["respostas"]
+
+
+def test_etag_responde_304_ate_haver_escrita(client):
+    params = {"competencia": "2026-01"}
+    primeira = client.get("/consolidacoes/mensal", params=params)
+    etag = primeira.headers["ETag"]
+    assert primeira.status_code == 200
+    assert primeira.headers["Cache-Control"] == "private, no-cache"
+
+    repetida = client.get("/consolidacoes/mensal", params=params, headers={"If-None-Match": etag})
+    assert repetida.status_code == 304
+    assert repetida.content == b""
+    assert repetida.headers["ETag"] == etag
+
+    assert client.post("/lancamentos", json=_entrada(100.0)).status_code == 201
+
+    alterada = client.get("/consolidacoes/mensal", params=params, headers={"If-None-Match": etag})
+    assert alterada.status_code == 200
+    assert alterada.headers["ETag"] != etag
+    assert alterada.json()["total_entradas"] == 100.0
+
+
+def test_leituras_repetidas_servidas_do_cache(client):
+    assert client.post("/lancamentos", json=_entrada(100.0)).status_code == 201
+
+    primeira = client.get("/consolidacoes/anual", params={"ano": "2026"})
+    segunda = client.get("/consolidacoes/anual", params={"ano": "2026"})
+    outra_query = client.get("/consolidacoes/anual", params={"ano": "2025"})
+
+    assert primeira.json() == segunda.json()
+    assert primeira.json() != outra_query.json()
+    estatisticas = _estatisticas(client)
+    assert estatisticas["hits"] == 1
+    assert estatisticas["misses"] == 2
+
+
+def test_cache_control_no_cache_ignora_cache(client):
+    params = {"competencia": "2026-01"}
+    primeira = client.get("/consolidacoes/mensal", params=params)
+    forcada = client.get(
+        "/consolidacoes/mensal",
+        params=params,
+        headers={"Cache-Control": "no-cache", "If-None-Match": primeira.headers["ETag"]},
+    )
+
+    assert forcada.status_code == 304
+    estatisticas = _estatisticas(client)
+    assert estatisticas["hits"] == 0
+    assert estatisticas["misses"] == 1
+
+
+def test_listas_invalidadas_por_escritas_de_referencias(client):
+    assert client.get("/categorias").json() == []
+    assert client.get("/formas-pagamento").json() == []
+
+    categoria = client.post("/categorias", json={"nome": "Mercado"}).json()
+    forma = client.post("/formas-pagamento", json={"nome": "Cartao"}).json()
+    assert client.get("/categorias").json() == [categoria]
+    assert client.get("/formas-pagamento").json() == [forma]
+
+    client.put(f"/formas-pagamento/{forma['id']}", json={"nome": "Pix"})
+    assert client.get("/formas-pagamento").json()[0]["nome"] == "Pix"
+
+    client.delete(f"/categorias/{categoria['id']}")
+    assert client.get("/categorias").json() == []
+
+
+def test_listagem_preserva_cursor_em_cache(client):
+    for valor in (1.0, 2.0, 3.0):
+        assert client.post("/lancamentos", json=_entrada(valor)).status_code == 201
+
+    primeira = client.get("/lancamentos", params={"limite": 2})
+    segunda = client.get("/lancamentos", params={"limite": 2})
+
+    assert segunda.headers["X-Proximo-Cursor"] == primeira.headers["X-Proximo-Cursor"]
+    assert segunda.json() == primeira.json()
+    assert _estatisticas(client)["hits"] == 1
+
+    assert client.post("/lancamentos/lote", json=[_entrada(4.0)]).status_code == 201
+    total = client.get("/lancamentos", params={"limite": 10}).json()
+    assert len(total) == 4
+
+
+def _resposta(tamanho):
+    return RespostaCacheada("v1", '"etag"', b"x" * tamanho, ())
+
+
+def test_cache_de_respostas_limitado_por_bytes():
+    cache = RespostaCache(tamanho_maximo=10, bytes_maximo=100, corpo_maximo=60)
+
+    cache.guardar("a", _resposta(40))
+    cache.guardar("b", _resposta(40))
+    cache.obter("a", "v1")
+    cache.guardar("c", _resposta(40))
+
+    assert cache.obter("b", "v1") is None
+    assert cache.obter("a", "v1") is not None
+    assert cache.obter("c", "v1") is not None
+    cache.guardar("c", _resposta(10))
+    estatisticas = cache.estatisticas()
+    assert estatisticas["bytes"] == 50
+    assert estatisticas["evictions"] == 1
+
+    cache.guardar("a", _resposta(61))
+    assert cache.obter("a", "v1") is None
+    assert cache.estatisticas()["bytes"] == 10
+    assert cache.estatisticas()["recusadas"] == 1
+
@@ -0,0 +1,61 @@
+import importlib
+
+from fastapi.testclient import TestClient
+import pytest
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    db_path = tmp_path / "financas.db"
+    monkeypatch.setenv("FINANCAS_DB_PATH", str(db_path))
+
+    import app.db as db
+    import app.main as main
+
+    importlib.reload(db)
+    importlib.reload(main)
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def test_consolidacao_anual_igual_as_mensais(client):
+    categoria = client.post("/categorias", json={"nome": "Mercado"}).json()
+    forma = client.post("/formas-pagamento", json={"nome": "Cartao"}).json()
+    payloads = [
+        {"tipo_lancamento": "ENTRADA", "competencia": "2025-03", "valor": 4200.0},
+        {"tipo_lancamento": "FIXO", "competencia": "2025-06", "valor": 900.0, "pago": True},
+        {"tipo_lancamento": "PARCELADO", "competencia": "2024-11", "valor_total": 1000.0, "numero_parcelas": 7},
+        {"tipo_lancamento": "PARCELADO", "competencia": "2025-10", "valor_total": 250.0, "numero_parcelas": 6},
+    ]
+    for payload in payloads:
+        payload.update({"nome": "Teste", "data": f"{payload['competencia']}-01"})
+        if payload["tipo_lancamento"] != "ENTRADA":
+            payload.update({"categoria_id": categoria["id"], "forma_pagamento_id": forma["id"]})
+        assert client.post("/lancamentos", json=payload).status_code == 201
+
+    response = client.get("/consolidacoes/anual", params={"ano": "2025"})
+    assert response.status_code == 200
+    corpo = response.json()
+    assert corpo["ano"] == 2025
+    assert [mes["competencia"] for mes in corpo["resumos"]] == [f"2025-{mes:02d}" for mes in range(1, 13)]
+    for mes in corpo["resumos"]:
+        mensal = client.get("/consolidacoes/mensal", params={"competencia": mes["competencia"]})
+        assert mes == mensal.json()
+    assert corpo["total_entradas"] == 4200.0
+    assert corpo["total_gastos"] == 1739.29
+
+
+def test_consolidacao_anual_parametros(client):
+    response = client.get(
+        "/consolidacoes/anual",
+        params={"competencia_inicio": "2025-06", "competencia_fim": "2025-08"},
+    )
+    assert response.status_code == 200
+    assert len(response.json()["resumos"]) == 3
+
+    response = client.get("/consolidacoes/anual", params={"ano": "2025", "competencia_inicio": "2025-01"})
+    assert response.status_code == 422
+
+    response = client.get("/consolidacoes/anual", params={"competencia_inicio": "2025-06"})
+    assert response.json()["detail"][0]["loc"] == ["query", "competencia_fim"]
@@ -0,0 +1,94 @@
+import importlib
+
+from fastapi.testclient import TestClient
+import pytest
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    db_path = tmp_path / "financas.db"
+    monkeypatch.setenv("FINANCAS_DB_PATH", str(db_path))
+
+    import app.db as db
+    import app.main as main
+
+    importlib.reload(db)
+    importlib.reload(main)
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture()
+def referencias(client):
+    categoria = client.post("/categorias", json={"nome": "Mercado"}).json()
+    forma = client.post("/formas-pagamento", json={"nome": "Cartao"}).json()
+    return {"categoria_id": categoria["id"], "forma_pagamento_id": forma["id"]}
+
+
+def _post(client, payload):
+    response = client.post("/lancamentos", json=payload)
+    assert response.status_code == 201
+
+
+def _gasto(referencias, tipo, competencia, **campos):
+    payload = {
+        "nome": tipo.lower(),
+        "data": f"{competencia}-10",
+        "competencia": competencia,
+        "tipo_lancamento": tipo,
+        **referencias,
+    }
+    payload.update(campos)
+    return payload
+
+
+def _consolidar(client, competencia):
+    response = client.get("/consolidacoes/mensal", params={"competencia": competencia})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_consolidacao_com_parcelados(client, referencias):
+    _post(
+        client,
+        {
+            "nome": "Salario",
+            "data": "2024-01-05",
+            "competencia": "2024-01",
+            "tipo_lancamento": "ENTRADA",
+            "valor": 1000.0,
+        },
+    )
+    _post(client, _gasto(referencias, "FIXO", "2024-01", valor=200.0, pago=True))
+    _post(client, _gasto(referencias, "VARIAVEL", "2024-01", valor=50.0, pago=False))
+    for _ in range(2):
+        _post(client, _gasto(referencias, "PARCELADO", "2023-12", valor_total=100.0, numero_parcelas=3))
+    _post(client, _gasto(referencias, "PARCELADO", "2023-01", valor_total=500.0, numero_parcelas=5))
+
+    assert _consolidar(client, "2024-01") == {
+        "competencia": "2024-01",
+        "total_entradas": 1000.0,
+        "total_gastos": 316.66,
+        "total_investimentos": 0.0,
+        "saldo": 683.34,
+    }
+    assert _consolidar(client, "2024-02")["total_gastos"] == 66.68
+    assert _consolidar(client, "2024-03")["total_gastos"] == 0.0
+    assert _consolidar(client, "2023-11")["total_gastos"] == 0.0
+
+
+@pytest.mark.parametrize(
+    ("params", "msg", "tipo"),
+    [
+        ({}, "campo obrigatorio", "value_error.missing"),
+        ({"competencia": ""}, "formato invalido (YYYY-MM)", "value_error"),
+        ({"competencia": "2026-13"}, "formato invalido (YYYY-MM)", "value_error"),
+        ({"competencia": "2026-1"}, "formato invalido (YYYY-MM)", "value_error"),
+    ],
+)
+def test_competencia_invalida_usa_erro_do_validador(client, params, msg, tipo):
+    response = client.get("/consolidacoes/mensal", params=params)
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == [{"loc": ["query", "competencia"], "msg": msg, "type": tipo}]
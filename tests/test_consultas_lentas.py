@@ -0,0 +1,129 @@
+import importlib
+import sqlite3
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.rastreio import tabelas_com_scan_completo
+
+MOCK_USER_ID = "00000000-0000-0000-0000-000000000001"
+
+
+def _carregar(tmp_path, monkeypatch, limiar):
+    monkeypatch.setenv("FINANCAS_DB_PATH", str(tmp_path / "financas.db"))
+    monkeypatch.setenv("FINANCAS_DB_CONSULTAS_LENTAS_MS", limiar)
+
+    import app.db as db
+    import app.main as main
+
+    importlib.reload(db)
+    importlib.reload(main)
+    return db, main
+
+
+@pytest.fixture()
+def ambiente(tmp_path, monkeypatch):
+    db, main = _carregar(tmp_path, monkeypatch, "0")
+    with TestClient(main.app) as test_client:
+        db._consultas_lentas.limpar()
+        yield db, test_client
+
+
+def _entrada(dia):
+    return {
+        "nome": "Salario",
+        "data": f"2026-01-{dia:02d}",
+        "competencia": "2026-01",
+        "tipo_lancamento": "ENTRADA",
+        "valor": 100,
+    }
+
+
+def test_registra_plano_e_sinaliza_scan_completo(ambiente):
+    db, client = ambiente
+    for dia in (1, 2, 3):
+        assert client.post("/lancamentos", json=_entrada(dia)).status_code == 201
+
+    db.rebuild_resumo_mensal()
+    resposta = client.get("/monitoramento/consultas-lentas")
+
+    assert resposta.status_code == 200
+    dados = resposta.json()
+    assert dados["limiar_ms"] == 0
+    assert dados["scans_completos"] >= 1
+    scan = next(
+        entrada
+        for entrada in dados["recentes"]
+        if entrada["scan_completo"] == ["lancamentos"] and entrada["sql"].startswith("SELECT")
+    )
+    assert scan["linhas"] == 3
+    assert scan["plano"]
+    assert scan["parametros"] == []
+
+    insert = next(
+        entrada for entrada in dados["recentes"] if "INSERT INTO lancamentos" in entrada["sql"]
+    )
+    assert insert["linhas"] == 1
+    assert insert["parametros"]["usuario_id"] == "str"
+    assert insert["scan_completo"] == []
+
+
+def test_conta_linhas_de_leitura_em_lotes(ambiente):
+    db, client = ambiente
+    for dia in range(1, 6):
+        client.post("/lancamentos", json=_entrada(dia))
+    db._consultas_lentas.limpar()
+
+    lotes = list(db.iter_lancamentos(usuario_id=MOCK_USER_ID, tamanho_lote=2))
+
+    assert [len(lote) for lote in lotes] == [2, 2, 1]
+    recentes = db.consultas_lentas()["recentes"]
+    leituras = [entrada for entrada in recentes if "FROM lancamentos" in entrada["sql"]]
+    assert sorted(entrada["linhas"] for entrada in leituras) == [1, 2, 2]
+
+
+def test_executemany_com_gerador_conta_pelo_rowcount(ambiente):
+    db, _ = ambiente
+    with db.get_connection() as conn:
+        conn.execute("CREATE TEMP TABLE numeros (valor INTEGER)")
+        db._consultas_lentas.limpar()
+        conn.executemany("INSERT INTO numeros VALUES (?)", ((valor,) for valor in range(7)))
+
+    entrada = next(
+        item for item in db.consultas_lentas()["recentes"] if "INSERT INTO numeros" in item["sql"]
+    )
+    assert entrada["linhas"] == 7
+    assert entrada["execucoes"] is None
+    assert entrada["parametros"] == ["int"]
+
+
+@pytest.mark.parametrize("limiar", [None, "-1"])
+def test_rastreio_desligado_por_padrao(tmp_path, monkeypatch, limiar):
+    monkeypatch.delenv("FINANCAS_DB_CONSULTAS_LENTAS_MS", raising=False)
+    if limiar is None:
+        monkeypatch.setenv("FINANCAS_DB_PATH", str(tmp_path / "financas.db"))
+        import app.db as db
+
+        importlib.reload(db)
+    else:
+        db, _ = _carregar(tmp_path, monkeypatch, limiar)
+    try:
+        with db.get_connection() as conn:
+            assert type(conn) is sqlite3.Connection
+    finally:
+        db.close_pool()
+
+
+@pytest.mark.parametrize(
+    "plano,esperado",
+    [
+        (["SCAN lancamentos"], ["lancamentos"]),
+        (["SCAN TABLE lancamentos"], ["lancamentos"]),
+        (["SCAN lancamentos AS l"], ["lancamentos"]),
+        (["SEARCH lancamentos USING INDEX idx_lancamentos_usuario (usuario_id=?)"], []),
+        (["SCAN lancamentos USING INDEX idx_lancamentos_competencia"], []),
+        (["SCAN resumo_mensal"], []),
+    ],
+)
+def test_detecta_scan_completo(plano, esperado):
+    assert tabelas_com_scan_completo(plano, ("lancamentos",)) == esperado
@@ -0,0 +1,196 @@
+import asyncio
+import importlib
+import threading
+import uuid
+
+import pytest
+
+
+@pytest.fixture()
+def ambiente(tmp_path, monkeypatch):
+    monkeypatch.setenv("FINANCAS_DB_PATH", str(tmp_path / "financas.db"))
+    monkeypatch.setenv("FINANCAS_DB_POOL_SIZE", "3")
+
+    import app.db as db
+    import app.db_async as db_async
+
+    importlib.reload(db)
+    monkeypatch.setattr(db_async, "DB_LEITORES", 2)
+    db.init_db()
+    yield db, db_async
+    db_async.encerrar_executores()
+    db.close_pool()
+
+
+def _entrada(valor):
+    return {
+        "id": str(uuid.uuid4()),
+        "usuario_id": "00000000-0000-0000-0000-000000000001",
+        "nome": "Salario",
+        "data": "2026-01-05",
+        "competencia": "2026-01",
+        "tipo_lancamento": "ENTRADA",
+        "valor": valor,
+    }
+
+
+def _thread_atual():
+    return threading.current_thread().name
+
+
+def test_escritas_em_um_unico_thread(ambiente):
+    _, db_async = ambiente
+
+    async def executar():
+        return await asyncio.gather(*(db_async._escrever(None, _thread_atual) for _ in range(20)))
+
+    nomes = set(asyncio.run(executar()))
+    assert len(nomes) == 1
+    assert nomes.pop().startswith("financas-db-escritor")
+
+
+def test_leituras_em_paralelo(ambiente):
+    _, db_async = ambiente
+    barreira = threading.Barrier(2, timeout=5)
+
+    def aguardar_outro_leitor():
+        barreira.wait()
+        return _thread_atual()
+
+    async def executar():
+        return await asyncio.gather(
+            db_async.executar_leitura(aguardar_outro_leitor),
+            db_async.executar_leitura(aguardar_outro_leitor),
+        )
+
+    nomes = asyncio.run(executar())
+    assert len(set(nomes)) == 2
+    assert all(nome.startswith("financas-db-leitor") for nome in nomes)
+
+
+def test_rajada_de_escritas_concorrentes_com_leituras(ambiente):
+    db, db_async = ambiente
+    lancamentos = [_entrada(1.0) for _ in range(200)]
+
+    async def executar():
+        escritas = [db_async.insert_lancamento(item) for item in lancamentos]
+        leituras = [
+            db_async.get_resumo_mensal("2026-01", lancamentos[0]["usuario_id"])
+            for _ in range(50)
+        ]
+        await asyncio.gather(*escritas, *leituras)
+        return await db_async.list_lancamentos(limite=500)
+
+    itens = asyncio.run(executar())
+    assert len(itens) == 200
+    resumo = db.get_resumo_mensal("2026-01", lancamentos[0]["usuario_id"])
+    assert resumo["entradas_centavos"] == 200 * 100
+
+
+def test_iter_lancamentos_assincrono(ambiente):
+    db, db_async = ambiente
+    db.insert_lancamentos([_entrada(float(valor)) for valor in range(5)])
+
+    async def executar():
+        return [lote async for lote in db_async.iter_lancamentos(tamanho_lote=2)]
+
+    lotes = asyncio.run(executar())
+    assert [len(lote) for lote in lotes] == [2, 2, 1]
+    assert db.get_pool().idle == db.get_pool().opened
+
+
+def test_grupo_commit_agrupa_escritas_concorrentes(ambiente, monkeypatch):
+    db, db_async = ambiente
+    monkeypatch.setattr(db_async, "GRUPO_COMMIT", True)
+    monkeypatch.setattr(db_async, "GRUPO_COMMIT_LATENCIA_MS", 200)
+    monkeypatch.setattr(db_async, "GRUPO_COMMIT_MAX_LINHAS", 10)
+    lancamentos = [_entrada(1.0) for _ in range(25)]
+
+    async def executar():
+        await asyncio.gather(*(db_async.insert_lancamento(item) for item in lancamentos))
+
+    asyncio.run(executar())
+
+    estatisticas = db_async.estatisticas_grupo_commit()
+    assert estatisticas["linhas"] == 25
+    assert estatisticas["lotes"] == 3
+    resumo = db.get_resumo_mensal("2026-01", lancamentos[0]["usuario_id"])
+    assert resumo["entradas_centavos"] == 25 * 100
+
+
+def test_grupo_commit_isola_item_com_erro(ambiente, monkeypatch):
+    db, db_async = ambiente
+    monkeypatch.setattr(db_async, "GRUPO_COMMIT", True)
+    monkeypatch.setattr(db_async, "GRUPO_COMMIT_LATENCIA_MS", 200)
+    repetido = _entrada(1.0)
+    lancamentos = [_entrada(1.0), repetido, dict(repetido), _entrada(1.0)]
+
+    async def executar():
+        return await asyncio.gather(
+            *(db_async.insert_lancamento(item) for item in lancamentos),
+            return_exceptions=True,
+        )
+
+    resultados = asyncio.run(executar())
+
+    assert [type(resultado).__name__ for resultado in resultados] == [
+        "NoneType",
+        "NoneType",
+        "IntegrityError",
+        "NoneType",
+    ]
+    assert len(db.list_lancamentos()) == 3
+    resumo = db.get_resumo_mensal("2026-01", repetido["usuario_id"])
+    assert resumo["entradas_centavos"] == 300
+
+
+def test_grupo_commit_confirma_cada_particao_separada(ambiente):
+    _, db_async = ambiente
+    gravados = []
+    grupo = db_async.GrupoCommit(
+        gravados.append,
+        latencia_ms=200,
+        max_linhas=10,
+        particionar=lambda item: item["usuario_id"],
+    )
+    itens = [{"usuario_id": usuario} for usuario in ("a", "b", "a", "c", "b")]
+    try:
+        futuros = [grupo.enviar(item) for item in itens]
+        for futuro in futuros:
+            futuro.result(timeout=5)
+    finally:
+        grupo.encerrar()
+
+    assert sorted([item["usuario_id"] for item in lote] for lote in gravados) == [
+        ["a", "a"],
+        ["b", "b"],
+        ["c"],
+    ]
+    assert grupo.estatisticas()["lotes"] == 3
+
+
+def test_exportacao_pausada_nao_segura_conexao(ambiente):
+    db, _ = ambiente
+    db.insert_lancamentos([_entrada(float(valor)) for valor in range(5)])
+
+    lotes = db.iter_lancamentos(tamanho_lote=2)
+    primeiro = next(lotes)
+    assert db.get_pool().idle == db.get_pool().opened
+    db.insert_lancamento({**_entrada(99.0), "data": "2026-01-20"})
+    restantes = list(lotes)
+
+    assert [len(lote) for lote in [primeiro, *restantes]] == [2, 2, 2]
+
+
+@pytest.mark.parametrize(("sincronia", "esperado"), [(None, 2), ("NORMAL", 2), ("EXTRA", 3)])
+def test_grupo_commit_escreve_com_fsync_no_commit(ambiente, monkeypatch, sincronia, esperado):
+    db, _ = ambiente
+    db.close_pool()
+    monkeypatch.setenv("FINANCAS_GRUPO_COMMIT", "1")
+    if sincronia is not None:
+        monkeypatch.setenv("FINANCAS_DB_SYNCHRONOUS", sincronia)
+    importlib.reload(db)
+
+    with db.get_connection() as conn:
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == esperado
+
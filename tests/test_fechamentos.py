@@ -0,0 +1,109 @@
+import importlib
+import sqlite3
+
+from fastapi.testclient import TestClient
+import pytest
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("FINANCAS_DB_PATH", str(tmp_path / "financas.db"))
+
+    import app.db as db
+    import app.main as main
+
+    importlib.reload(db)
+    importlib.reload(main)
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def _entrada(competencia, valor=100.0):
+    return {
+        "nome": "Salario",
+        "data": f"{competencia}-05",
+        "competencia": competencia,
+        "tipo_lancamento": "ENTRADA",
+        "valor": valor,
+    }
+
+
+def test_fechamento_congela_totais_e_bloqueia_escrita(client):
+    categoria = client.post("/categorias", json={"nome": "Casa"}).json()
+    forma = client.post("/formas-pagamento", json={"nome": "Pix"}).json()
+    assert client.post("/lancamentos", json=_entrada("2026-02", 1000.0)).status_code == 201
+
+    fechamento = client.post("/fechamentos", json={"competencia": "2026-02"})
+    assert fechamento.status_code == 201
+    assert fechamento.json()["saldo"] == 1000.0
+    assert client.post("/fechamentos", json={"competencia": "2026-02"}).status_code == 409
+
+    resposta = client.post("/lancamentos", json=_entrada("2026-02"))
+    assert resposta.status_code == 409
+    assert resposta.json()["detail"] == "competencia fechada: 2026-02"
+
+    parcelado = client.post(
+        "/lancamentos",
+        json={
+            "nome": "Geladeira",
+            "data": "2026-01-10",
+            "competencia": "2026-01",
+            "tipo_lancamento": "PARCELADO",
+            "categoria_id": categoria["id"],
+            "forma_pagamento_id": forma["id"],
+            "valor_total": 300.0,
+            "numero_parcelas": 3,
+        },
+    )
+    assert parcelado.status_code == 409
+
+    lote = client.post("/lancamentos/lote", json=[_entrada("2026-03"), _entrada("2026-02")])
+    assert lote.status_code == 409
+    assert client.get("/lancamentos").json()[0]["competencia"] == "2026-02"
+    assert len(client.get("/lancamentos").json()) == 1
+    assert client.post("/lancamentos", json=_entrada("2026-03")).status_code == 201
+
+
+def test_consolidacoes_leem_o_snapshot(client):
+    import app.db as db
+
+    client.post("/lancamentos", json=_entrada("2026-01", 250.0))
+    client.post("/fechamentos", json={"competencia": "2026-01"})
+    with db.get_connection() as conn:
+        conn.execute("UPDATE resumo_mensal SET entradas_centavos = 1")
+        with pytest.raises(sqlite3.DatabaseError):
+            conn.execute("UPDATE fechamentos SET entradas_centavos = 1")
+        with pytest.raises(sqlite3.DatabaseError):
+            conn.execute("DELETE FROM fechamentos")
+
+    mensal = client.get("/consolidacoes/mensal", params={"competencia": "2026-01"}).json()
+    anual = client.get("/consolidacoes/anual", params={"ano": "2026"}).json()
+
+    assert mensal["total_entradas"] == 250.0
+    assert anual["resumos"][0] == mensal
+    assert client.get("/fechamentos/2026-01").json()["total_entradas"] == 250.0
+    assert client.get("/fechamentos/2026-02").status_code == 404
+    assert [item["competencia"] for item in client.get("/fechamentos").json()] == ["2026-01"]
+
+
+def test_recorrencias_pulam_competencias_fechadas(client):
+    client.post("/fechamentos", json={"competencia": "2026-02"})
+    client.post(
+        "/recorrencias",
+        json={
+            "nome": "Salario",
+            "tipo_lancamento": "ENTRADA",
+            "valor": 100.0,
+            "dia": 5,
+            "competencia_inicio": "2026-01",
+        },
+    )
+    periodo = {"competencia_inicio": "2026-01", "competencia_fim": "2026-03"}
+
+    projetado = client.get("/consolidacoes/anual", params={**periodo, "projetar": "true"}).json()
+    gerados = client.post("/recorrencias/materializar", params=periodo).json()
+
+    assert [item["total_entradas"] for item in projetado["resumos"]] == [100.0, 0.0, 100.0]
+    assert gerados["quantidade"] == 2
+    assert client.post("/fechamentos", json={"competencia": "20-1"}).status_code == 422
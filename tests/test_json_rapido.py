@@ -0,0 +1,105 @@
+import importlib
+import json
+
+from fastapi.testclient import TestClient
+import pytest
+
+
+@pytest.fixture()
+def ambiente(tmp_path, monkeypatch):
+    monkeypatch.setenv("FINANCAS_DB_PATH", str(tmp_path / "financas.db"))
+
+    import app.db as db
+    import app.main as main
+
+    importlib.reload(db)
+    importlib.reload(main)
+
+    with TestClient(main.app) as test_client:
+        categoria = test_client.post("/categorias", json={"nome": "Casa"}).json()
+        forma = test_client.post("/formas-pagamento", json={"nome": "Pix"}).json()
+        referencias = {"categoria_id": categoria["id"], "forma_pagamento_id": forma["id"]}
+        yield main, test_client, referencias
+
+
+def _lancamentos(comum):
+    return [
+        {
+            "nome": 'Salario "bonus" \\ março',
+            "data": "2026-01-05",
+            "competencia": "2026-01",
+            "tipo_lancamento": "ENTRADA",
+            "valor": 5000.1,
+        },
+        {
+            "nome": "Aluguel\napto",
+            "data": "2026-01-10",
+            "competencia": "2026-01",
+            "tipo_lancamento": "FIXO",
+            "valor": 0.3,
+            "pago": True,
+            **comum,
+        },
+        {
+            "nome": "Café ☕ \u0001",
+            "data": "2026-02-01",
+            "competencia": "2026-02",
+            "tipo_lancamento": "VARIAVEL",
+            "valor": 12,
+            "pago": False,
+            **comum,
+        },
+        {
+            "nome": "Notebook",
+            "data": "2026-02-15",
+            "competencia": "2026-02",
+            "tipo_lancamento": "PARCELADO",
+            "valor_total": 3999.99,
+            "numero_parcelas": 10,
+            **comum,
+        },
+    ]
+
+
+def _listar(main, client, monkeypatch, rapido, params):
+    monkeypatch.setattr(main, "JSON_RAPIDO", rapido)
+    main._respostas.limpar()
+    return client.get("/lancamentos", params=params)
+
+
+@pytest.mark.parametrize("params", [{}, {"limite": "3"}, {"tipo_lancamento": "FIXO"}])
+def test_modo_rapido_gera_mesmos_bytes(ambiente, monkeypatch, params):
+    main, client, comum = ambiente
+    for lancamento in _lancamentos(comum):
+        assert client.post("/lancamentos", json=lancamento).status_code == 201
+
+    rapido = _listar(main, client, monkeypatch, True, params)
+    dicts = _listar(main, client, monkeypatch, False, params)
+
+    assert rapido.status_code == dicts.status_code == 200
+    assert rapido.content == dicts.content
+    assert rapido.headers["ETag"] == dicts.headers["ETag"]
+    assert rapido.headers.get("X-Proximo-Cursor") == dicts.headers.get("X-Proximo-Cursor")
+    assert rapido.json() == json.loads(dicts.content)
+
+
+def test_paginacao_no_modo_rapido(ambiente, monkeypatch):
+    main, client, comum = ambiente
+    for lancamento in _lancamentos(comum):
+        client.post("/lancamentos", json=lancamento)
+
+    primeira = _listar(main, client, monkeypatch, True, {"limite": "3"})
+    cursor = primeira.headers["X-Proximo-Cursor"]
+    segunda = client.get("/lancamentos", params={"limite": "3", "cursor": cursor})
+
+    nomes = [item["nome"] for item in primeira.json() + segunda.json()]
+    assert nomes == [lancamento["nome"] for lancamento in _lancamentos(comum)]
+    assert "X-Proximo-Cursor" not in segunda.headers
+
+
+def test_lista_vazia(ambiente, monkeypatch):
+    main, client, _ = ambiente
+
+    resposta = _listar(main, client, monkeypatch, True, {})
+
+    assert resposta.content == b"[]"
@@ -0,0 +1,90 @@
+import csv
+import importlib
+import io
+import json
+
+from fastapi.testclient import TestClient
+import pytest
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    db_path = tmp_path / "financas.db"
+    monkeypatch.setenv("FINANCAS_DB_PATH", str(db_path))
+    monkeypatch.setenv("FINANCAS_EXPORTACAO_TAMANHO_LOTE", "2")
+
+    import app.db as db
+    import app.main as main
+
+    importlib.reload(db)
+    importlib.reload(main)
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def _popular(client):
+    categoria = client.post("/categorias", json={"nome": "Mercado"}).json()
+    forma = client.post("/formas-pagamento", json={"nome": "Cartao"}).json()
+    payloads = [
+        {
+            "nome": "Salario",
+            "data": "2026-01-05",
+            "competencia": "2026-01",
+            "tipo_lancamento": "ENTRADA",
+            "valor": 5000.0,
+        },
+        {
+            "nome": "Aluguel",
+            "data": "2026-01-10",
+            "competencia": "2026-01",
+            "tipo_lancamento": "FIXO",
+            "categoria_id": categoria["id"],
+            "forma_pagamento_id": forma["id"],
+            "valor": 1500.0,
+            "pago": True,
+        },
+        {
+            "nome": "Notebook",
+            "data": "2026-02-01",
+            "competencia": "2026-02",
+            "tipo_lancamento": "PARCELADO",
+            "categoria_id": categoria["id"],
+            "forma_pagamento_id": forma["id"],
+            "valor_total": 3000.0,
+            "numero_parcelas": 10,
+        },
+    ]
+    for payload in payloads:
+        assert client.post("/lancamentos", json=payload).status_code == 201
+
+
+def test_exportacao_ndjson_igual_a_listagem(client):
+    _popular(client)
+
+    response = client.get("/lancamentos/exportar")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    linhas = [json.loads(linha) for linha in response.text.splitlines()]
+    assert linhas == client.get("/lancamentos").json()
+
+
+def test_exportacao_csv_com_filtro(client):
+    _popular(client)
+
+    response = client.get(
+        "/lancamentos/exportar",
+        params={"formato": "csv", "competencia_fim": "2026-01"},
+    )
+    assert response.status_code == 200
+    linhas = list(csv.DictReader(io.StringIO(response.text)))
+    assert [linha["nome"] for linha in linhas] == ["Salario", "Aluguel"]
+    assert linhas[0]["categoria_id"] == ""
+    assert linhas[1]["pago"] == "true"
+    assert linhas[1]["valor_total"] == ""
+
+
+def test_exportacao_formato_invalido(client):
+    response = client.get("/lancamentos/exportar", params={"formato": "xml"})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["query", "formato"]
@@ -0,0 +1,147 @@
+import importlib
+import json
+
+from fastapi.testclient import TestClient
+import pytest
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    db_path = tmp_path / "financas.db"
+    monkeypatch.setenv("FINANCAS_DB_PATH", str(db_path))
+
+    import app.db as db
+    import app.main as main
+
+    importlib.reload(db)
+    importlib.reload(main)
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture()
+def referencias(client):
+    categoria = client.post("/categorias", json={"nome": "Mercado"}).json()
+    forma = client.post("/formas-pagamento", json={"nome": "Cartao"}).json()
+    return categoria["id"], forma["id"]
+
+
+def _itens(categoria_id, forma_pagamento_id):
+    return [
+        {
+            "nome": "Salario",
+            "data": "2026-01-05",
+            "competencia": "2026-01",
+            "tipo_lancamento": "ENTRADA",
+            "valor": 5000.0,
+        },
+        {
+            "nome": "Aluguel",
+            "data": "2026-01-10",
+            "competencia": "2026-01",
+            "tipo_lancamento": "FIXO",
+            "categoria_id": categoria_id,
+            "forma_pagamento_id": forma_pagamento_id,
+            "valor": 1500.0,
+            "pago": True,
+        },
+        {
+            "nome": "Notebook",
+            "data": "2026-01-15",
+            "competencia": "2026-01",
+            "tipo_lancamento": "PARCELADO",
+            "categoria_id": categoria_id,
+            "forma_pagamento_id": forma_pagamento_id,
+            "valor_total": 100.0,
+            "numero_parcelas": 3,
+        },
+    ]
+
+
+def test_lote_json_insere_todos_e_atualiza_resumo(client, referencias):
+    response = client.post("/lancamentos/lote", json=_itens(*referencias))
+
+    assert response.status_code == 201
+    body = response.json()
+    assert body["quantidade"] == 3
+    assert len(set(body["ids"])) == 3
+
+    listagem = client.get("/lancamentos").json()
+    assert [item["id"] for item in listagem] == body["ids"]
+
+    janeiro = client.get("/consolidacoes/mensal", params={"competencia": "2026-01"}).json()
+    assert janeiro["total_entradas"] == 5000.0
+    assert janeiro["total_gastos"] == 1533.33
+    marco = client.get("/consolidacoes/mensal", params={"competencia": "2026-03"}).json()
+    assert marco["total_gastos"] == 33.34
+
+
+def test_lote_ndjson(client, referencias):
+    corpo = "\n".join(json.dumps(item) for item in _itens(*referencias)) + "\n\n"
+    response = client.post(
+        "/lancamentos/lote",
+        content=corpo.encode("utf-8"),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 201
+    assert response.json()["quantidade"] == 3
+
+
+def test_lote_reporta_erros_por_item_sem_inserir(client, referencias):
+    categoria_id, forma_pagamento_id = referencias
+    itens = _itens(categoria_id, forma_pagamento_id)
+    del itens[0]["valor"]
+    itens[1]["categoria_id"] = "00000000-0000-0000-0000-00000000ffff"
+    itens[2]["numero_parcelas"] = 0
+
+    response = client.post("/lancamentos/lote", json=itens)
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == [
+        {"loc": ["body", 0, "valor"], "msg": "campo obrigatorio", "type": "value_error.missing"},
+        {
+            "loc": ["body", 1, "categoria_id"],
+            "msg": "categoria nao encontrada",
+            "type": "value_error.not_found",
+        },
+        {
+            "loc": ["body", 2, "numero_parcelas"],
+            "msg": "deve ser maior ou igual a 1",
+            "type": "value_error",
+        },
+    ]
+    assert client.get("/lancamentos").json() == []
+
+
+def test_lote_ndjson_linha_invalida(client):
+    response = client.post(
+        "/lancamentos/lote",
+        content=b'{"nome": "a"\n',
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", 0]
+    assert response.json()["detail"][0]["type"] == "value_error.jsondecode"
+
+
+@pytest.mark.parametrize(
+    "corpo, tipo",
+    [
+        (b'{"nome": "a"}', "type_error.list"),
+        (b"[]", "value_error"),
+        (b"[", "value_error.jsondecode"),
+    ],
+)
+def test_lote_corpo_invalido(client, corpo, tipo):
+    response = client.post(
+        "/lancamentos/lote",
+        content=corpo,
+        headers={"Content-Type": "application/json"},
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body"]
+    assert response.json()["detail"][0]["type"] == tipo
@@ -0,0 +1,107 @@
+import importlib
+
+from fastapi.testclient import TestClient
+import pytest
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    db_path = tmp_path / "financas.db"
+    monkeypatch.setenv("FINANCAS_DB_PATH", str(db_path))
+
+    import app.db as db
+    import app.main as main
+
+    importlib.reload(db)
+    importlib.reload(main)
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def _criar_entrada(client, competencia, data, valor=100.0):
+    response = client.post(
+        "/lancamentos",
+        json={
+            "nome": "Salario",
+            "data": data,
+            "competencia": competencia,
+            "tipo_lancamento": "ENTRADA",
+            "valor": valor,
+        },
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_listagem_paginada_por_cursor(client):
+    criados = [
+        _criar_entrada(client, f"2026-0{mes}", f"2026-0{mes}-05")
+        for mes in (3, 1, 2, 4, 5)
+    ]
+
+    vistos = []
+    cursor = None
+    paginas = 0
+    while True:
+        params = {"limite": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/lancamentos", params=params)
+        assert response.status_code == 200
+        vistos.extend(item["competencia"] for item in response.json())
+        paginas += 1
+        cursor = response.headers.get("X-Proximo-Cursor")
+        if cursor is None:
+            break
+
+    assert paginas == 3
+    assert vistos == sorted(item["competencia"] for item in criados)
+
+
+def test_listagem_sem_limite_nem_cursor_devolve_tudo(client, monkeypatch):
+    import app.main as main
+
+    monkeypatch.setattr(main, "LISTAGEM_LIMITE_PADRAO", 2)
+    for mes in (1, 2, 3, 4):
+        _criar_entrada(client, f"2026-0{mes}", f"2026-0{mes}-05")
+
+    completa = client.get("/lancamentos")
+    assert len(completa.json()) == 4
+    assert "X-Proximo-Cursor" not in completa.headers
+
+    primeira = client.get("/lancamentos", params={"limite": 1})
+    seguinte = client.get("/lancamentos", params={"cursor": primeira.headers["X-Proximo-Cursor"]})
+    assert len(seguinte.json()) == 2
+    assert "X-Proximo-Cursor" in seguinte.headers
+
+
+def test_listagem_filtra_por_competencia_e_tipo(client):
+    _criar_entrada(client, "2026-01", "2026-01-05")
+    _criar_entrada(client, "2026-02", "2026-02-05")
+    _criar_entrada(client, "2026-03", "2026-03-05")
+
+    response = client.get(
+        "/lancamentos",
+        params={
+            "competencia_inicio": "2026-02",
+            "competencia_fim": "2026-03",
+            "tipo_lancamento": "ENTRADA",
+        },
+    )
+    assert response.status_code == 200
+    assert [item["competencia"] for item in response.json()] == ["2026-02", "2026-03"]
+    assert "X-Proximo-Cursor" not in response.headers
+
+    response = client.get("/lancamentos", params={"tipo_lancamento": "FIXO"})
+    assert response.json() == []
+
+
+def test_listagem_parametros_invalidos(client):
+    response = client.get(
+        "/lancamentos",
+        params={"limite": "0", "cursor": "???", "pago": "talvez"},
+    )
+    assert response.status_code == 422
+    locs = [erro["loc"] for erro in response.json()["detail"]]
+    assert locs == [["query", "limite"], ["query", "cursor"], ["query", "pago"]]
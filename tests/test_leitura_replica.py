@@ -0,0 +1,161 @@
+import importlib
+import sqlite3
+import threading
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+import pytest
+
+USUARIO = "00000000-0000-0000-0000-000000000001"
+
+
+def _carregar(tmp_path, monkeypatch, modo, **env):
+    monkeypatch.setenv("FINANCAS_DB_PATH", str(tmp_path / "financas.db"))
+    monkeypatch.setenv("FINANCAS_DB_LEITURA", modo)
+    for nome, valor in env.items():
+        monkeypatch.setenv(nome, valor)
+
+    import app.db as db
+
+    importlib.reload(db)
+    db.init_db()
+    return db
+
+
+@pytest.fixture()
+def leitura_ro(tmp_path, monkeypatch):
+    db = _carregar(tmp_path, monkeypatch, "ro")
+    yield db
+    db.close_pool()
+
+
+@pytest.fixture()
+def replica(tmp_path, monkeypatch):
+    db = _carregar(tmp_path, monkeypatch, "replica", FINANCAS_DB_REPLICA_INTERVALO_S="0.05")
+    yield db
+    db.close_pool()
+
+
+def _entrada(valor=10.0, competencia="2026-01"):
+    return {
+        "id": str(uuid.uuid4()),
+        "usuario_id": USUARIO,
+        "nome": "Salario",
+        "data": f"{competencia}-05",
+        "competencia": competencia,
+        "tipo_lancamento": "ENTRADA",
+        "valor": valor,
+    }
+
+
+def test_modo_invalido_e_recusado(tmp_path, monkeypatch):
+    with pytest.raises(ValueError):
+        _carregar(tmp_path, monkeypatch, "secundario")
+
+    _carregar(tmp_path, monkeypatch, "principal").close_pool()
+
+
+def test_leitura_ro_nao_aceita_escrita(leitura_ro):
+    db = leitura_ro
+    db.insert_lancamento(_entrada())
+
+    with db.get_leitura(USUARIO) as conn:
+        assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM lancamentos")
+
+    assert len(db.list_lancamentos()) == 1
+
+
+def test_leitura_ro_nao_espera_transacao_de_escrita(leitura_ro):
+    db = leitura_ro
+    db.insert_lancamento(_entrada())
+    pronto = threading.Event()
+    liberar = threading.Event()
+
+    def escrever_devagar():
+        with db.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM lancamentos")
+            pronto.set()
+            liberar.wait(5)
+
+    escritor = threading.Thread(target=escrever_devagar)
+    escritor.start()
+    try:
+        assert pronto.wait(5)
+        inicio = time.perf_counter()
+        itens = db.list_lancamentos()
+        resumo = db.get_resumo_mensal("2026-01", USUARIO)
+        duracao = time.perf_counter() - inicio
+    finally:
+        liberar.set()
+        escritor.join()
+
+    assert len(itens) == 1
+    assert resumo["entradas_centavos"] == 1000
+    assert duracao < 1
+    assert db.list_lancamentos() == []
+
+
+def test_replica_fica_na_copia_ate_atualizar(replica):
+    db = replica
+    db.insert_lancamento(_entrada())
+    assert len(db.list_lancamentos()) == 1
+    versao = db.versao_dados(USUARIO)
+
+    db.insert_lancamento(_entrada(competencia="2026-02"))
+    db.insert_categoria({"id": str(uuid.uuid4()), "usuario_id": USUARIO, "nome": "Casa"})
+
+    assert len(db.list_lancamentos()) == 1
+    assert len(db.list_categorias(USUARIO)) == 1
+    assert db.atualizar_replica() is True
+    assert len(db.list_lancamentos()) == 2
+    assert db.get_resumo_mensal("2026-02", USUARIO)["entradas_centavos"] == 1000
+    assert db.versao_dados(USUARIO) != versao
+    assert db.estatisticas_replica()["geracao"] == 2
+
+
+def test_replica_atualiza_em_segundo_plano_so_com_escrita(replica):
+    db = replica
+    db.iniciar_replica()
+    geracao = db.estatisticas_replica()["geracao"]
+    time.sleep(0.3)
+    assert db.estatisticas_replica()["geracao"] == geracao
+
+    db.insert_lancamento(_entrada())
+    prazo = time.monotonic() + 5
+    while db.estatisticas_replica()["geracao"] == geracao and time.monotonic() < prazo:
+        time.sleep(0.02)
+
+    assert db.estatisticas_replica()["geracao"] == geracao + 1
+    assert len(db.list_lancamentos()) == 1
+
+
+def test_api_em_modo_replica(replica):
+    import app.main as main
+
+    importlib.reload(main)
+    with TestClient(main.app) as client:
+        categoria = client.post("/categorias", json={"nome": "Casa"}).json()
+        forma = client.post("/formas-pagamento", json={"nome": "Pix"}).json()
+        resposta = client.post(
+            "/lancamentos",
+            json={
+                "nome": "Mercado",
+                "data": "2026-01-10",
+                "competencia": "2026-01",
+                "tipo_lancamento": "VARIAVEL",
+                "categoria_id": categoria["id"],
+                "forma_pagamento_id": forma["id"],
+                "valor": 80.5,
+                "pago": False,
+            },
+        )
+        assert resposta.status_code == 201
+
+        replica.atualizar_replica()
+        mensal = client.get("/consolidacoes/mensal", params={"competencia": "2026-01"})
+        assert mensal.json()["total_gastos"] == 80.5
+        assert 'financas_db_replica{campo="geracao"}' in client.get("/metrics").text
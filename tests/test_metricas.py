@@ -0,0 +1,175 @@
+import importlib
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app import metricas
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    db_path = tmp_path / "financas.db"
+    monkeypatch.setenv("FINANCAS_DB_PATH", str(db_path))
+
+    import app.db as db
+    import app.main as main
+
+    importlib.reload(db)
+    importlib.reload(main)
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def _valor(texto, prefixo):
+    for linha in texto.splitlines():
+        if linha.startswith(prefixo + " "):
+            return float(linha.rsplit(" ", 1)[1])
+    return None
+
+
+def _entrada():
+    return {
+        "nome": "Salario",
+        "data": "2026-01-05",
+        "competencia": "2026-01",
+        "tipo_lancamento": "ENTRADA",
+        "valor": 100,
+    }
+
+
+def test_metrics_expoe_formato_prometheus(client):
+    assert client.post("/lancamentos", json=_entrada()).status_code == 201
+    assert client.get("/consolidacoes/mensal", params={"competencia": "2026-01"}).status_code == 200
+
+    resposta = client.get("/metrics")
+
+    assert resposta.status_code == 200
+    assert resposta.headers["content-type"].startswith("text/plain; version=0.0.4")
+    texto = resposta.text
+    assert "# TYPE financas_http_request_duration_seconds histogram" in texto
+    rota = 'metodo="POST",rota="/lancamentos",status="201"'
+    assert _valor(texto, f"financas_http_request_duration_seconds_count{{{rota}}}") >= 1
+    assert f'financas_http_request_duration_seconds_bucket{{{rota},le="+Inf"}}' in texto
+    assert _valor(texto, 'financas_db_queries_total{funcao="insert_lancamento"}') >= 2
+    assert _valor(texto, 'financas_db_rows_total{funcao="get_resumo_mensal"}') is not None
+    assert (
+        _valor(
+            texto,
+            'financas_stage_duration_seconds_count{etapa="validacao",funcao="_validate_payload"}',
+        )
+        >= 1
+    )
+    assert (
+        _valor(
+            texto,
+            'financas_stage_duration_seconds_count{etapa="serializacao",funcao="_serializar_resposta"}',
+        )
+        >= 1
+    )
+    assert 'financas_cache_hits{cache="respostas"}' in texto
+    assert 'financas_db_pool_connections{estado="abertas"}' in texto
+
+
+def test_rota_usa_template_e_rota_inexistente_e_agrupada(client):
+    client.get("/categorias/nao-existe")
+    client.get("/caminho/que/nao/existe")
+
+    texto = client.get("/metrics").text
+
+    assert re.search(r'rota="/categorias/\{categoria_id\}",status="404"', texto)
+    assert 'rota="desconhecida",status="404"' in texto
+    assert "nao-existe" not in texto
+
+
+def test_instrumentar_db_conta_queries_e_linhas_de_geradores():
+    @metricas.instrumentar_db
+    def ler_lotes():
+        for tamanho in (2, 3):
+            metricas.contar_query("SELECT 1")
+            metricas.contar_query("COMMIT")
+            yield [None] * tamanho
+
+    antes_queries = metricas.DB_QUERIES.valor(funcao="ler_lotes")
+    antes_linhas = metricas.DB_LINHAS.valor(funcao="ler_lotes")
+
+    assert [len(lote) for lote in ler_lotes()] == [2, 3]
+    assert metricas.DB_QUERIES.valor(funcao="ler_lotes") - antes_queries == 2
+    assert metricas.DB_LINHAS.valor(funcao="ler_lotes") - antes_linhas == 5
+    assert metricas.DB_DURACAO.contagem(funcao="ler_lotes") >= 1
+
+
+def test_histograma_acumula_buckets():
+    histograma = metricas.Histograma("teste_segundos", "Teste.", buckets=(0.1, 1.0))
+    histograma.observar(0.05, rota="/x")
+    histograma.observar(0.5, rota="/x")
+    histograma.observar(3.0, rota="/x")
+
+    linhas = histograma.renderizar()
+
+    assert 'teste_segundos_bucket{rota="/x",le="0.1"} 1' in linhas
+    assert 'teste_segundos_bucket{rota="/x",le="1"} 2' in linhas
+    assert 'teste_segundos_bucket{rota="/x",le="+Inf"} 3' in linhas
+    assert 'teste_segundos_count{rota="/x"} 3' in linhas
+
+
+def test_profiler_grava_pilhas_colapsadas(tmp_path, monkeypatch):
+    monkeypatch.setattr(metricas, "PROFILER_DIR", tmp_path)
+    amostrador = metricas.AmostradorPerfil(intervalo_ms=1)
+
+    token = amostrador.iniciar()
+    fim = time.monotonic() + 0.05
+    while time.monotonic() < fim:
+        sum(range(1000))
+    amostras = amostrador.finalizar(token)
+
+    assert amostras
+    caminho = metricas.gravar_perfil("GET", "/lancamentos/{id}", 0.75, amostras)
+    assert caminho.parent == tmp_path
+    assert caminho.name.endswith("-GET-lancamentos_id-750ms.folded")
+    linhas = caminho.read_text(encoding="utf-8").splitlines()
+    assert any("test_metricas.py:test_profiler_grava_pilhas_colapsadas" in linha for linha in linhas)
+    assert all(linha.rsplit(" ", 1)[1].isdigit() for linha in linhas)
+
+
+def _ocupar(segundos):
+    fim = time.monotonic() + segundos
+    while time.monotonic() < fim:
+        sum(range(1000))
+
+
+def _chamada_da_requisicao():
+    _ocupar(0.05)
+
+
+def _chamada_alheia(parar):
+    while not parar.is_set():
+        sum(range(1000))
+
+
+def test_profiler_amostra_apenas_threads_da_requisicao(monkeypatch):
+    amostrador = metricas.AmostradorPerfil(intervalo_ms=1)
+    monkeypatch.setattr(metricas, "_amostrador", amostrador)
+    parar = threading.Event()
+    alheia = threading.Thread(target=_chamada_alheia, args=(parar,))
+    alheia.start()
+
+    token = amostrador.iniciar()
+    contexto = metricas._perfil_requisicao.set(token)
+    try:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(metricas.no_perfil(_chamada_da_requisicao)).result()
+    finally:
+        metricas._perfil_requisicao.reset(contexto)
+        amostras = amostrador.finalizar(token)
+        parar.set()
+        alheia.join()
+
+    pilhas = "\n".join(amostras)
+    assert "test_metricas.py:_chamada_da_requisicao" in pilhas
+    assert "_chamada_alheia" not in pilhas
+    assert "queue.py:get" not in pilhas
@@ -0,0 +1,90 @@
+import importlib
+import sqlite3
+
+import pytest
+
+SCHEMA_V0 = """
+    CREATE TABLE lancamentos (
+        id TEXT PRIMARY KEY,
+        usuario_id TEXT NOT NULL,
+        nome TEXT NOT NULL,
+        data TEXT NOT NULL,
+        competencia TEXT NOT NULL,
+        tipo_lancamento TEXT NOT NULL,
+        categoria_id TEXT,
+        forma_pagamento_id TEXT,
+        valor REAL,
+        pago INTEGER,
+        valor_total REAL,
+        numero_parcelas INTEGER
+    )
+"""
+
+USUARIO_ID = "00000000-0000-0000-0000-000000000001"
+
+
+@pytest.fixture()
+def banco_v0(tmp_path, monkeypatch):
+    db_path = tmp_path / "financas.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute(SCHEMA_V0)
+    conn.executemany(
+        "INSERT INTO lancamentos VALUES (?, ?, 'x', '2026-01-01', ?, ?, NULL, NULL, ?, ?, ?, ?)",
+        [
+            ("a", USUARIO_ID, "2026-01", "ENTRADA", 1234.56, None, None, None),
+            ("b", USUARIO_ID, "2026-01", "FIXO", 0.1 + 0.2, 1, None, None),
+            ("c", USUARIO_ID, "2026-01", "VARIAVEL", 10.005, 0, None, None),
+            ("d", USUARIO_ID, "2025-12", "PARCELADO", None, None, 100.0, 3),
+            ("e", USUARIO_ID, "2026-02", "ENTRADA", 7.0, None, None, None),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setenv("FINANCAS_DB_PATH", str(db_path))
+    monkeypatch.setenv("FINANCAS_MIGRACAO_TAMANHO_LOTE", "2")
+
+    import app.migracoes as migracoes
+    import app.db as db
+
+    importlib.reload(migracoes)
+    importlib.reload(db)
+    yield db
+    db.close_pool()
+
+
+def test_migracao_converte_valores_para_centavos(banco_v0):
+    db = banco_v0
+    db.init_db()
+
+    with db.get_connection() as conn:
+        colunas = {row[1] for row in conn.execute("PRAGMA table_info(lancamentos)")}
+        versao = conn.execute("PRAGMA user_version").fetchone()[0]
+        valores = dict(
+            conn.execute(
+                "SELECT id, COALESCE(valor_centavos, valor_total_centavos) FROM lancamentos"
+            ).fetchall()
+        )
+
+    assert {"valor_centavos", "valor_total_centavos"} <= colunas
+    assert not {"valor", "valor_total"} & colunas
+    assert versao == 1
+    assert valores == {"a": 123456, "b": 30, "c": 1001, "d": 10000, "e": 700}
+
+    itens = {item.id: item.como_dict() for item in db.list_lancamentos()}
+    assert itens["a"]["valor"] == 1234.56
+    assert itens["b"]["valor"] == 0.3
+    assert itens["d"]["valor_total"] == 100.0
+
+    resumo = db.get_resumo_mensal("2026-01", USUARIO_ID)
+    assert resumo == {"entradas_centavos": 123456, "gastos_centavos": 1031, "parcelas_centavos": 3333}
+
+
+def test_migracao_idempotente(banco_v0):
+    db = banco_v0
+    db.init_db()
+    db.init_db()
+
+    with db.get_connection() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == 1
+        assert conn.execute("SELECT COUNT(*) FROM lancamentos").fetchone()[0] == 5
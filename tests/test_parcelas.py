@@ -0,0 +1,98 @@
+from decimal import Decimal, ROUND_HALF_UP
+import random
+
+import pytest
+
+from app.calculos import competencia_to_index, index_to_competencia, parcelas_por_competencia
+from app.parcelas import agenda_parcelas_centavos, centavos_exatos
+
+SEMENTES = range(20)
+CENTAVO = Decimal("0.01")
+
+
+def _parcela_referencia(valor_total, numero_parcelas, indice):
+    base = (valor_total / Decimal(numero_parcelas)).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+    if indice == numero_parcelas - 1:
+        return (valor_total - base * Decimal(numero_parcelas - 1)).quantize(
+            CENTAVO,
+            rounding=ROUND_HALF_UP,
+        )
+    return base
+
+
+def _referencia(total_centavos, numero_parcelas):
+    total = Decimal(total_centavos) / 100
+    return [
+        _parcela_referencia(total, numero_parcelas, indice)
+        for indice in range(numero_parcelas)
+    ]
+
+
+def _total_centavos(gerador):
+    if gerador.random() < 0.2:
+        return gerador.choice([0, 1, 5, 15, 30, 10**13, 999999999999999])
+    return gerador.randrange(0, 10 ** gerador.randrange(1, 16))
+
+
+def _numero_parcelas(gerador):
+    if gerador.random() < 0.05:
+        return gerador.randrange(1, 10**7)
+    return gerador.randrange(1, 601)
+
+
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_agenda_igual_ao_decimal(semente):
+    gerador = random.Random(semente)
+    totais = [_total_centavos(gerador) for _ in range(500)]
+    numeros = [_numero_parcelas(gerador) for _ in range(500)]
+
+    bases, ultimas = agenda_parcelas_centavos(totais, numeros)
+    for total, numero, base, ultima in zip(totais, numeros, bases, ultimas):
+        total_decimal = Decimal(total) / 100
+        esperado_base = _parcela_referencia(total_decimal, numero, 0 if numero > 1 else -1)
+        esperado_ultima = _parcela_referencia(total_decimal, numero, numero - 1)
+        assert Decimal(base) / 100 == esperado_base, (total, numero)
+        assert Decimal(ultima) / 100 == esperado_ultima, (total, numero)
+
+
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_parcelas_por_competencia_igual_ao_decimal(semente):
+    gerador = random.Random(semente)
+    parcelados = [
+        {
+            "competencia": index_to_competencia(24300 + gerador.randrange(48)),
+            "valor_total_centavos": gerador.randrange(0, 10 ** gerador.randrange(1, 16)),
+            "numero_parcelas": gerador.randrange(1, 37),
+            "quantidade": gerador.randrange(1, 3),
+        }
+        for _ in range(300)
+    ]
+
+    parcelas = parcelas_por_competencia(parcelados, index_to_competencia(24290), index_to_competencia(24400))
+    for deslocamento, centavos in enumerate(parcelas):
+        competencia_idx = 24290 + deslocamento
+        esperado = Decimal("0.00")
+        for item in parcelados:
+            indice = competencia_idx - competencia_to_index(item["competencia"])
+            if 0 <= indice < item["numero_parcelas"]:
+                valor_total = Decimal(item["valor_total_centavos"]) / 100
+                parcela = _parcela_referencia(valor_total, item["numero_parcelas"], indice)
+                esperado += parcela * item["quantidade"]
+        assert Decimal(centavos) / 100 == esperado
+
+
+@pytest.mark.parametrize(
+    ("valor", "centavos"),
+    [(0.0, 0), (0.29, 29), (1234.5, 123450), (7, 700), (0.005, None), (1e16, None), (-1.0, None), (True, None)],
+)
+def test_centavos_exatos(valor, centavos):
+    assert centavos_exatos(valor) == centavos
+
+
+def test_agenda_distribui_residuo_na_ultima_parcela():
+    totais, numeros = [10000, 5, 1000], [3, 2, 1]
+    bases, ultimas = agenda_parcelas_centavos(totais, numeros)
+    assert bases == [3333, 3, 1000]
+    assert ultimas == [3334, 2, 1000]
+    for total, numero, base, ultima in zip(totais, numeros, bases, ultimas):
+        assert [Decimal(base) / 100] * (numero - 1) + [Decimal(ultima) / 100] == _referencia(total, numero)
@@ -0,0 +1,57 @@
+import sqlite3
+import threading
+
+import pytest
+
+from app.pool import ConnectionPool, PoolClosedError
+
+
+@pytest.fixture()
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "financas.db"), 2, timeout=0.2)
+    yield pool
+    pool.close()
+
+
+def test_pool_reutiliza_conexao(pool):
+    conn = pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+    assert pool.opened == 1
+
+
+def test_pool_aplica_pragmas(pool):
+    conn = pool.acquire()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+    pool.release(conn)
+
+
+def test_pool_respeita_tamanho_maximo(pool):
+    primeira = pool.acquire()
+    segunda = pool.acquire()
+    with pytest.raises(sqlite3.OperationalError):
+        pool.acquire()
+
+    liberada = threading.Timer(0.05, pool.release, args=(primeira,))
+    liberada.start()
+    assert pool.acquire() is primeira
+    liberada.join()
+    pool.release(primeira)
+    pool.release(segunda)
+
+
+def test_pool_descarta_conexao_quebrada(pool):
+    conn = pool.acquire()
+    pool.release(conn, broken=True)
+    assert pool.opened == 0
+    assert pool.acquire() is not conn
+
+
+def test_pool_encerrado(pool):
+    assert pool.check()
+    pool.close()
+    assert pool.idle == 0
+    with pytest.raises(PoolClosedError):
+        pool.acquire()
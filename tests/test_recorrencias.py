@@ -0,0 +1,135 @@
+import importlib
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.modelos import Recorrencia
+from app.recorrencias import id_ocorrencia, ocorrencias
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("FINANCAS_DB_PATH", str(tmp_path / "financas.db"))
+
+    import app.db as db
+    import app.main as main
+
+    importlib.reload(db)
+    importlib.reload(main)
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def _aluguel(client, **extra):
+    categoria = client.post("/categorias", json={"nome": "Casa"}).json()
+    forma = client.post("/formas-pagamento", json={"nome": "Pix"}).json()
+    payload = {
+        "nome": "Aluguel",
+        "tipo_lancamento": "FIXO",
+        "categoria_id": categoria["id"],
+        "forma_pagamento_id": forma["id"],
+        "valor": 1500.0,
+        "dia": 31,
+        "competencia_inicio": "2026-01",
+        **extra,
+    }
+    resposta = client.post("/recorrencias", json=payload)
+    assert resposta.status_code == 201
+    return resposta.json()
+
+
+def test_ocorrencias_tem_id_deterministico_e_dia_ajustado():
+    regra = Recorrencia(
+        "r1", "u1", "Salario", "ENTRADA", None, None, 500000, 31, "2024-01", "2024-03"
+    )
+
+    itens = list(ocorrencias(regra, "2023-11", "2024-12"))
+
+    assert [item["data"] for item in itens] == ["2024-01-31", "2024-02-29", "2024-03-31"]
+    assert [item["id"] for item in itens] == [
+        id_ocorrencia("r1", competencia) for competencia in ("2024-01", "2024-02", "2024-03")
+    ]
+    assert itens == list(ocorrencias(regra, "2024-01", "2024-03"))
+    assert itens[0]["valor"] == 5000.0
+
+
+def test_materializar_e_idempotente(client):
+    regra = _aluguel(client, competencia_fim="2026-04")
+    params = {"competencia_inicio": "2026-01", "competencia_fim": "2026-06"}
+
+    primeira = client.post("/recorrencias/materializar", params=params)
+    segunda = client.post("/recorrencias/materializar", params=params)
+
+    assert primeira.json()["quantidade"] == 4
+    assert segunda.json()["quantidade"] == 0
+    itens = client.get("/lancamentos").json()
+    assert [item["data"] for item in itens] == [
+        "2026-01-31",
+        "2026-02-28",
+        "2026-03-31",
+        "2026-04-30",
+    ]
+    assert itens[0]["id"] == id_ocorrencia(regra["id"], "2026-01")
+    assert itens[0]["pago"] is False
+    mensal = client.get("/consolidacoes/mensal", params={"competencia": "2026-02"}).json()
+    assert mensal["total_gastos"] == 1500.0
+
+
+def test_projecao_nao_materializa_nem_conta_duas_vezes(client):
+    _aluguel(client)
+    client.post(
+        "/recorrencias/materializar",
+        params={"competencia_inicio": "2026-01", "competencia_fim": "2026-02"},
+    )
+
+    anual = client.get(
+        "/consolidacoes/anual",
+        params={"ano": "2026", "projetar": "true"},
+    ).json()
+    sem_projecao = client.get("/consolidacoes/anual", params={"ano": "2026"}).json()
+
+    assert anual["total_gastos"] == 12 * 1500.0
+    assert sem_projecao["total_gastos"] == 2 * 1500.0
+    assert len(client.get("/lancamentos").json()) == 2
+    mensal = client.get(
+        "/consolidacoes/mensal",
+        params={"competencia": "2026-07", "projetar": "true"},
+    ).json()
+    assert mensal["saldo"] == -1500.0
+
+
+def test_recorrencia_valida_payload_e_referencias(client):
+    invalida = client.post(
+        "/recorrencias",
+        json={
+            "nome": "Salario",
+            "tipo_lancamento": "ENTRADA",
+            "valor": 10.0,
+            "dia": 5,
+            "competencia_inicio": "2026-05",
+            "competencia_fim": "2026-01",
+        },
+    )
+    assert invalida.status_code == 422
+    assert invalida.json()["detail"][0]["loc"] == ["body", "competencia_fim"]
+
+    sem_categoria = client.post(
+        "/recorrencias",
+        json={
+            "nome": "Luz",
+            "tipo_lancamento": "FIXO",
+            "categoria_id": "6f1c2d3e-4b5a-4c6d-8e7f-90a1b2c3d4e5",
+            "forma_pagamento_id": "6f1c2d3e-4b5a-4c6d-8e7f-90a1b2c3d4e5",
+            "valor": 10.0,
+            "dia": 5,
+            "competencia_inicio": "2026-05",
+        },
+    )
+    assert sem_categoria.status_code == 404
+
+    regra = _aluguel(client)
+    assert client.get(f"/recorrencias/{regra['id']}").json() == regra
+    assert client.get("/recorrencias").json() == [regra]
+    assert client.delete(f"/recorrencias/{regra['id']}").status_code == 204
+    assert client.get(f"/recorrencias/{regra['id']}").status_code == 404
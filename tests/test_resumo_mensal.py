@@ -0,0 +1,81 @@
+import importlib
+
+from fastapi.testclient import TestClient
+import pytest
+
+
+@pytest.fixture()
+def ambiente(tmp_path, monkeypatch):
+    db_path = tmp_path / "financas.db"
+    monkeypatch.setenv("FINANCAS_DB_PATH", str(db_path))
+
+    import app.db as db
+    import app.main as main
+    import app.manutencao as manutencao
+
+    importlib.reload(db)
+    importlib.reload(main)
+    importlib.reload(manutencao)
+
+    with TestClient(main.app) as test_client:
+        yield test_client, db, manutencao
+
+
+def _popular(client):
+    categoria = client.post("/categorias", json={"nome": "Mercado"}).json()
+    forma = client.post("/formas-pagamento", json={"nome": "Cartao"}).json()
+    referencias = {"categoria_id": categoria["id"], "forma_pagamento_id": forma["id"]}
+    payloads = [
+        {"tipo_lancamento": "ENTRADA", "competencia": "2026-01", "valor": 3000.0},
+        {"tipo_lancamento": "VARIAVEL", "competencia": "2026-01", "valor": 80.5, "pago": True},
+        {"tipo_lancamento": "PARCELADO", "competencia": "2025-12", "valor_total": 100.0, "numero_parcelas": 3},
+    ]
+    for payload in payloads:
+        payload.update({"nome": "Teste", "data": f"{payload['competencia']}-01"})
+        if payload["tipo_lancamento"] != "ENTRADA":
+            payload.update(referencias)
+        assert client.post("/lancamentos", json=payload).status_code == 201
+
+
+def test_resumo_atualizado_na_escrita(ambiente):
+    client, db, manutencao = ambiente
+    _popular(client)
+
+    linhas = {linha["competencia"]: linha for linha in db.list_resumo_mensal()}
+    assert sorted(linhas) == ["2025-12", "2026-01", "2026-02"]
+    assert linhas["2026-01"]["entradas_centavos"] == 300000
+    assert linhas["2026-01"]["gastos_centavos"] == 8050
+    assert linhas["2026-01"]["parcelas_centavos"] == 3333
+    assert linhas["2026-02"]["parcelas_centavos"] == 3334
+    assert manutencao.verificar_resumo_mensal() == []
+
+
+def test_verificacao_e_rebuild(ambiente):
+    client, db, manutencao = ambiente
+    _popular(client)
+
+    with db.get_connection() as conn:
+        conn.execute("UPDATE resumo_mensal SET gastos_centavos = 0 WHERE competencia = '2026-01'")
+        conn.execute("DELETE FROM resumo_mensal WHERE competencia = '2026-02'")
+
+    divergencias = manutencao.verificar_resumo_mensal()
+    assert {(item["competencia"], item["campo"]) for item in divergencias} == {
+        ("2026-01", "gastos_centavos"),
+        ("2026-02", "parcelas_centavos"),
+    }
+    assert manutencao.main(["resumo-verificar"]) == 1
+
+    assert manutencao.main(["resumo-rebuild"]) == 0
+    assert manutencao.verificar_resumo_mensal() == []
+    response = client.get("/consolidacoes/mensal", params={"competencia": "2026-01"})
+    assert response.json()["total_gastos"] == 113.83
+
+
+def test_init_db_reconstroi_resumo_ausente(ambiente):
+    client, db, manutencao = ambiente
+    _popular(client)
+
+    with db.get_connection() as conn:
+        conn.execute("DROP TABLE resumo_mensal")
+    db.init_db()
+    assert manutencao.verificar_resumo_mensal() == []
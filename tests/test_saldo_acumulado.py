@@ -0,0 +1,103 @@
+import importlib
+import random
+import uuid
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.calculos import index_to_competencia
+
+USUARIO = "00000000-0000-0000-0000-000000000001"
+
+
+@pytest.fixture()
+def ambiente(tmp_path, monkeypatch):
+    monkeypatch.setenv("FINANCAS_DB_PATH", str(tmp_path / "financas.db"))
+
+    import app.db as db
+    import app.main as main
+
+    importlib.reload(db)
+    importlib.reload(main)
+
+    with TestClient(main.app) as test_client:
+        yield test_client, db
+
+
+def _tabela(db):
+    with db.get_connection() as conn:
+        return conn.execute(
+            "SELECT usuario_id, competencia, saldo_centavos FROM saldo_acumulado ORDER BY 1, 2"
+        ).fetchall()
+
+
+def test_saldo_acumulado_igual_a_soma_das_mensais(ambiente):
+    client, _ = ambiente
+    categoria = client.post("/categorias", json={"nome": "Casa"}).json()
+    forma = client.post("/formas-pagamento", json={"nome": "Pix"}).json()
+    payloads = [
+        {"tipo_lancamento": "ENTRADA", "competencia": "2026-03", "valor": 1000.0},
+        {
+            "tipo_lancamento": "PARCELADO",
+            "competencia": "2026-02",
+            "valor_total": 100.0,
+            "numero_parcelas": 3,
+        },
+        {"tipo_lancamento": "ENTRADA", "competencia": "2025-11", "valor": 50.0},
+        {"tipo_lancamento": "FIXO", "competencia": "2026-01", "valor": 20.0, "pago": True},
+    ]
+    for payload in payloads:
+        payload.update({"nome": "Teste", "data": f"{payload['competencia']}-01"})
+        if payload["tipo_lancamento"] != "ENTRADA":
+            payload.update({"categoria_id": categoria["id"], "forma_pagamento_id": forma["id"]})
+        assert client.post("/lancamentos", json=payload).status_code == 201
+
+    resposta = client.get(
+        "/consolidacoes/saldo-acumulado",
+        params={"competencia_inicio": "2025-12", "competencia_fim": "2026-06"},
+    ).json()
+    anual = client.get(
+        "/consolidacoes/anual",
+        params={"competencia_inicio": "2025-12", "competencia_fim": "2026-06"},
+    ).json()
+
+    assert resposta["saldo_inicial"] == 50.0
+    acumulado = resposta["saldo_inicial"]
+    for item, mensal in zip(resposta["saldos"], anual["resumos"]):
+        acumulado = round(acumulado + mensal["saldo"], 2)
+        assert item["saldo"] == mensal["saldo"]
+        assert item["saldo_acumulado"] == acumulado
+    assert resposta["saldo_final"] == 50.0 - 20.0 - 100.0 + 1000.0
+
+
+def test_prefixos_mantidos_na_escrita_iguais_ao_rebuild(ambiente):
+    _, db = ambiente
+    gerador = random.Random(7)
+    for _ in range(20):
+        lote = []
+        for _ in range(gerador.randrange(1, 6)):
+            competencia = index_to_competencia(24300 + gerador.randrange(24))
+            item = {
+                "id": str(uuid.uuid4()),
+                "usuario_id": USUARIO,
+                "nome": "Teste",
+                "data": f"{competencia}-01",
+                "competencia": competencia,
+                "tipo_lancamento": gerador.choice(["ENTRADA", "VARIAVEL", "PARCELADO"]),
+            }
+            if item["tipo_lancamento"] == "PARCELADO":
+                item["valor_total"] = gerador.randrange(1, 100000) / 100
+                item["numero_parcelas"] = gerador.randrange(1, 13)
+            else:
+                item["valor"] = gerador.randrange(1, 100000) / 100
+            lote.append(item)
+        db.insert_lancamentos(lote)
+
+    mantido = _tabela(db)
+    db.rebuild_resumo_mensal()
+
+    assert mantido == _tabela(db)
+    inicial, saldos = db.list_saldo_acumulado("2025-06", "2026-06", USUARIO)
+    anteriores = [linha for linha in mantido if linha[1] < "2025-06"]
+    assert inicial == (anteriores[-1][2] if anteriores else 0)
+    assert saldos == {linha[1]: linha[2] for linha in mantido if "2025-06" <= linha[1] <= "2026-06"}
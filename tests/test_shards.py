@@ -0,0 +1,197 @@
+import importlib
+import sqlite3
+import uuid
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.shards import nome_shard
+
+USUARIO_A = "00000000-0000-0000-0000-000000000001"
+USUARIO_B = "6f1c2d3e-4b5a-4c6d-8e7f-90a1b2c3d4e5"
+USUARIO_C = "0b9e8d7c-6a5f-4e3d-9c2b-1a0f9e8d7c6b"
+
+
+@pytest.fixture()
+def shards(tmp_path, monkeypatch):
+    monkeypatch.setenv("FINANCAS_DB_PATH", str(tmp_path / "financas.db"))
+
+    import app.db as db
+    import app.db_async as db_async
+
+    importlib.reload(db)
+    monkeypatch.setattr(db, "SHARDS_ATIVOS", True)
+    monkeypatch.setattr(db, "SHARDS_DIR", str(tmp_path / "usuarios"))
+    monkeypatch.setattr(db_async, "DB_ESCRITORES", 2)
+    db.init_db()
+    yield db
+    db_async.encerrar_executores()
+    db.close_pool()
+
+
+def _entrada(usuario_id, competencia, dia, valor=10.0):
+    return {
+        "id": str(uuid.uuid4()),
+        "usuario_id": usuario_id,
+        "nome": "Salario",
+        "data": f"{competencia}-{dia:02d}",
+        "competencia": competencia,
+        "tipo_lancamento": "ENTRADA",
+        "valor": valor,
+    }
+
+
+def _usuarios_no_arquivo(db, usuario_id):
+    conn = sqlite3.connect(db.caminho_shard(usuario_id))
+    try:
+        return {row[0] for row in conn.execute("SELECT usuario_id FROM lancamentos")}
+    finally:
+        conn.close()
+
+
+def test_cada_usuario_grava_no_proprio_arquivo(shards, tmp_path):
+    db = shards
+    db.insert_lancamentos(
+        [_entrada(USUARIO_A, "2026-01", 5), _entrada(USUARIO_B, "2026-01", 6)]
+    )
+    db.insert_lancamento(_entrada(USUARIO_B, "2026-02", 1))
+
+    assert db.listar_shards() == sorted([USUARIO_A, USUARIO_B])
+    assert not (tmp_path / "financas.db").exists()
+    assert _usuarios_no_arquivo(db, USUARIO_A) == {USUARIO_A}
+    assert _usuarios_no_arquivo(db, USUARIO_B) == {USUARIO_B}
+    assert len(db.list_lancamentos(usuario_id=USUARIO_B)) == 2
+    assert db.get_resumo_mensal("2026-01", USUARIO_B)["entradas_centavos"] == 1000
+
+
+def test_listagem_sem_usuario_mescla_shards_em_ordem(shards):
+    db = shards
+    lancamentos = [
+        _entrada(USUARIO_A, "2026-01", 10),
+        _entrada(USUARIO_B, "2026-01", 3),
+        _entrada(USUARIO_C, "2026-02", 1),
+        _entrada(USUARIO_A, "2026-02", 20),
+        _entrada(USUARIO_B, "2025-12", 31),
+    ]
+    db.insert_lancamentos(lancamentos)
+    esperado = [
+        item["id"]
+        for item in sorted(lancamentos, key=lambda item: (item["competencia"], item["data"]))
+    ]
+
+    primeira = db.list_lancamentos(limite=3)
+    ultimo = primeira[-1]
+    resto = db.list_lancamentos(apos=(ultimo.competencia, ultimo.data, ultimo.id), limite=3)
+    lotes = list(db.iter_lancamentos(tamanho_lote=2))
+
+    assert [item.id for item in primeira + resto] == esperado
+    assert [len(lote) for lote in lotes] == [2, 2, 1]
+    assert [item.id for lote in lotes for item in lote] == esperado
+    assert sorted(db.list_usuarios_lancamentos()) == sorted([USUARIO_A, USUARIO_B, USUARIO_C])
+
+
+def test_leitura_sem_shard_nao_cria_arquivo(shards):
+    db = shards
+
+    assert db.get_resumo_mensal("2026-01", USUARIO_B) == {
+        "entradas_centavos": 0,
+        "gastos_centavos": 0,
+        "parcelas_centavos": 0,
+    }
+    assert db.list_lancamentos(usuario_id="nao-e-uuid") == []
+    assert db.list_formas_pagamento(USUARIO_B) == []
+    assert db.delete_categoria(str(uuid.uuid4()), USUARIO_B) is False
+    assert db.listar_shards() == []
+
+    with pytest.raises(ValueError):
+        db.insert_lancamento(_entrada("../fora", "2026-01", 1))
+
+
+def test_lru_limita_shards_abertos(shards, monkeypatch):
+    db = shards
+    monkeypatch.setattr(db._shards(), "max_abertos", 2)
+
+    for usuario_id in (USUARIO_A, USUARIO_B, USUARIO_C):
+        db.insert_lancamento(_entrada(usuario_id, "2026-01", 1, valor=1.5))
+
+    estatisticas = db.estatisticas_pools()["shards"]
+    assert estatisticas["abertos"] == 2
+    assert estatisticas["evictions"] == 1
+    assert db.get_resumo_mensal("2026-01", USUARIO_A)["entradas_centavos"] == 150
+    assert db.estatisticas_pools()["shards"]["evictions"] == 2
+
+
+def test_rebuild_e_verificacao_percorrem_todos_os_shards(shards):
+    db = shards
+    from app import manutencao
+
+    db.insert_lancamentos(
+        [_entrada(USUARIO_A, "2026-01", 5), _entrada(USUARIO_B, "2026-03", 6)]
+    )
+
+    assert db.rebuild_resumo_mensal() == 2
+    assert [linha["usuario_id"] for linha in db.list_resumo_mensal()] == sorted(
+        [USUARIO_A, USUARIO_B]
+    )
+    assert manutencao.verificar_resumo_mensal() == []
+
+
+def test_particionar_banco_unico(shards, tmp_path, monkeypatch):
+    db = shards
+    from app import manutencao
+
+    monkeypatch.setattr(db, "SHARDS_ATIVOS", False)
+    db.init_db()
+    categoria = {"id": str(uuid.uuid4()), "usuario_id": USUARIO_B, "nome": "Casa"}
+    db.insert_categoria(categoria)
+    db.insert_lancamentos(
+        [
+            _entrada(USUARIO_A, "2026-01", 5),
+            _entrada(USUARIO_B, "2026-01", 6),
+            _entrada(USUARIO_B, "2026-02", 7),
+        ]
+    )
+    db.close_pool()
+    monkeypatch.setattr(db, "SHARDS_ATIVOS", True)
+
+    copiados = manutencao.particionar_banco(str(tmp_path / "financas.db"))
+
+    assert copiados == {USUARIO_A: 1, USUARIO_B: 2}
+    assert db.list_categorias(USUARIO_B) == [categoria]
+    assert db.list_categorias(USUARIO_A) == []
+    assert db.get_resumo_mensal("2026-02", USUARIO_B)["entradas_centavos"] == 1000
+    assert manutencao.verificar_resumo_mensal() == []
+    assert manutencao.particionar_banco(str(tmp_path / "financas.db")) == {
+        USUARIO_A: 0,
+        USUARIO_B: 0,
+    }
+
+
+def test_api_com_shards(shards):
+    import app.main as main
+
+    importlib.reload(main)
+    with TestClient(main.app) as client:
+        categoria = client.post("/categorias", json={"nome": "Casa"}).json()
+        forma = client.post("/formas-pagamento", json={"nome": "Pix"}).json()
+        resposta = client.post(
+            "/lancamentos",
+            json={
+                "nome": "Mercado",
+                "data": "2026-01-10",
+                "competencia": "2026-01",
+                "tipo_lancamento": "VARIAVEL",
+                "categoria_id": categoria["id"],
+                "forma_pagamento_id": forma["id"],
+                "valor": 80.5,
+                "pago": True,
+            },
+        )
+        assert resposta.status_code == 201
+        assert client.get(f"/categorias/{categoria['id']}").json() == categoria
+        assert [item["nome"] for item in client.get("/lancamentos").json()] == ["Mercado"]
+        mensal = client.get("/consolidacoes/mensal", params={"competencia": "2026-01"}).json()
+        assert mensal["total_gastos"] == 80.5
+        assert "financas_db_shards" in client.get("/metrics").text
+
+    assert shards.listar_shards() == [nome_shard(main.MOCK_USER_ID)]
@@ -84,3 +84,27 @@ def test_lancamento_entrada_sem_referencias(client):
         },
     )
     assert response.status_code == 201
+
+
+@pytest.mark.parametrize(
+    ("valor", "msg"),
+    [
+        ("1e17", "deve ser menor que 10000000000000"),
+        ("Infinity", "deve ser numero finito"),
+        ("NaN", "deve ser numero finito"),
+    ],
+)
+def test_lancamento_valor_fora_do_intervalo(client, valor, msg):
+    corpo = (
+        '{"nome": "Salario", "data": "2026-01-10", "competencia": "2026-01",'
+        f' "tipo_lancamento": "ENTRADA", "valor": {valor}}}'
+    )
+    response = client.post(
+        "/lancamentos",
+        content=corpo,
+        headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"] == [
+        {"loc": ["body", "valor"], "msg": msg, "type": "value_error"}
+    ]
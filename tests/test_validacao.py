@@ -0,0 +1,333 @@
+import itertools
+import re
+from datetime import datetime
+from uuid import UUID
+
+import pytest
+
+from app.calculos import arredondar_centavos
+from app.main import (
+    COMPETENCIA_FORMATO,
+    COMPETENCIA_RE,
+    DATA_FORMATO,
+    DATA_RE,
+    MOCK_USER_ID,
+    NUMERO_PARCELAS_MAXIMO,
+    TIPOS_LANCAMENTO,
+    PayloadValidationError,
+    _validate_payload,
+)
+
+# Implementacao anterior de _validate_payload, mantida como oraculo.
+
+
+def _erro(errors, field, msg, err_type):
+    errors.append({"loc": ["body", field], "msg": msg, "type": err_type})
+
+
+def _string(payload, field, errors):
+    if field not in payload:
+        _erro(errors, field, "campo obrigatorio", "value_error.missing")
+        return None
+    value = payload[field]
+    if not isinstance(value, str):
+        _erro(errors, field, "deve ser string", "type_error.string")
+        return None
+    if not value.strip():
+        _erro(errors, field, "nao pode ser vazio", "value_error")
+        return None
+    return value
+
+
+def _data(payload, field, errors, fmt, pattern):
+    value = _string(payload, field, errors)
+    if value is None:
+        return None
+    if not pattern.match(value):
+        _erro(errors, field, f"formato invalido ({fmt})", "value_error")
+        return None
+    try:
+        datetime.strptime(value, fmt)
+    except ValueError:
+        _erro(errors, field, f"formato invalido ({fmt})", "value_error")
+        return None
+    return value
+
+
+def _uuid(payload, field, errors):
+    value = _string(payload, field, errors)
+    if value is None:
+        return None
+    try:
+        UUID(value)
+    except ValueError:
+        _erro(errors, field, "uuid invalido", "value_error")
+        return None
+    return value
+
+
+def _dinheiro(payload, field, errors):
+    if field not in payload:
+        _erro(errors, field, "campo obrigatorio", "value_error.missing")
+        return None
+    value = payload[field]
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        _erro(errors, field, "deve ser numero", "type_error.number")
+        return None
+    if value < 0:
+        _erro(errors, field, "deve ser maior ou igual a zero", "value_error")
+        return None
+    return arredondar_centavos(value)
+
+
+def _inteiro(payload, field, errors):
+    if field not in payload:
+        _erro(errors, field, "campo obrigatorio", "value_error.missing")
+        return None
+    value = payload[field]
+    if not isinstance(value, int) or isinstance(value, bool):
+        _erro(errors, field, "deve ser inteiro", "type_error.integer")
+        return None
+    return value
+
+
+def _booleano(payload, field, errors):
+    if field not in payload:
+        _erro(errors, field, "campo obrigatorio", "value_error.missing")
+        return None
+    value = payload[field]
+    if not isinstance(value, bool):
+        _erro(errors, field, "deve ser booleano", "type_error.bool")
+        return None
+    return value
+
+
+def _oraculo(payload):
+    errors = []
+    if not isinstance(payload, dict):
+        errors.append(
+            {"loc": ["body"], "msg": "deve ser objeto JSON", "type": "type_error.object"}
+        )
+        raise PayloadValidationError(errors)
+
+    nome = _string(payload, "nome", errors)
+    data = _data(payload, "data", errors, DATA_FORMATO, DATA_RE)
+    competencia = _data(payload, "competencia", errors, COMPETENCIA_FORMATO, COMPETENCIA_RE)
+    tipo = _string(payload, "tipo_lancamento", errors)
+    if tipo and tipo not in TIPOS_LANCAMENTO:
+        _erro(errors, "tipo_lancamento", "tipo_lancamento invalido", "value_error")
+    if errors:
+        raise PayloadValidationError(errors)
+
+    lancamento = {
+        "usuario_id": MOCK_USER_ID,
+        "nome": nome,
+        "data": data,
+        "competencia": competencia,
+        "tipo_lancamento": tipo,
+    }
+    if tipo == "ENTRADA":
+        valor = _dinheiro(payload, "valor", errors)
+        if errors:
+            raise PayloadValidationError(errors)
+        lancamento["valor"] = valor
+        return lancamento
+
+    categoria_id = _uuid(payload, "categoria_id", errors)
+    forma_pagamento_id = _uuid(payload, "forma_pagamento_id", errors)
+    if tipo in {"FIXO", "VARIAVEL"}:
+        valor = _dinheiro(payload, "valor", errors)
+        pago = _booleano(payload, "pago", errors)
+        if errors:
+            raise PayloadValidationError(errors)
+        lancamento.update(
+            {
+                "categoria_id": categoria_id,
+                "forma_pagamento_id": forma_pagamento_id,
+                "valor": valor,
+                "pago": pago,
+            }
+        )
+        return lancamento
+
+    valor_total = _dinheiro(payload, "valor_total", errors)
+    numero_parcelas = _inteiro(payload, "numero_parcelas", errors)
+    if numero_parcelas is not None and numero_parcelas < 1:
+        _erro(errors, "numero_parcelas", "deve ser maior ou igual a 1", "value_error")
+    elif numero_parcelas is not None and numero_parcelas > NUMERO_PARCELAS_MAXIMO:
+        _erro(
+            errors,
+            "numero_parcelas",
+            f"deve ser menor ou igual a {NUMERO_PARCELAS_MAXIMO}",
+            "value_error",
+        )
+    if errors:
+        raise PayloadValidationError(errors)
+    lancamento.update(
+        {
+            "categoria_id": categoria_id,
+            "forma_pagamento_id": forma_pagamento_id,
+            "valor_total": valor_total,
+            "numero_parcelas": numero_parcelas,
+        }
+    )
+    return lancamento
+
+
+CATEGORIA = "3fa85f64-5717-4562-b3fc-2c963f66afa6"
+FORMA = "7c9e6679-7425-40de-944b-e07fc1f90ae7"
+
+BASES = [
+    {
+        "nome": "Salario",
+        "data": "2026-01-05",
+        "competencia": "2026-01",
+        "tipo_lancamento": "ENTRADA",
+        "valor": 5000,
+    },
+    {
+        "nome": "Aluguel",
+        "data": "2026-01-10",
+        "competencia": "2026-01",
+        "tipo_lancamento": "FIXO",
+        "categoria_id": CATEGORIA,
+        "forma_pagamento_id": FORMA,
+        "valor": 1200.5,
+        "pago": True,
+    },
+    {
+        "nome": "Mercado",
+        "data": "2024-02-29",
+        "competencia": "2024-02",
+        "tipo_lancamento": "VARIAVEL",
+        "categoria_id": CATEGORIA,
+        "forma_pagamento_id": FORMA,
+        "valor": 10.005,
+        "pago": False,
+    },
+    {
+        "nome": "Notebook",
+        "data": "2026-03-31",
+        "competencia": "2026-03",
+        "tipo_lancamento": "PARCELADO",
+        "categoria_id": CATEGORIA,
+        "forma_pagamento_id": FORMA,
+        "valor_total": 3999.99,
+        "numero_parcelas": 10,
+    },
+]
+
+AUSENTE = object()
+
+VARIACOES = {
+    "nome": [AUSENTE, None, 1, "", "   ", "\t\n", "Conta de luz"],
+    "data": [
+        AUSENTE,
+        None,
+        20260105,
+        "",
+        "2023-02-29",
+        "2024-02-29",
+        "2100-02-29",
+        "2000-02-29",
+        "0000-01-01",
+        "0001-01-01",
+        "2026-13-01",
+        "2026-00-10",
+        "2026-01-00",
+        "2026-01-32",
+        "2026-04-31",
+        "2026-1-05",
+        "2026/01/05",
+        "2026-01-05\n",
+        "2026-01-05 ",
+        "２０２６-01-05",
+        "2026-01-1٥",
+    ],
+    "competencia": [
+        AUSENTE,
+        "2026",
+        "2026-1",
+        "2026-00",
+        "2026-13",
+        "0000-05",
+        "2026-01-01",
+        "2026-01\n",
+        "٢٠٢٦-01",
+    ],
+    "tipo_lancamento": [AUSENTE, None, "", "entrada", "OUTRO", "ENTRADA", "FIXO", "PARCELADO"],
+    "categoria_id": [
+        AUSENTE,
+        None,
+        "",
+        "nao-e-uuid",
+        CATEGORIA.upper(),
+        CATEGORIA.replace("-", ""),
+        "{" + CATEGORIA + "}",
+        "urn:uuid:" + CATEGORIA,
+        " " + CATEGORIA.replace("-", "")[1:],
+        "0x" + CATEGORIA.replace("-", "")[2:],
+        CATEGORIA[:-1] + "g",
+    ],
+    "forma_pagamento_id": [AUSENTE, 123, FORMA, FORMA + "0"],
+    "valor": [AUSENTE, None, "10", True, -0.01, 0, 0.005, 1e-3, 10**12],
+    "valor_total": [AUSENTE, False, -1, 0, 99.999],
+    "numero_parcelas": [AUSENTE, None, True, 2.0, 0, -3, 1, 600, 601],
+    "pago": [AUSENTE, None, 1, "true", False],
+}
+
+
+def _variar(base, campo, valor):
+    payload = dict(base)
+    if valor is AUSENTE:
+        payload.pop(campo, None)
+    else:
+        payload[campo] = valor
+    return payload
+
+
+def _corpus():
+    for base in BASES:
+        yield base
+        for campo, valores in VARIACOES.items():
+            for valor in valores:
+                yield _variar(base, campo, valor)
+        for (campo_a, valores_a), (campo_b, valores_b) in itertools.combinations(
+            VARIACOES.items(), 2
+        ):
+            for valor_a, valor_b in zip(valores_a, valores_b):
+                yield _variar(_variar(base, campo_a, valor_a), campo_b, valor_b)
+
+
+def _resultado(validar, payload):
+    try:
+        return "ok", validar(payload)
+    except PayloadValidationError as exc:
+        return "erro", exc.errors
+
+
+@pytest.mark.parametrize("payload", [None, [], "texto", 1, [BASES[0]]])
+def test_rejeita_corpo_que_nao_e_objeto(payload):
+    assert _resultado(_validate_payload, payload) == _resultado(_oraculo, payload)
+
+
+def test_equivalente_ao_validador_anterior():
+    verificados = 0
+    for payload in _corpus():
+        esperado = _resultado(_oraculo, payload)
+        obtido = _resultado(_validate_payload, payload)
+        if esperado[0] == "ok" and obtido[0] == "ok":
+            lancamento = dict(obtido[1])
+            assert UUID(lancamento.pop("id")).version == 4
+            assert list(lancamento) == list(esperado[1]), payload
+            obtido = ("ok", lancamento)
+        assert obtido == esperado, payload
+        verificados += 1
+    assert verificados > 1000
+
+
+def test_chave_id_vem_primeiro():
+    lancamento = _validate_payload(BASES[3])
+
+    assert list(lancamento)[:2] == ["id", "usuario_id"]
+    assert re.fullmatch(r"[0-9a-f-]{36}", lancamento["id"])